@@ -1,23 +1,57 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile, BackgroundTasks
+from fastapi import FastAPI, HTTPException, File, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse
 import uuid
+import hashlib
 import json
 import logging
 import traceback
 import asyncio
-from grobid_client.grobid_client import GrobidClient
+import tarfile
+import time
+import zipfile
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-import shutil
+from neo4j.exceptions import ServiceUnavailable, SessionExpired
 from services.neo4j_service import Neo4jService, get_neo4j_service
-from services.pinecone_service import chunk_markdown_by_sections, upsert_paper_chunks
+from services.async_neo4j_service import get_async_neo4j_service
+from services.grobid_service import get_grobid_service
+from services.pinecone_service import chunk_markdown_by_sections, prepare_paper_vectors, upsert_vectors
+from services.ingest_scheduler import IngestScheduler, QueueFullError, Stage
+from services.config import data_dir, env_int, get_config, get_section
+from services.artifact_cache import get_artifact_cache
+from services.tei_parser import parse_tei
+from services.embedding_cache import get_embedding_cache
+from services.hybrid_search import hybrid_search
+from services.health_monitor import get_health_monitor
+from services import metrics
+from services.vector_store import get_vector_store
+from services import query_cache
+from services.job_store import STATUSES, get_job_store
 import httpx
 import os
-from bs4 import BeautifulSoup
-from contextlib import asynccontextmanager
+from contextlib import ExitStack, asynccontextmanager
+from typing import Awaitable, Callable, List, Optional
 
-# In-memory job store: job_id -> { status, filename, result, error }
-_jobs: dict = {}
+# Uploaded PDFs wait here until their job finishes, so a restart can resume them
+UPLOAD_DIR = os.getenv("UPLOAD_DIR") or data_dir("uploads")
+# Uploads are copied in blocks of this size; peak memory per upload is one block
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES = env_int("MAX_UPLOAD_BYTES", get_config().get("max_upload_bytes", 200 * 1024 * 1024))
+# Limits for /ingest/batch: whole request body and number of PDFs it may contain
+MAX_BATCH_BYTES = env_int("MAX_BATCH_BYTES", get_config().get("max_batch_bytes", 2 * 1024 ** 3))
+MAX_BATCH_FILES = env_int("MAX_BATCH_FILES", get_config().get("max_batch_files", 500))
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+# Long-running tasks started by the app (job resume, batch feeders)
+_background_tasks: set = set()
+
+
+def _spawn(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
 
 
 def _get_marker_url():
@@ -32,23 +66,116 @@ def _get_marker_url():
 
 MARKER_SERVICE_URL = _get_marker_url()
 
+# Shared Marker client (connection reuse across jobs); created on first use
+_marker_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_marker_client() -> httpx.AsyncClient:
+    global _marker_client
+    if _marker_client is None:
+        _marker_client = httpx.AsyncClient(timeout=600.0)
+    return _marker_client
+
+
+async def _post_to_marker(temp_path: str, filename: str,
+                          conversion_id: Optional[str] = None) -> httpx.Response:
+    """
+    POST a PDF to Marker's /convert. A 503 (models loading or conversion
+    queue full) is retried after the server's Retry-After, up to
+    MARKER_BUSY_RETRIES times. Long PDFs are sharded by Marker; their
+    progress is at {marker}/progress/{conversion_id}.
+    """
+    marker_url = _get_marker_url()
+    retries = env_int("MARKER_BUSY_RETRIES", 3)
+    for attempt in range(retries + 1):
+        # httpx streams the multipart body from the open handle in small chunks
+        try:
+            with open(temp_path, "rb") as pdf_file:
+                response = await _get_marker_client().post(
+                    f"{marker_url}/convert",
+                    params={"conversion_id": conversion_id} if conversion_id else None,
+                    files={"file": (filename, pdf_file, "application/pdf")}
+                )
+        except httpx.TransportError as e:
+            get_health_monitor().record_failure("marker", e)
+            raise
+        if response.status_code != 503 or attempt == retries:
+            await _record_response("marker", response.status_code, _marker_alive)
+            return response
+        retry_after = response.headers.get("retry-after", "")
+        delay = min(int(retry_after), 120) if retry_after.isdigit() else 30
+        logger.info("Marker busy, retrying %s in %ds", filename, delay)
+        await asyncio.sleep(delay)
+
+
+async def _record_response(name: str, status: int, alive: Callable[[], Awaitable[bool]]):
+    """
+    Feed an HTTP answer into a dependency's breaker. Any answer means the
+    service is reachable, so a per-document error (500, 408) is not held
+    against it; a 503 or a timeout only counts as a failure when the
+    liveness probe fails too. Transport errors are recorded by the caller.
+    """
+    monitor = get_health_monitor()
+    if status in (408, 503):
+        try:
+            up = await asyncio.wait_for(alive(), monitor.timeout)
+        except Exception:
+            up = False
+        if not up:
+            monitor.record_failure(name, f"HTTP {status}, liveness probe failed")
+            return
+    monitor.record_success(name)
+
+
+async def _marker_alive() -> bool:
+    r = await _get_marker_client().get(f"{_get_marker_url().rstrip('/')}/health", timeout=10.0)
+    return r.status_code == 200
+
+
+async def _vector_store_alive() -> bool:
+    return await asyncio.to_thread(get_vector_store().ping)
+
+
+def _register_health_checks():
+    monitor = get_health_monitor()
+    monitor.register("neo4j", lambda: get_async_neo4j_service().driver.verify_connectivity())
+    monitor.register("grobid", lambda: get_grobid_service().is_alive())
+    # Polling Marker keeps a scale-to-zero GPU instance awake; by default its
+    # breaker follows real conversions only
+    heartbeat = env_int("MARKER_HEARTBEAT", int(get_section("health").get("marker_heartbeat", False)))
+    monitor.register("marker", _marker_alive if heartbeat else None)
+    monitor.register("vector_store", _vector_store_alive)
+    return monitor
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    try:
-        neo4j = get_neo4j_service()
-        if neo4j.verify_connection():
-            print("connection to Neo4j established")
-        else:
-            print("failed to connect to Neo4j - Running without graph database")
-    except Exception as e:
-        print("Error connecting to Neo4j: ", e)
+    monitor = _register_health_checks()
+    await monitor.start()
+    if monitor.is_up("neo4j"):
+        print("connection to Neo4j established")
+    else:
+        print("failed to connect to Neo4j - Running without graph database")
+
+    await scheduler.start()
+    _spawn(_resume_jobs())
 
     yield
 
+    # Jobs not yet handed to the pipeline stay queued and resume on next start
+    for task in list(_background_tasks):
+        task.cancel()
+
+    await scheduler.stop()
+    await monitor.stop()
+    await get_grobid_service().close()
+    if _marker_client is not None:
+        await _marker_client.aclose()
+
     try:
         neo4j = get_neo4j_service()
         neo4j.close()
+        await get_async_neo4j_service().close()
         print("connection to Neo4j closed")
     except Exception:
         pass
@@ -57,151 +184,769 @@ async def lifespan(app: FastAPI):
 app = FastAPI(lifespan=lifespan)
 
 
-async def _process_pdf(job_id: str, temp_path: str, filename: str):
-    """Background task: GROBID + Marker + Neo4j + Pinecone."""
-    _jobs[job_id]["status"] = "processing"
+async def _extract_stage(job: dict):
+    """
+    Pipeline stage 1: GROBID (or cached artifacts). PDFs GROBID cannot read
+    are flagged needs_marker and converted by the marker stage.
+    """
+    job_id, temp_path, filename = job["job_id"], job["temp_path"], job["filename"]
+    job.setdefault("started_at", time.perf_counter())
+    await asyncio.to_thread(get_job_store().update, job_id, status="processing")
+    sha256 = job.get("sha256")
+    cache = get_artifact_cache() if sha256 else None
+
+    # 0. Reuse artifacts from an earlier run of the same PDF bytes
+    xml_out = await asyncio.to_thread(cache.get_text, sha256, "tei.xml") if cache else None
+    markdown = await asyncio.to_thread(cache.get_text, sha256, "marker.md") if cache else None
+    cached_entities = await asyncio.to_thread(cache.get_json, sha256, "entities.json") if cache else None
+
+    # 1. Try GROBID first (fast for text-based arXiv PDFs - ~5-15 sec)
+    entities = None
+    full_text = ""
+    grobid_ok = False
+    tei_cached = xml_out is not None
     try:
-        # 1. Try GROBID first (fast for text-based arXiv PDFs - ~5-15 sec)
-        entities = None
-        full_text = ""
-        grobid_ok = False
-        try:
-            client = GrobidClient(config_path="config.json")
-            _, status, xml_out = client.process_pdf(
-                "processFulltextDocument",
-                temp_path,
-                generateIDs=True,
-                consolidate_header=False,
-                consolidate_citations=False,
-                include_raw_citations=False,
-                include_raw_affiliations=False,
-                tei_coordinates=False,
-                segment_sentences=False
-            )
-            if status == 200:
-                entities = extract_entities(xml_out)
-                full_text = extract_full_text_from_tei(xml_out)
-                grobid_ok = bool(full_text and len(full_text.strip()) > 100)
-                if grobid_ok:
-                    logger.info("GROBID extracted full text (%d chars), skipping Marker", len(full_text))
-            else:
-                grobid_error = (xml_out or "")[:300]
-                logger.warning("GROBID failed (status %s): %s", status, grobid_error)
-        except Exception as ge:
-            logger.warning("GROBID exception (non-fatal): %s", ge)
+        status = 200
+        if xml_out is None and markdown is None and not get_health_monitor().available("grobid"):
+            logger.info("GROBID circuit open, sending %s straight to Marker", filename)
+        elif xml_out is None and markdown is None:
+            with metrics.stage_timer("grobid", [job]):
+                _, status, xml_out = await get_grobid_service().process_pdf(
+                    "processFulltextDocument",
+                    temp_path,
+                    generateIDs=True,
+                    consolidate_header=False,
+                    consolidate_citations=False,
+                    include_raw_citations=False,
+                    include_raw_affiliations=False,
+                    tei_coordinates=False,
+                    segment_sentences=False
+                )
+            await _record_response("grobid", status, get_grobid_service().is_alive)
+            if status == 200 and cache:
+                await asyncio.to_thread(cache.put_text, sha256, "tei.xml", xml_out)
+        if status == 200 and xml_out is not None:
+            parsed_entities, full_text = extract_tei(xml_out)
+            entities = cached_entities or parsed_entities
+            grobid_ok = bool(full_text and len(full_text.strip()) > 100)
+            if grobid_ok:
+                logger.info("GROBID extracted full text (%d chars), skipping Marker", len(full_text))
+        elif xml_out is not None:
+            grobid_error = (xml_out or "")[:300]
+            logger.warning("GROBID failed (status %s): %s", status, grobid_error)
+    except Exception as ge:
+        logger.warning("GROBID exception (non-fatal): %s", ge)
+        if isinstance(ge, httpx.TransportError):
+            get_health_monitor().record_failure("grobid", ge)
 
+    job["entities"] = entities
+    job["cached_entities"] = cached_entities
+    job["full_text"] = full_text
+    if grobid_ok:
+        metrics.EXTRACT_ROUTE.inc("cache" if tei_cached else "grobid")
+    elif markdown is not None:
+        logger.info("Using cached Marker markdown for %s", sha256)
+        metrics.EXTRACT_ROUTE.inc("cache")
+        job["full_text"] = markdown
+    else:
         # 2. Marker only when GROBID failed or returned no text (scanned/image PDFs)
-        if not grobid_ok:
-            marker_url = _get_marker_url()
-            with open(temp_path, "rb") as pdf_file:
-                async with httpx.AsyncClient(timeout=600.0) as http:
-                    marker_response = await http.post(
-                        f"{marker_url}/convert",
-                        files={"file": (filename, pdf_file, "application/pdf")}
-                    )
+        metrics.EXTRACT_ROUTE.inc("marker")
+        job["needs_marker"] = True
+        return
+    await _finish_extraction(job)
 
-            if marker_response.status_code != 200:
-                marker_error = marker_response.text[:500] if marker_response.text else "(no body)"
-                logger.error("Marker failed (status %s): %s", marker_response.status_code, marker_error)
-                raise Exception(f"Marker failed (status {marker_response.status_code}): {marker_error}")
 
-            full_text = marker_response.json().get("markdown", "")
+async def _finish_extraction(job: dict):
+    """Fallback metadata from markdown if GROBID failed; cache the entities."""
+    sha256 = job.get("sha256")
+    cached_entities = job.pop("cached_entities", None)
+    if job.get("entities") is None:
+        job["entities"] = cached_entities or extract_entities_from_markdown(job["full_text"], job["filename"])
+    if sha256 and cached_entities is None:
+        await asyncio.to_thread(get_artifact_cache().put_json, sha256, "entities.json", job["entities"])
 
-        # 3. Fallback metadata from markdown if GROBID failed
-        if entities is None:
-            entities = extract_entities_from_markdown(full_text, filename)
 
-        # 4. Store in Neo4j
-        graph_result = None
-        try:
-            neo4j = get_neo4j_service()
-            if neo4j.verify_connection():
-                graph_result = neo4j.ingest_paper_data(
-                    job_id=job_id,
-                    title=entities["title"],
-                    authors=entities["authors"],
-                    citations=entities["citations"],
-                    full_text=full_text
-                )
-        except Exception as ne:
-            logger.error("Neo4j storage failed (non-fatal): %s", ne)
-            graph_result = {"error": str(ne)}
+async def _marker_stage(job: dict):
+    """Pipeline stage 2 (flagged PDFs only): Marker conversion for PDFs GROBID could not read."""
+    error = (await _marker_batch_stage([job]))[0]
+    if error is not None:
+        raise error
 
-        # 5. Chunk + upsert to Pinecone
-        vector_result = None
-        try:
-            chunks = chunk_markdown_by_sections(full_text)
-            vector_result = upsert_paper_chunks(
-                job_id=job_id,
-                title=entities["title"],
-                chunks=chunks
+
+async def _marker_batch_stage(jobs: list) -> list:
+    """
+    Marker stage for several papers: when more than one PDF is waiting for Marker
+    they go to /convert_batch in one request. Returns one error (or None) per job.
+    """
+    errors = [None] * len(jobs)
+    waiting = [i for i, job in enumerate(jobs) if job.pop("needs_marker", False)]
+    if waiting and not get_health_monitor().available("marker"):
+        # GROBID could not read these and Marker is down: fail now, not after a timeout
+        for i in waiting:
+            errors[i] = Exception("Marker unavailable (circuit open); retry the upload later")
+        return errors
+    with metrics.stage_timer("marker", [jobs[i] for i in waiting]):
+        if len(waiting) > 1:
+            outcomes = await _convert_batch_with_marker([jobs[i] for i in waiting])
+        else:
+            outcomes = [await _convert_with_marker(jobs[i]) for i in waiting]
+
+    for i, outcome in zip(waiting, outcomes):
+        if isinstance(outcome, Exception):
+            errors[i] = outcome
+            continue
+        job = jobs[i]
+        job["full_text"] = outcome
+        if job.get("sha256"):
+            await asyncio.to_thread(get_artifact_cache().put_text, job["sha256"], "marker.md", outcome)
+        await _finish_extraction(job)
+    return errors
+
+
+async def _convert_with_marker(job: dict):
+    """Single-document /convert. Returns the markdown, or the Exception on failure."""
+    marker_response = await _post_to_marker(job["temp_path"], job["filename"], job["job_id"])
+    if marker_response.status_code != 200:
+        marker_error = marker_response.text[:500] if marker_response.text else "(no body)"
+        logger.error("Marker failed (status %s): %s", marker_response.status_code, marker_error)
+        return Exception(f"Marker failed (status {marker_response.status_code}): {marker_error}")
+    return marker_response.json().get("markdown", "")
+
+
+async def _convert_batch_with_marker(jobs: list) -> list:
+    """
+    Send several PDFs to Marker's /convert_batch and read the NDJSON stream as
+    documents finish. Falls back to one /convert per PDF if the batch request
+    is refused (e.g. queue full or an older Marker service).
+    """
+    marker_url = _get_marker_url()
+    outcomes = [None] * len(jobs)
+    try:
+        with ExitStack() as stack:
+            files = [
+                ("files", (job["filename"], stack.enter_context(open(job["temp_path"], "rb")),
+                           "application/pdf"))
+                for job in jobs
+            ]
+            async with _get_marker_client().stream(
+                "POST", f"{marker_url}/convert_batch", files=files
+            ) as response:
+                if response.status_code == 200:
+                    async for line in response.aiter_lines():
+                        if not line.strip():
+                            continue
+                        item = json.loads(line)
+                        if "index" not in item:
+                            continue
+                        if "error" in item:
+                            outcomes[item["index"]] = Exception(
+                                f"Marker failed (status {item.get('status')}): {item['error'][:500]}"
+                            )
+                        else:
+                            outcomes[item["index"]] = item.get("markdown", "")
+                else:
+                    await response.aread()
+                    logger.warning("Marker batch refused (status %s), converting one by one",
+                                   response.status_code)
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning("Marker batch failed (%s), converting one by one", e)
+        if isinstance(e, httpx.TransportError):
+            get_health_monitor().record_failure("marker", e)
+
+    missing = [i for i, outcome in enumerate(outcomes) if outcome is None]
+    if missing:
+        retried = await asyncio.gather(*[_convert_with_marker(jobs[i]) for i in missing],
+                                       return_exceptions=True)
+        for i, outcome in zip(missing, retried):
+            outcomes[i] = outcome
+    return outcomes
+
+
+async def _embed_stage(job: dict):
+    """Pipeline stage 3: chunk the text and embed the chunks."""
+    try:
+        with metrics.stage_timer("chunk", [job]):
+            chunks = chunk_markdown_by_sections(job["full_text"])
+        with metrics.stage_timer("embed", [job]):
+            job["vectors"] = await asyncio.to_thread(
+                prepare_paper_vectors, job["job_id"], job["entities"]["title"], chunks
             )
+    except Exception as ve:
+        logger.error("Embedding failed (non-fatal): %s", ve)
+        job["vectors"] = {"error": str(ve), "upserted": 0}
+
+
+async def _graph_stage(job: dict):
+    """Pipeline stage 4: store the paper and its relationships in Neo4j."""
+    await _graph_batch_stage([job])
+
+
+async def _graph_batch_stage(jobs: list):
+    """Stage 4 for several papers: one Neo4j transaction for the whole group."""
+    monitor = get_health_monitor()
+    if not monitor.available("neo4j"):
+        for job in jobs:
+            job["graph_result"] = {"error": "Neo4j unavailable (circuit open)"}
+        return
+    try:
+        neo4j = get_neo4j_service()
+        with metrics.stage_timer("graph", jobs):
+            results = await asyncio.to_thread(neo4j.ingest_papers_batched, [
+                {
+                    "job_id": job["job_id"],
+                    "title": job["entities"]["title"],
+                    "authors": job["entities"]["authors"],
+                    "author_details": job["entities"].get("author_details"),
+                    "citations": job["entities"]["citations"],
+                    "references": job["entities"].get("references"),
+                    "full_text": job["full_text"]
+                }
+                for job in jobs
+            ])
+        monitor.record_success("neo4j")
+    except Exception as ne:
+        logger.error("Neo4j storage failed (non-fatal): %s", ne)
+        if isinstance(ne, (ServiceUnavailable, SessionExpired)):
+            monitor.record_failure("neo4j", ne)
+        results = [{"error": str(ne)}] * len(jobs)
+    for job, graph_result in zip(jobs, results):
+        job["graph_result"] = graph_result
+
+
+async def _vector_stage(job: dict):
+    """Pipeline stage 5: upsert the embedded chunks to the configured vector store."""
+    await _vector_batch_stage([job])
+
+
+async def _vector_batch_stage(jobs: list):
+    """Stage 5 for several papers: their chunks go to the vector store in one upsert."""
+    ready = []
+    for job in jobs:
+        prepared = job.get("vectors") or {}
+        if "vectors" in prepared:
+            ready.append(job)
+        else:
+            job["vector_result"] = prepared
+    if not ready:
+        return
+    monitor = get_health_monitor()
+    if not monitor.available("vector_store"):
+        vector_result = {"error": "Vector store unavailable (circuit open)", "upserted": 0}
+    else:
+        try:
+            with metrics.stage_timer("vectors", ready):
+                vector_result = await asyncio.to_thread(
+                    upsert_vectors, [v for job in ready for v in job["vectors"]["vectors"]]
+                )
         except Exception as ve:
-            logger.error("Pinecone upsert failed (non-fatal): %s", ve)
-            vector_result = {"error": str(ve)}
-
-        _jobs[job_id].update({
-            "status": "completed",
-            "result": {
-                "title": entities["title"],
-                "authors": entities["authors"],
-                "citations_count": len(entities["citations"]),
-                "graph_storage": graph_result,
-                "vector_storage": vector_result
-            }
+            logger.error("Vector upsert failed (non-fatal): %s", ve)
+            vector_result = {"error": str(ve), "upserted": 0}
+        if "error" in vector_result:
+            monitor.record_failure("vector_store", vector_result["error"])
+        else:
+            monitor.record_success("vector_store")
+    for job in ready:
+        if "error" in vector_result:
+            job["vector_result"] = dict(vector_result)
+        else:
+            job["vector_result"] = {"upserted": len(job["vectors"]["vectors"]),
+                                    "chunks": job["vectors"]["chunks"]}
+
+
+def _finish_timings(job: dict, status: str) -> dict:
+    """The job's per-step timings (ms) plus total_ms; feeds the job metrics."""
+    timings = job.get("timings", {})
+    if "started_at" in job:
+        elapsed = time.perf_counter() - job["started_at"]
+        timings["total_ms"] = round(elapsed * 1000, 2)
+        metrics.JOB_SECONDS.observe(elapsed, status)
+    metrics.JOBS.inc(status)
+    return timings
+
+
+async def _complete_job(job: dict):
+    entities = job["entities"]
+    result = {
+        "title": entities["title"],
+        "authors": entities["authors"],
+        "citations_count": len(entities["citations"]),
+        "graph_storage": job.get("graph_result"),
+        "vector_storage": job.get("vector_result"),
+        "timings": _finish_timings(job, "completed")
+    }
+    await asyncio.to_thread(get_job_store().update, job["job_id"], status="completed", result=result)
+    logger.info("Job %s completed: %s", job["job_id"], entities["title"])
+
+    # Only a fully stored paper may short-circuit later uploads of the same bytes
+    graph_result, vector_result = result["graph_storage"], result["vector_storage"]
+    stored = (graph_result and "error" not in graph_result
+              and vector_result and "error" not in vector_result)
+    if job.get("sha256") and stored:
+        await asyncio.to_thread(
+            get_artifact_cache().put_json, job["sha256"], "result.json",
+            {"job_id": job["job_id"], "filename": job["filename"], "result": result}
+        )
+    _cleanup_job(job)
+
+
+async def _fail_job(job: dict, error: Exception):
+    logger.error("Job %s failed: %s", job["job_id"], str(error), exc_info=error)
+    _finish_timings(job, "failed")
+    await asyncio.to_thread(get_job_store().update, job["job_id"], status="failed", error=str(error))
+    _cleanup_job(job)
+
+
+def _cleanup_job(job: dict):
+    temp_path = job.get("temp_path")
+    if temp_path and os.path.exists(temp_path):
+        os.remove(temp_path)
+
+
+def _needs_marker(job: dict) -> bool:
+    return bool(job.get("needs_marker"))
+
+
+# name, per-job handler, handler for a group of jobs (None = one at a time),
+# which jobs the stage takes (None = all; others skip straight to the next stage)
+_PIPELINE_STAGES = (
+    ("extract", _extract_stage, None, None),
+    ("marker", _marker_stage, _marker_batch_stage, _needs_marker),
+    ("embed", _embed_stage, None, None),
+    ("graph", _graph_stage, _graph_batch_stage, None),
+    ("vectors", _vector_stage, _vector_batch_stage, None),
+)
+
+
+def _build_scheduler() -> IngestScheduler:
+    """Build the ingestion pipeline from the "pipeline" section of config.json."""
+    cfg = get_section("pipeline")
+    stages = []
+    for name, handler, batch_handler, accepts in _PIPELINE_STAGES:
+        workers = env_int(f"PIPELINE_{name.upper()}_WORKERS", cfg.get(f"{name}_workers", 1))
+        batch_size = env_int(f"PIPELINE_{name.upper()}_BATCH_SIZE", cfg.get(f"{name}_batch_size", 1))
+        stages.append(Stage(name, handler, workers=workers,
+                            queue_size=cfg.get("queue_size", 20),
+                            batch_handler=batch_handler, batch_size=batch_size,
+                            batch_wait=cfg.get("batch_wait_ms", 50) / 1000.0,
+                            accepts=accepts))
+    return IngestScheduler(
+        stages,
+        on_complete=_complete_job,
+        on_error=_fail_job,
+        retry_after=cfg.get("retry_after_seconds", 30)
+    )
+
+
+scheduler = _build_scheduler()
+
+
+def _register_gauges():
+    """Scrape-time gauges for the pipeline queues and dependency health."""
+    def per_stage(field):
+        return lambda: {(name,): stage[field] for name, stage in scheduler.stats()["stages"].items()}
+
+    def per_dependency(read):
+        return lambda: {(name,): read(dep) for name, dep in get_health_monitor().status().items()}
+
+    metrics.REGISTRY.gauge("pipeline_queue_depth", "Jobs waiting in each stage's queue",
+                           per_stage("queued"), ["stage"])
+    metrics.REGISTRY.gauge("pipeline_stage_busy", "Jobs each stage is working on",
+                           per_stage("busy"), ["stage"])
+    metrics.REGISTRY.gauge("pipeline_in_flight", "Jobs queued or running anywhere in the pipeline",
+                           lambda: scheduler.stats()["in_flight"])
+    metrics.REGISTRY.gauge("dependency_up", "Last heartbeat result per dependency (1 up, 0 down)",
+                           per_dependency(lambda dep: int(dep["status"] == "up")), ["dependency"])
+    metrics.REGISTRY.gauge("dependency_circuit_open", "1 while a dependency's circuit breaker is not closed",
+                           per_dependency(lambda dep: int(dep["circuit"] != "closed")), ["dependency"])
+    metrics.REGISTRY.gauge("dependency_heartbeat_seconds", "Latency of the last heartbeat per dependency",
+                           per_dependency(lambda dep: dep["latency_ms"] and dep["latency_ms"] / 1000),
+                           ["dependency"])
+
+
+_register_gauges()
+
+
+async def _resume_jobs():
+    """
+    Re-queue jobs a previous process left queued/processing. Jobs whose
+    uploaded PDF is gone cannot be resumed and are marked failed.
+    """
+    store = get_job_store()
+    retention_days = env_int("JOB_RETENTION_DAYS", 0)
+    if retention_days > 0:
+        pruned = await asyncio.to_thread(store.prune, retention_days * 86400)
+        if pruned:
+            logger.info("Pruned %d finished jobs older than %d days", pruned, retention_days)
+
+    for stored in await asyncio.to_thread(store.unfinished):
+        temp_path = stored.get("temp_path")
+        if not temp_path or not os.path.exists(temp_path):
+            await asyncio.to_thread(store.update, stored["job_id"], status="failed",
+                                    error="Interrupted by restart; uploaded PDF no longer available")
+            continue
+        logger.info("Resuming job %s (%s)", stored["job_id"], stored["filename"])
+        await asyncio.to_thread(store.update, stored["job_id"], status="queued")
+        await scheduler.submit_wait({
+            "job_id": stored["job_id"], "temp_path": temp_path,
+            "filename": stored["filename"], "sha256": stored["sha256"],
+            "batch_id": stored.get("batch_id")
         })
-        logger.info("Job %s completed: %s", job_id, entities["title"])
 
-    except Exception as e:
-        logger.error("Job %s failed: %s", job_id, str(e), exc_info=True)
-        _jobs[job_id].update({"status": "failed", "error": str(e)})
-    finally:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+
+def _format_limit(limit: int) -> str:
+    """A byte limit for error messages: whole MB rounded up, or bytes below 1 MB."""
+    if limit < 1024 * 1024:
+        return f"{limit} byte"
+    return f"{-(-limit // (1024 * 1024))} MB"
+
+
+async def _save_upload(upload: UploadFile, dest_path: str, max_bytes: int) -> str:
+    """
+    Copy an upload to dest_path in UPLOAD_CHUNK_BYTES blocks without blocking
+    the event loop, hashing in the same pass. Returns the SHA-256 hex digest.
+    Raises 413 (and removes the partial file) once max_bytes is exceeded.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(dest_path, "wb") as buffer:
+            while True:
+                block = await upload.read(UPLOAD_CHUNK_BYTES)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File exceeds the {_format_limit(max_bytes)} upload limit"
+                    )
+                digest.update(block)
+                await asyncio.to_thread(buffer.write, block)
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+    return digest.hexdigest()
+
+
+# Multipart framing around a single file: boundaries, part headers, other fields
+MULTIPART_SLACK_BYTES = 64 * 1024
+
+
+class RequestTooLarge(HTTPException):
+    """Raised from the request body stream once it passes the upload limit."""
+
+    def __init__(self, limit: int):
+        super().__init__(status_code=413,
+                         detail=f"Request body exceeds the {_format_limit(limit)} upload limit")
+
+
+class UploadLimitMiddleware:
+    """
+    Caps upload request bodies before anything parses them. limits maps a
+    POST path to its upload limit; the body may exceed it by
+    MULTIPART_SLACK_BYTES of framing. A larger Content-Length is refused
+    outright, and a body that streams past the limit (no Content-Length, or
+    a false one) is cut off with 413 as soon as it does, before the
+    multipart parser spools the rest to disk.
+    """
+
+    def __init__(self, app, limits: dict):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = None
+        if scope["type"] == "http" and scope["method"] == "POST":
+            limit = self.limits.get(scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        max_body = limit + MULTIPART_SLACK_BYTES
+
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > max_body:
+            await self._reject(scope, receive, send, limit)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body:
+                    # An HTTPException: FastAPI passes it through form parsing as-is
+                    raise RequestTooLarge(limit)
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestTooLarge:
+            if response_started:
+                raise
+            await self._reject(scope, receive, send, limit)
+
+    @staticmethod
+    async def _reject(scope, receive, send, limit: int):
+        error = RequestTooLarge(limit)
+        response = JSONResponse({"detail": error.detail}, status_code=413,
+                                headers={"Connection": "close"})
+        await response(scope, receive, send)
+
+
+app.add_middleware(UploadLimitMiddleware, limits={
+    "/ingest": MAX_UPLOAD_BYTES,
+    "/ingest/batch": MAX_BATCH_BYTES,
+})
+
+
+def _find_duplicate(sha256: str, filename: str) -> Optional[dict]:
+    """
+    Return an ingest response for already-known content, or None. A cached
+    result whose job is no longer in the job store (pruned, or a store that
+    was reset) is not returned: its job_id would 404, so the PDF is ingested
+    again, reusing the cached artifacts.
+    """
+    store = get_job_store()
+    active = store.find_active_by_hash(sha256)
+    if active:
+        return {"job_id": active["job_id"], "status": active["status"],
+                "filename": filename, "deduplicated": True}
+    previous = get_artifact_cache().get_json(sha256, "result.json")
+    if previous and store.get(previous["job_id"]) is not None:
+        return {"job_id": previous["job_id"], "status": "completed", "filename": filename,
+                "deduplicated": True, "result": previous["result"]}
+    return None
 
 
 @app.post("/ingest", status_code=202)
-async def ingest(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+async def ingest(file: UploadFile = File(...), force: bool = False):
     """
     Queue a PDF for ingestion. Returns immediately with a job_id.
     Poll GET /jobs/{job_id} for status.
+    Identical PDF bytes short-circuit to the existing job unless force=true;
+    forced re-ingests still reuse cached GROBID/Marker artifacts.
+    Returns 429 with Retry-After when the ingestion pipeline is saturated and
+    413 when the file is larger than MAX_UPLOAD_BYTES.
     """
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="File must be a PDF")
 
+    if scheduler.is_full():
+        raise HTTPException(
+            status_code=429,
+            detail="Ingestion queue is full, retry later",
+            headers={"Retry-After": str(scheduler.retry_after)}
+        )
+
     job_id = str(uuid.uuid4())
-    temp_path = os.path.join("/tmp", job_id + ".pdf")
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    temp_path = os.path.join(UPLOAD_DIR, job_id + ".pdf")
 
-    with open(temp_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    sha256 = await _save_upload(file, temp_path, MAX_UPLOAD_BYTES)
 
-    _jobs[job_id] = {"status": "queued", "filename": file.filename}
-    background_tasks.add_task(_process_pdf, job_id, temp_path, file.filename)
+    if not force:
+        duplicate = await asyncio.to_thread(_find_duplicate, sha256, file.filename)
+        if duplicate:
+            os.remove(temp_path)
+            return duplicate
+
+    job = {"job_id": job_id, "temp_path": temp_path, "filename": file.filename, "sha256": sha256}
+    await asyncio.to_thread(get_job_store().create, job_id, file.filename, sha256, temp_path)
+    try:
+        scheduler.submit(job)
+    except QueueFullError as e:
+        _cleanup_job(job)
+        await asyncio.to_thread(get_job_store().delete, job_id)
+        raise HTTPException(
+            status_code=429,
+            detail="Ingestion queue is full, retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
 
     return {"job_id": job_id, "status": "queued", "filename": file.filename}
 
 
+def _is_pdf_member(name: str) -> bool:
+    base = os.path.basename(name)
+    return (base.lower().endswith(".pdf") and not base.startswith("._")
+            and "__MACOSX/" not in name)
+
+
+def _extract_archive_pdfs(archive_path: str, archive_name: str, max_files: int) -> List[dict]:
+    """
+    Stream every PDF member of a zip/tar archive into UPLOAD_DIR, hashing as
+    it copies. Member names are only used as display filenames, never as paths.
+    """
+    extracted: List[dict] = []
+
+    def copy_member(src, name: str):
+        if len(extracted) >= max_files:
+            raise HTTPException(status_code=413,
+                                detail=f"Batch exceeds {MAX_BATCH_FILES} PDFs")
+        job_id = str(uuid.uuid4())
+        entry = {"job_id": job_id, "filename": os.path.basename(name),
+                 "temp_path": os.path.join(UPLOAD_DIR, job_id + ".pdf")}
+        extracted.append(entry)
+        digest = hashlib.sha256()
+        size = 0
+        with open(entry["temp_path"], "wb") as out:
+            for block in iter(lambda: src.read(UPLOAD_CHUNK_BYTES), b""):
+                size += len(block)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"{name} exceeds the {_format_limit(MAX_UPLOAD_BYTES)} upload limit"
+                    )
+                digest.update(block)
+                out.write(block)
+        entry["sha256"] = digest.hexdigest()
+
+    try:
+        if archive_name.lower().endswith(".zip"):
+            with zipfile.ZipFile(archive_path) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir() and _is_pdf_member(info.filename):
+                        with archive.open(info) as src:
+                            copy_member(src, info.filename)
+        else:
+            with tarfile.open(archive_path, "r:*") as archive:
+                for member in archive:
+                    if member.isfile() and _is_pdf_member(member.name):
+                        with archive.extractfile(member) as src:
+                            copy_member(src, member.name)
+    except BaseException as e:
+        for entry in extracted:
+            if os.path.exists(entry["temp_path"]):
+                os.remove(entry["temp_path"])
+        if isinstance(e, (zipfile.BadZipFile, tarfile.TarError, EOFError)):
+            raise HTTPException(status_code=400, detail=f"Unreadable archive {archive_name}: {e}")
+        raise
+    return extracted
+
+
+async def _feed_batch(jobs: List[dict]):
+    """Hand batch jobs to the pipeline as room frees up in the first stage."""
+    for job in jobs:
+        await scheduler.submit_wait(dict(job))
+
+
+@app.post("/ingest/batch", status_code=202)
+async def ingest_batch(files: List[UploadFile] = File(...), force: bool = False):
+    """
+    Queue many PDFs at once: any mix of PDF files and zip/tar archives of PDFs.
+    Returns a batch_id plus one job_id per PDF; poll GET /batches/{batch_id}
+    for aggregate progress. Files already ingested (or repeated within the
+    batch) are reported under duplicates instead of being queued, unless force=true.
+    """
+    for upload in files:
+        name = (upload.filename or "").lower()
+        if not (name.endswith(".pdf") or name.endswith(ARCHIVE_SUFFIXES)):
+            raise HTTPException(status_code=400,
+                                detail=f"{upload.filename}: expected a PDF or a zip/tar archive")
+
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    batch_id = str(uuid.uuid4())
+    saved: List[dict] = []
+    try:
+        for upload in files:
+            if upload.filename.lower().endswith(".pdf"):
+                if len(saved) >= MAX_BATCH_FILES:
+                    raise HTTPException(status_code=413,
+                                        detail=f"Batch exceeds {MAX_BATCH_FILES} PDFs")
+                job_id = str(uuid.uuid4())
+                temp_path = os.path.join(UPLOAD_DIR, job_id + ".pdf")
+                sha256 = await _save_upload(upload, temp_path, MAX_UPLOAD_BYTES)
+                saved.append({"job_id": job_id, "filename": upload.filename,
+                              "temp_path": temp_path, "sha256": sha256})
+                continue
+            archive_path = os.path.join(UPLOAD_DIR, f"{batch_id}-{len(saved)}.archive")
+            await _save_upload(upload, archive_path, MAX_BATCH_BYTES)
+            try:
+                saved.extend(await asyncio.to_thread(
+                    _extract_archive_pdfs, archive_path, upload.filename,
+                    MAX_BATCH_FILES - len(saved)
+                ))
+            finally:
+                os.remove(archive_path)
+    except BaseException:
+        for entry in saved:
+            if os.path.exists(entry["temp_path"]):
+                os.remove(entry["temp_path"])
+        raise
+    if not saved:
+        raise HTTPException(status_code=400, detail="No PDFs found in the upload")
+
+    jobs, duplicates = [], []
+    queued_by_hash = {}
+    for entry in saved:
+        duplicate = None
+        if entry["sha256"] in queued_by_hash:
+            duplicate = {"job_id": queued_by_hash[entry["sha256"]], "status": "queued"}
+        elif not force:
+            duplicate = await asyncio.to_thread(_find_duplicate, entry["sha256"], entry["filename"])
+        if duplicate:
+            os.remove(entry["temp_path"])
+            duplicates.append({"filename": entry["filename"], "job_id": duplicate["job_id"],
+                               "status": duplicate["status"]})
+            continue
+        queued_by_hash[entry["sha256"]] = entry["job_id"]
+        jobs.append({**entry, "batch_id": batch_id})
+
+    await asyncio.to_thread(get_job_store().create_batch, batch_id, jobs, duplicates)
+    _spawn(_feed_batch(jobs))
+    return {
+        "batch_id": batch_id,
+        "total": len(jobs),
+        "jobs": [{"job_id": j["job_id"], "filename": j["filename"]} for j in jobs],
+        "duplicates": duplicates
+    }
+
+
+@app.get("/batches/{batch_id}")
+async def get_batch(batch_id: str):
+    """Aggregate progress of a batch: done, failed, throughput, ETA and per-file jobs."""
+    batch = await asyncio.to_thread(get_job_store().get_batch, batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    return batch
+
+
 @app.get("/jobs/{job_id}")
 async def get_job(job_id: str):
     """Check the status of an ingestion job."""
-    job = _jobs.get(job_id)
+    job = await asyncio.to_thread(get_job_store().get, job_id)
     if not job:
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
-    return {"job_id": job_id, **job}
+    return job
 
 
 @app.get("/jobs")
-async def list_jobs():
-    """List all jobs and their statuses."""
+async def list_jobs(status: Optional[str] = None, limit: int = 100, cursor: Optional[int] = None):
+    """
+    List jobs newest first, optionally filtered by status.
+    Pass next_cursor back as cursor to fetch the following page.
+    """
+    if status and status not in STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(STATUSES)}")
+    limit = max(1, min(limit, 1000))
+    store = get_job_store()
+    jobs, next_cursor = await asyncio.to_thread(store.list, status, limit, cursor)
+    summary = await asyncio.to_thread(store.counts)
     return {
-        "jobs": [{"job_id": jid, **info} for jid, info in _jobs.items()],
-        "total": len(_jobs),
-        "summary": {
-            "queued": sum(1 for j in _jobs.values() if j["status"] == "queued"),
-            "processing": sum(1 for j in _jobs.values() if j["status"] == "processing"),
-            "completed": sum(1 for j in _jobs.values() if j["status"] == "completed"),
-            "failed": sum(1 for j in _jobs.values() if j["status"] == "failed"),
-        }
+        "jobs": jobs,
+        "total": sum(summary.values()),
+        "summary": summary,
+        "next_cursor": next_cursor
     }
 
 
@@ -223,51 +968,27 @@ def extract_entities_from_markdown(markdown: str, filename: str) -> dict:
     return {"title": title, "authors": [], "citations": []}
 
 
+def extract_tei(xml_out: str) -> tuple:
+    """Parse GROBID TEI XML once. Returns (entities, full_text)."""
+    tei = parse_tei(xml_out)
+    entities = {
+        "title": tei["title"],
+        "authors": [a["name"] for a in tei["authors"]],
+        "author_details": tei["authors"],
+        "citations": [r["title"] for r in tei["references"]],
+        "references": tei["references"],
+    }
+    return entities, tei["full_text"]
+
+
 def extract_full_text_from_tei(xml_out: str) -> str:
     """Extract full document body text from GROBID TEI XML."""
-    soup = BeautifulSoup(xml_out, 'xml')
-    body = soup.find('body')
-    if not body:
-        return ""
-    # Get all paragraph text, preserving section structure via div/head
-    parts = []
-    for elem in body.find_all(['head', 'p']):
-        txt = elem.get_text(separator=' ', strip=True)
-        if txt:
-            parts.append("## " + txt + "\n" if elem.name == 'head' else txt + "\n")
-    return "\n".join(parts).strip() if parts else body.get_text(separator='\n', strip=True)
+    return parse_tei(xml_out)["full_text"]
 
 
 def extract_entities(xml_out):
-    """Extract title, authors, and citations from GROBID XML output."""
-    soup = BeautifulSoup(xml_out, 'xml')
-
-    title = "Unknown Title"
-    title_stmt = soup.find('titleStmt')
-    if title_stmt:
-        title_elem = title_stmt.find('title')
-        if title_elem and title_elem.text:
-            title = title_elem.text.strip()
-
-    authors = []
-    for author in soup.find_all('author'):
-        pers_name = author.find('persName')
-        if pers_name:
-            first = pers_name.find('forename', type='first')
-            last = pers_name.find('surname')
-            first_text = first.get_text(strip=True) if first else ''
-            last_text = last.get_text(strip=True) if last else ''
-            full_name = f"{first_text} {last_text}".strip()
-            if full_name:
-                authors.append(full_name)
-
-    citations = []
-    for cite in soup.find_all('biblStruct'):
-        c_title = cite.find('title', level='a') or cite.find('title', level='m')
-        if c_title and c_title.text:
-            citations.append(c_title.get_text(strip=True))
-
-    return {"title": title, "authors": authors, "citations": citations}
+    """Extract title, header authors, and citations from GROBID XML output."""
+    return extract_tei(xml_out)[0]
 
 
 @app.get("/debug/marker")
@@ -301,44 +1022,72 @@ async def debug_grobid():
         return {"url": grobid_url, "error": str(e)}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint (text exposition format)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/health")
 async def health():
-    """Health check endpoint."""
-    neo4j_status = "disconnected"
-    try:
-        neo4j = get_neo4j_service()
-        if neo4j.verify_connection():
-            neo4j_status = "connected"
-    except Exception:
-        pass
-    return {"status": "healthy", "neo4j": neo4j_status}
+    """
+    Health check endpoint. Dependency status comes from the background
+    heartbeats (latency and age of the last good check), not a live probe;
+    Marker, unless MARKER_HEARTBEAT is set, reports its last real call.
+    """
+    monitor = get_health_monitor()
+    return {
+        "status": "healthy",
+        "neo4j": "connected" if monitor.is_up("neo4j") else "disconnected",
+        "dependencies": monitor.status(),
+        "pipeline": scheduler.stats(),
+        "artifact_cache": get_artifact_cache().stats(),
+        "embedding_cache": get_embedding_cache().stats(),
+        "search_cache": query_cache.stats()
+    }
+
+
+def _graph_service():
+    """The async graph service, or an immediate 503 while Neo4j's circuit is open."""
+    if not get_health_monitor().available("neo4j"):
+        raise HTTPException(status_code=503, detail="Neo4j not connected")
+    return get_async_neo4j_service()
+
+
+def _graph_unavailable(error: Exception) -> HTTPException:
+    get_health_monitor().record_failure("neo4j", error)
+    return HTTPException(status_code=503, detail="Neo4j not connected")
 
 
 @app.get("/papers")
-async def get_papers(limit: int = 100):
-    """Get all ingested papers from the knowledge graph."""
+async def get_papers(limit: int = 100, cursor: Optional[str] = None):
+    """
+    List ingested papers newest first (citation placeholders are excluded).
+    Pass next_cursor back as cursor to fetch the following page.
+    """
+    limit = max(1, min(limit, 1000))
     try:
-        neo4j = get_neo4j_service()
-        if not neo4j.verify_connection():
-            raise HTTPException(status_code=503, detail="Neo4j not connected")
-        papers = neo4j.get_all_papers(limit=limit)
-        return {"papers": papers, "count": len(papers)}
+        papers, next_cursor = await _graph_service().list_papers(limit=limit, cursor=cursor)
+        return {"papers": papers, "count": len(papers), "next_cursor": next_cursor}
     except HTTPException:
         raise
+    except (ServiceUnavailable, SessionExpired) as e:
+        raise _graph_unavailable(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/papers/{title}")
-async def get_paper(title: str):
+async def get_paper(title: str, include_text: bool = False):
+    """Paper details; full text is loaded from the blob store only with include_text=true."""
     try:
-        neo4j = get_neo4j_service()
-        if not neo4j.verify_connection():
-            raise HTTPException(status_code=503, detail="Neo4j not connected")
-        paper = neo4j.get_paper_by_title(title)
-        return paper
+        return await _graph_service().get_paper_by_title(title, include_text=include_text)
     except HTTPException:
         raise
+    except (ServiceUnavailable, SessionExpired) as e:
+        raise _graph_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -347,12 +1096,27 @@ async def get_paper(title: str):
 async def get_related_papers(title: str):
     """Find papers related to the given paper."""
     try:
-        neo4j = get_neo4j_service()
-        if not neo4j.verify_connection():
-            raise HTTPException(status_code=503, detail="Neo4j not connected")
-        related_papers = neo4j.find_related_papers(title)
+        related_papers = await _graph_service().find_related_papers(title)
         return {"related_papers": related_papers}
     except HTTPException:
         raise
+    except (ServiceUnavailable, SessionExpired) as e:
+        raise _graph_unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/search")
+async def search_papers(q: str, top_k: int = 5, paper_id: Optional[str] = None,
+                        section: Optional[str] = None, deadline_ms: Optional[int] = None):
+    """
+    Hybrid GraphRAG search: vector hits fused with their Neo4j neighbourhood.
+    Returns ranked context blocks and per-stage timings. If the deadline is hit,
+    whatever finished is returned with partial=true (vector-only if the graph is slow).
+    """
+    filters = {k: v for k, v in (("paper_id", paper_id), ("section", section)) if v}
+    try:
+        return await hybrid_search(q, top_k=top_k, filters=filters or None,
+                                   deadline_ms=deadline_ms)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
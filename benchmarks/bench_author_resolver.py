@@ -0,0 +1,103 @@
+"""
+Benchmark: author resolution cost and accuracy at a large index.
+Loads an AuthorResolver with synthetic authors (500k by default; surnames
+are Zipf-distributed so a few blocks, like real "Wang, Y." blocks, are
+huge), each with an affiliation and co-authors. Then resolves papers whose
+author lists use other spellings ("J. Doe", "Doe, John") alongside a known
+co-author or the author's affiliation, plus papers of brand-new authors.
+
+Reports ms per paper and how often a variant reached the right author
+(recall) or a new author was merged into an existing one (false merges).
+
+    python -m benchmarks.bench_author_resolver --authors 500000
+"""
+import argparse
+import random
+import statistics
+import string
+import time
+
+from services.author_resolver import AuthorResolver
+
+AFFILIATIONS = ["MIT CSAIL", "Stanford University", "Tsinghua University", "ETH Zurich",
+                "University of Oxford", "Google Research", "Microsoft Research",
+                "Carnegie Mellon University", "University of Toronto", "INRIA Paris",
+                "Max Planck Institute for Informatics", "Peking University", "KAIST",
+                "University of Tokyo", "EPFL", "University of Cambridge"]
+
+
+def random_word(rng: random.Random, low: int, high: int) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(low, high))).capitalize()
+
+
+def make_authors(rng: random.Random, count: int):
+    surnames = [random_word(rng, 3, 9) for _ in range(max(count // 25, 100))]
+    forenames = [random_word(rng, 3, 8) for _ in range(3000)]
+    weights = [1 / (i + 1) for i in range(len(surnames))]
+    rows, seen = [], set()
+    while len(rows) < count:
+        for surname in rng.choices(surnames, weights, k=count - len(rows)):
+            name = f"{rng.choice(forenames)} {surname}"
+            if name not in seen:
+                seen.add(name)
+                rows.append({"name": name, "affiliation": rng.choice(AFFILIATIONS), "coauthors": []})
+    for row in rows:
+        row["coauthors"] = [rows[rng.randrange(count)]["name"] for _ in range(rng.randint(1, 6))]
+    return rows, surnames, forenames
+
+
+def variant(rng: random.Random, name: str) -> str:
+    first, last = name.split(" ", 1)
+    return rng.choice((f"{first[0]}. {last}", f"{last}, {first}", f"{last}, {first[0]}."))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--authors", type=int, default=500000)
+    parser.add_argument("--papers", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    rows, surnames, forenames = make_authors(rng, args.authors)
+    resolver = AuthorResolver()
+    start = time.perf_counter()
+    resolver.load(rows)
+    stats = resolver.stats()
+    print(f"Indexed {stats['authors']} authors in {stats['blocks']} blocks "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    latencies, hits, variants, false_merges, fresh = [], 0, 0, 0, 0
+    for i in range(args.papers):
+        if i % 4 == 3:
+            # New people: surnames never seen before
+            mentions = [f"{rng.choice(forenames)} Zz{random_word(rng, 6, 8)}" for _ in range(4)]
+            expected = [None] * len(mentions)
+        else:
+            target = rows[rng.randrange(len(rows))]
+            evidence = rng.choice(("coauthor", "affiliation"))
+            mentions = [{"name": variant(rng, target["name"]),
+                         "affiliation": target["affiliation"] if evidence == "affiliation" else None}]
+            expected = [target["name"]]
+            if evidence == "coauthor":
+                mentions.append(target["coauthors"][0])
+                expected.append(target["coauthors"][0])
+        start = time.perf_counter()
+        resolved = resolver.resolve_paper(mentions)
+        latencies.append((time.perf_counter() - start) * 1000)
+        for entry, want in zip(resolved, expected):
+            if want is None:
+                fresh += 1
+                false_merges += entry["match"] != "new"
+            else:
+                variants += 1
+                hits += entry["name"] == want
+
+    print(f"{args.papers} papers: {statistics.mean(latencies):.3f} ms/paper mean, "
+          f"p95 {sorted(latencies)[int(len(latencies) * 0.95)]:.3f} ms, "
+          f"max {max(latencies):.2f} ms")
+    print(f"recall {hits / max(variants, 1):.1%} of {variants} mentions, "
+          f"false merges {false_merges / max(fresh, 1):.2%} of {fresh} new authors")
+
+
+if __name__ == "__main__":
+    main()
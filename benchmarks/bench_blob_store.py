@@ -0,0 +1,161 @@
+"""
+Benchmark: Paper.full_text on the node vs in the blob store.
+Always reports the blob store's compression ratio and write/read speed on a
+synthetic (or --text-dir markdown) corpus. With Neo4j reachable it also
+ingests the corpus twice - once with full_text as a node property (the old
+layout) and once through Neo4jService (ref + size only) - and compares the
+/papers/{title} lookup latency and response size. Pass --store-dir (the
+Neo4j data directory, for a local instance) to also measure on-disk growth.
+
+    python -m benchmarks.bench_blob_store --papers 500 --store-dir /var/lib/neo4j/data
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+from services.blob_store import BlobStore
+
+LEGACY_PAPER_QUERY = """
+MATCH (p:Paper {title: $title})
+OPTIONAL MATCH (a:Author)-[:AUTHORED]->(p)
+RETURN p, collect(DISTINCT a.name) AS authors
+"""
+
+WORDS = ("graph neural network attention transformer dataset benchmark we propose "
+         "results show that our method improves over the baseline on the task of "
+         "retrieval augmented generation with citation context embeddings").split()
+
+
+def make_texts(papers: int, text_dir: str = None, seed: int = 7):
+    """Markdown files from text_dir, or synthetic ~40 KB papers."""
+    if text_dir:
+        texts = []
+        for path in sorted(glob.glob(os.path.join(text_dir, "*.md")))[:papers]:
+            with open(path, encoding="utf-8") as f:
+                texts.append(f.read())
+        if texts:
+            return texts
+    rng = random.Random(seed)
+    return [
+        "\n\n".join(f"## Section {s}\n\n" + " ".join(rng.choices(WORDS, k=700))
+                    for s in range(8))
+        for _ in range(papers)
+    ]
+
+
+def dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def bench_blobs(texts, codec: str):
+    with tempfile.TemporaryDirectory() as root:
+        store = BlobStore(root, codec=codec)
+        start = time.perf_counter()
+        refs = [store.put_text(t) for t in texts]
+        write = time.perf_counter() - start
+        start = time.perf_counter()
+        for ref in refs:
+            store.get_text(ref["ref"])
+        read = time.perf_counter() - start
+    raw = sum(r["size"] for r in refs)
+    stored = sum(r["stored_bytes"] for r in refs)
+    print(f"{codec:>5}: {raw / 1e6:.1f} MB -> {stored / 1e6:.1f} MB "
+          f"(ratio {raw / max(stored, 1):.1f}x), write {write / len(texts) * 1000:.2f} ms/paper, "
+          f"read {read / len(texts) * 1000:.2f} ms/paper")
+
+
+def time_lookups(fn, titles, repeats: int):
+    latencies, size = [], 0
+    for _ in range(repeats):
+        for title in titles:
+            start = time.perf_counter()
+            payload = fn(title)
+            latencies.append((time.perf_counter() - start) * 1000)
+            size = len(json.dumps(payload, default=str))
+    return statistics.median(latencies), sorted(latencies)[int(len(latencies) * 0.95) - 1], size
+
+
+def bench_neo4j(texts, store_dir: str, repeats: int):
+    from services.neo4j_service import Neo4jService
+
+    neo4j = Neo4jService().connect()
+    if not neo4j.verify_connection():
+        print("Neo4j not reachable; skipping the store size / lookup comparison")
+        return
+
+    for layout in ("legacy", "blob"):
+        run_id = f"bench-{uuid.uuid4().hex[:8]}"
+        papers = [{"job_id": f"{run_id}-{i}", "title": f"{run_id} Paper {i}",
+                   "authors": [f"{run_id} Author {i % 50}"], "citations": [],
+                   "full_text": text} for i, text in enumerate(texts)]
+        before = dir_size(store_dir) if store_dir else 0
+        try:
+            if layout == "legacy":
+                with neo4j.driver.session() as session:
+                    session.run("""
+                        UNWIND $papers AS paper
+                        CREATE (p:Paper {title: paper.title, job_id: paper.job_id,
+                                         full_text: paper.full_text})
+                        MERGE (a:Author {name: paper.authors[0]})
+                        MERGE (a)-[:AUTHORED]->(p)
+                    """, papers=papers)
+
+                def lookup(title):
+                    with neo4j.driver.session() as session:
+                        record = session.run(LEGACY_PAPER_QUERY, title=title).single()
+                        return {**dict(record["p"]), "authors": record["authors"]}
+            else:
+                for i in range(0, len(papers), 50):
+                    neo4j.ingest_papers_batched(papers[i:i + 50])
+                lookup = neo4j.get_paper_by_title
+
+            growth = dir_size(store_dir) - before if store_dir else None
+            titles = [p["title"] for p in papers[:100]]
+            p50, p95, size = time_lookups(lookup, titles, repeats)
+            disk = f", store +{growth / 1e6:.1f} MB" if growth is not None else ""
+            print(f"{layout:>6}: lookup p50 {p50:.2f} ms, p95 {p95:.2f} ms, "
+                  f"response {size / 1024:.1f} KB{disk}")
+        finally:
+            with neo4j.driver.session() as session:
+                session.run("""
+                    MATCH (n) WHERE (n:Paper AND n.title STARTS WITH $prefix)
+                                 OR (n:Author AND n.name STARTS WITH $prefix)
+                    DETACH DELETE n
+                """, prefix=run_id)
+    neo4j.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--papers", type=int, default=500)
+    parser.add_argument("--text-dir", default=None, help="Directory of .md papers to use as text")
+    parser.add_argument("--store-dir", default=None, help="Neo4j data directory (local instance)")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--no-neo4j", action="store_true")
+    args = parser.parse_args()
+
+    texts = make_texts(args.papers, args.text_dir)
+    for codec in ("gzip", "zstd"):
+        try:
+            bench_blobs(texts, codec)
+        except ValueError as e:
+            print(f"{codec:>5}: skipped ({e})")
+    if not args.no_neo4j:
+        bench_neo4j(texts, args.store_dir, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: citation resolution latency vs index size, and match quality.
+Grows a CitationResolver index with synthetic reference titles and, at each
+checkpoint, times resolving a fresh batch of citations: exact repeats,
+noisy variants (case, punctuation, typos, truncation) and unseen titles.
+Also reports how many noisy variants resolved to their original key
+(recall) and how many unseen titles were wrongly merged (false merges).
+
+    python -m benchmarks.bench_citation_resolver --references 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from services.citation_resolver import CitationResolver
+
+VOCAB = ("learning deep neural network graph attention transformer language model "
+         "representation efficient scalable robust adversarial generative retrieval "
+         "reinforcement policy optimization convolutional recurrent memory sparse "
+         "self-supervised contrastive pretraining multimodal vision speech translation "
+         "question answering knowledge embedding inference bayesian variational "
+         "diffusion segmentation detection classification benchmark dataset analysis "
+         "towards understanding improving via with for of on in and a the").split()
+
+
+def make_title(rng: random.Random, i: int) -> str:
+    words = rng.choices(VOCAB, k=rng.randint(5, 11))
+    # A distinctive token keeps synthetic titles from colliding by construction
+    words.insert(rng.randint(0, len(words)), f"{chr(97 + i % 26)}{i:x}net")
+    return " ".join(words).capitalize()
+
+
+def noisy(rng: random.Random, title: str) -> str:
+    kind = rng.choice(("case", "punct", "typo", "truncate"))
+    if kind == "case":
+        return title.upper() if rng.random() < 0.5 else title.title()
+    if kind == "punct":
+        return title.replace(" ", ", ", 1) + "."
+    if kind == "typo":
+        i = rng.randrange(1, len(title) - 1)
+        return title[:i] + title[i + 1:]
+    return title[:int(len(title) * 0.92)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--references", type=int, default=200000)
+    parser.add_argument("--checkpoints", type=int, default=5)
+    parser.add_argument("--probe", type=int, default=2000, help="Citations timed per checkpoint")
+    parser.add_argument("--batch", type=int, default=50, help="References per resolve_many call")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        resolver = CitationResolver(os.path.join(tmp, "citations.sqlite"))
+        titles, keys = [], []
+        step = max(args.references // args.checkpoints, 1)
+        print(f"{'indexed':>10} | {'ms/citation':>11} {'p95 ms':>8} | "
+              f"{'recall':>7} {'false merges':>12} | {'db MB':>6}")
+        while len(titles) < args.references:
+            batch = [{"title": make_title(rng, len(titles) + j)}
+                     for j in range(min(step, args.references - len(titles)))]
+            for i in range(0, len(batch), args.batch):
+                for entry in resolver.resolve_many(batch[i:i + args.batch]):
+                    keys.append(entry["key"])
+            titles.extend(ref["title"] for ref in batch)
+
+            # Probe: a third each of exact repeats, noisy variants and unseen titles
+            probe, expected = [], []
+            for j in range(args.probe):
+                kind = j % 3
+                if kind == 2:
+                    probe.append({"title": make_title(rng, 10 ** 9 + len(titles) + j)})
+                    expected.append(None)
+                else:
+                    idx = rng.randrange(len(titles))
+                    title = titles[idx] if kind == 0 else noisy(rng, titles[idx])
+                    probe.append({"title": title})
+                    expected.append(keys[idx])
+
+            latencies, hits, variants, false_merges, unseen = [], 0, 0, 0, 0
+            for ref, want in zip(probe, expected):
+                start = time.perf_counter()
+                entry = resolver.resolve(ref)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if want is None:
+                    unseen += 1
+                    false_merges += entry["match"] != "new"
+                else:
+                    variants += 1
+                    hits += entry["key"] == want
+            size = os.path.getsize(resolver.path) / 1e6
+            print(f"{len(titles):>10} | {statistics.mean(latencies):>11.3f} "
+                  f"{sorted(latencies)[int(len(latencies) * 0.95)]:>8.3f} | "
+                  f"{hits / variants:>7.1%} {false_merges / max(unseen, 1):>12.2%} | {size:>6.0f}")
+        resolver.close()
+
+
+if __name__ == "__main__":
+    main()
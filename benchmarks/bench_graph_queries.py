@@ -0,0 +1,185 @@
+"""
+Benchmark: paper detail / related-paper query latency vs node degree.
+Loads a synthetic graph (100k papers by default) whose citations, authors and
+methods follow a Zipf distribution, so a few papers, authors and methods are
+huge hubs. It then times the old OPTIONAL MATCH queries and the current
+Neo4jService.get_paper_by_title / find_related_papers for papers picked from
+the least-connected up to the biggest hubs.
+
+Uses the NEO4J_* settings from .env. Every synthetic node is prefixed with a
+run id and deleted afterwards (pass --keep to reuse the graph via --run-id).
+
+    python -m benchmarks.bench_graph_queries --papers 100000
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+from services.neo4j_service import Neo4jService
+
+LEGACY_DETAIL_QUERY = """
+MATCH (p:Paper {title: $title})
+OPTIONAL MATCH (a:Author)-[:AUTHORED]->(p)
+OPTIONAL MATCH (p)-[:CITES]->(cited:Paper)
+OPTIONAL MATCH (p)-[:USES_METHOD]->(m:Method)
+OPTIONAL MATCH (p)-[:USES_DATASET]->(d:Dataset)
+OPTIONAL MATCH (p)-[:ADDRESSES_TASK]->(t:Task)
+RETURN p,
+       collect(DISTINCT a.name) as authors,
+       collect(DISTINCT cited.title) as citations,
+       collect(DISTINCT m.name) as methods,
+       collect(DISTINCT d.name) as datasets,
+       collect(DISTINCT t.name) as tasks
+"""
+
+LEGACY_RELATED_QUERY = """
+MATCH (p:Paper {title: $title})
+OPTIONAL MATCH (p)<-[:AUTHORED]-(a:Author)-[:AUTHORED]->(related:Paper)
+WHERE related.title <> $title
+OPTIONAL MATCH (p)-[:USES_METHOD]->(m:Method)<-[:USES_METHOD]-(method_related:Paper)
+WHERE method_related.title <> $title
+OPTIONAL MATCH (p)-[:CITES]->(cited:Paper)
+OPTIONAL MATCH (citing:Paper)-[:CITES]->(p)
+WITH collect(DISTINCT related) + collect(DISTINCT method_related) +
+     collect(DISTINCT cited) + collect(DISTINCT citing) as all_related
+UNWIND all_related as r
+RETURN DISTINCT r.title as title, r.job_id as job_id
+LIMIT 20
+"""
+
+
+def zipf_index(rng: random.Random, n: int, s: float = 1.1) -> int:
+    """Index in [0, n) with P(i) roughly proportional to 1 / (i + 1)^s."""
+    while True:
+        i = int(rng.paretovariate(s - 1 if s > 1 else 0.1)) - 1
+        if i < n:
+            return i
+
+
+def load_graph(neo4j: Neo4jService, run_id: str, papers: int, refs: int, seed: int = 7,
+               chunk: int = 2000):
+    """Create the synthetic graph in chunks of `chunk` papers."""
+    rng = random.Random(seed)
+    authors = max(papers // 2, 1)
+    methods = 500
+    with neo4j.driver.session() as session:
+        for start in range(0, papers, chunk):
+            rows = []
+            for i in range(start, min(start + chunk, papers)):
+                rows.append({
+                    "title": f"{run_id} Paper {i}",
+                    "job_id": f"{run_id}-{i}",
+                    # Only earlier papers can be cited; low indices become hubs
+                    "cites": sorted({f"{run_id} Paper {zipf_index(rng, i)}"
+                                     for _ in range(refs if i else 0)}),
+                    "authors": sorted({f"{run_id} Author {zipf_index(rng, authors)}"
+                                       for _ in range(4)}),
+                    "methods": sorted({f"{run_id} Method {zipf_index(rng, methods)}"
+                                       for _ in range(3)}),
+                })
+            session.run("""
+                UNWIND $rows AS row
+                MERGE (p:Paper {title: row.title})
+                SET p.job_id = row.job_id, p.created_at = datetime()
+                WITH p, row
+                CALL { WITH p, row UNWIND row.authors AS name
+                       MERGE (a:Author {name: name}) MERGE (a)-[:AUTHORED]->(p) }
+                CALL { WITH p, row UNWIND row.methods AS name
+                       MERGE (m:Method {name: name}) MERGE (p)-[:USES_METHOD]->(m) }
+                CALL { WITH p, row UNWIND row.cites AS cited
+                       MATCH (c:Paper {title: cited}) MERGE (p)-[:CITES]->(c) }
+            """, rows=rows)
+            print(f"  loaded {min(start + chunk, papers)}/{papers} papers", end="\r")
+    print()
+
+
+def cleanup(neo4j: Neo4jService, run_id: str):
+    with neo4j.driver.session() as session:
+        for label, key in (("Paper", "title"), ("Author", "name"), ("Method", "name")):
+            session.run(f"""
+                MATCH (n:{label}) WHERE n.{key} STARTS WITH $prefix
+                CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF 5000 ROWS
+            """, prefix=run_id)
+
+
+def pick_by_degree(neo4j: Neo4jService, run_id: str, papers: int):
+    """Papers from the least to the most cited, with their total degree."""
+    samples = []
+    with neo4j.driver.session() as session:
+        for index in (papers - 1, papers // 2, 10000, 1000, 100, 10, 1, 0):
+            if index >= papers:
+                continue
+            record = session.run("""
+                MATCH (p:Paper {title: $title})
+                RETURN p.title AS title, COUNT { (p)--() } AS degree,
+                       COUNT { (p)<-[:CITES]-() } AS cited_by
+            """, title=f"{run_id} Paper {index}").single()
+            if record:
+                samples.append(dict(record))
+    return samples
+
+
+def time_query(fn, repeats: int) -> float:
+    fn()  # warm the page cache and query plan
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--papers", type=int, default=100000)
+    parser.add_argument("--refs", type=int, default=20, help="Citations per paper")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--legacy-timeout", type=float, default=30.0,
+                        help="Skip the old queries for remaining papers once one takes this long (s)")
+    parser.add_argument("--run-id", default=None, help="Reuse a graph loaded with --keep")
+    parser.add_argument("--keep", action="store_true", help="Do not delete the graph afterwards")
+    args = parser.parse_args()
+
+    neo4j = Neo4jService().connect()
+    if not neo4j.verify_connection():
+        raise SystemExit("Cannot connect to Neo4j. Check your connection settings.")
+
+    run_id = args.run_id or f"bench-{uuid.uuid4().hex[:8]}"
+    try:
+        if not args.run_id:
+            print(f"Loading {args.papers} papers as {run_id} ...")
+            start = time.perf_counter()
+            load_graph(neo4j, run_id, args.papers, args.refs)
+            print(f"Loaded in {time.perf_counter() - start:.0f}s")
+
+        def legacy(query, title):
+            with neo4j.driver.session() as session:
+                return session.run(query, title=title).data()
+
+        print(f"{'degree':>8} {'cited by':>9} | {'detail old':>10} {'new':>8} | "
+              f"{'related old':>11} {'new':>8}  (median ms)")
+        legacy_ok = True
+        for sample in pick_by_degree(neo4j, run_id, args.papers):
+            title = sample["title"]
+            detail_new = time_query(lambda: neo4j.get_paper_by_title(title), args.repeats)
+            related_new = time_query(lambda: neo4j.find_related_papers(title), args.repeats)
+            detail_old = related_old = None
+            if legacy_ok:
+                detail_old = time_query(lambda: legacy(LEGACY_DETAIL_QUERY, title), args.repeats)
+                related_old = time_query(lambda: legacy(LEGACY_RELATED_QUERY, title), args.repeats)
+                legacy_ok = max(detail_old, related_old) < args.legacy_timeout * 1000
+            fmt = lambda ms: f"{ms:.1f}" if ms is not None else "skipped"
+            print(f"{sample['degree']:>8} {sample['cited_by']:>9} | {fmt(detail_old):>10} "
+                  f"{fmt(detail_new):>8} | {fmt(related_old):>11} {fmt(related_new):>8}")
+    finally:
+        if not args.keep:
+            cleanup(neo4j, run_id)
+        else:
+            print(f"Graph kept; rerun with --run-id {run_id}")
+        neo4j.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: /health latency while PDFs are being parsed.
+Serves a fake GROBID through an httpx mock transport (each parse sleeps for
+--parse-seconds), submits --pdfs uploads to /ingest and polls /health the
+whole time. With the async GROBID client the p95 should match the idle p95;
+the run exits 1 if the p95 under load exceeds --max-ratio x the idle p95
+(floored at --min-budget-ms so sub-millisecond idle timings are not flaky).
+
+    python -m benchmarks.bench_health_under_load --pdfs 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+
+FAKE_TEI = """<?xml version="1.0" encoding="UTF-8"?>
+<TEI xmlns="http://www.tei-c.org/ns/1.0">
+  <teiHeader><fileDesc><titleStmt><title level="a" type="main">Fake Paper</title></titleStmt></fileDesc></teiHeader>
+  <text><body><div><head>Introduction</head><p>{body}</p></div></body></text>
+</TEI>""".format(body="This is a synthetic paragraph used by the benchmark. " * 20)
+
+
+def fake_grobid_transport(parse_seconds: float) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/api/isalive"):
+            return httpx.Response(200, text="true")
+        await asyncio.sleep(parse_seconds)
+        return httpx.Response(200, text=FAKE_TEI)
+    return httpx.MockTransport(handler)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def sample_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float):
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def main_async(args):
+    os.environ.setdefault("PIPELINE_EXTRACT_WORKERS", str(args.pdfs))
+    sys.path.insert(0, os.getcwd())
+    import app as app_module
+    from services import grobid_service
+    from services.job_store import get_job_store
+
+    grobid_service._grobid_service = grobid_service.GrobidService(
+        server="http://fake-grobid", transport=fake_grobid_transport(args.parse_seconds)
+    )
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with app_module.app.router.lifespan_context(app_module.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            stop = asyncio.Event()
+            idle_task = asyncio.create_task(sample_health(client, stop, args.interval))
+            await asyncio.sleep(1.0)
+            stop.set()
+            idle = await idle_task
+
+            stop = asyncio.Event()
+            busy_task = asyncio.create_task(sample_health(client, stop, args.interval))
+            job_ids = []
+            run_id = uuid.uuid4().hex
+            for i in range(args.pdfs):
+                # Distinct bytes per PDF and run, so dedup and the artifact cache stay out of the way
+                pdf = f"%PDF-1.4 fake {run_id} {i}".encode()
+                r = await client.post("/ingest", files={"file": (f"paper{i}.pdf", pdf, "application/pdf")})
+                job_ids.append(r.json()["job_id"])
+            start = time.perf_counter()
+            store = get_job_store()
+            while True:
+                statuses = [store.get(j)["status"] for j in job_ids]
+                if all(s in ("completed", "failed") for s in statuses):
+                    break
+                await asyncio.sleep(0.05)
+            elapsed = time.perf_counter() - start
+            stop.set()
+            busy = await busy_task
+
+    print(f"{args.pdfs} PDFs parsed in {elapsed:.2f}s (each parse {args.parse_seconds}s)")
+    for label, samples in (("idle", idle), ("during ingest", busy)):
+        print(f"/health {label:>14}: n={len(samples)} "
+              f"p50={statistics.median(samples):.2f}ms p95={percentile(samples, 0.95):.2f}ms "
+              f"max={max(samples):.2f}ms")
+
+    idle_p95, busy_p95 = percentile(idle, 0.95), percentile(busy, 0.95)
+    budget = max(idle_p95 * args.max_ratio, args.min_budget_ms)
+    if busy_p95 > budget:
+        print(f"FAIL: p95 under load {busy_p95:.2f}ms exceeds {budget:.2f}ms "
+              f"({args.max_ratio:g} x idle p95, min {args.min_budget_ms:g}ms)")
+        return False
+    print(f"OK: p95 under load {busy_p95:.2f}ms within {budget:.2f}ms")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pdfs", type=int, default=10)
+    parser.add_argument("--parse-seconds", type=float, default=2.0)
+    parser.add_argument("--interval", type=float, default=0.02)
+    parser.add_argument("--max-ratio", type=float, default=3.0,
+                        help="Allowed p95 under load as a multiple of the idle p95")
+    parser.add_argument("--min-budget-ms", type=float, default=10.0)
+    if not asyncio.run(main_async(parser.parse_args())):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
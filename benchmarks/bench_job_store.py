@@ -0,0 +1,62 @@
+"""
+Benchmark: job listing and status summary with a large job history.
+Fills a throwaway JobStore with N historical jobs, then times the first
+page, a deep cursor page, a status-filtered page and the summary counts.
+
+    python -m benchmarks.bench_job_store --jobs 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+from services.job_store import STATUSES, JobStore
+
+
+def timed(fn, repeats: int = 50) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--page", type=int, default=100)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JobStore(os.path.join(tmp, "jobs.sqlite"))
+        start = time.perf_counter()
+        store._conn.execute("BEGIN")
+        for i in range(args.jobs):
+            job_id = str(uuid.uuid4())
+            store.create(job_id, f"paper-{i}.pdf", sha256=f"{i:064x}")
+            status = rng.choices(STATUSES, weights=(1, 1, 90, 8))[0]
+            if status != "queued":
+                store.update(job_id, status=status, result={"title": f"Paper {i}"}
+                             if status == "completed" else None)
+        store._conn.execute("COMMIT")
+        print(f"Inserted {args.jobs} jobs in {time.perf_counter() - start:.1f}s")
+
+        _, cursor = store.list(limit=args.page)
+        for _ in range(200):
+            _, deeper = store.list(limit=args.page, cursor=cursor)
+            cursor = deeper or cursor
+
+        print(f"first page      p50 {timed(lambda: store.list(limit=args.page)):7.2f} ms")
+        print(f"deep page       p50 {timed(lambda: store.list(limit=args.page, cursor=cursor)):7.2f} ms")
+        print(f"failed only     p50 {timed(lambda: store.list(status='failed', limit=args.page)):7.2f} ms")
+        print(f"summary counts  p50 {timed(store.counts):7.2f} ms  {store.counts()}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
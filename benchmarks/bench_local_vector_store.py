@@ -0,0 +1,115 @@
+"""
+Benchmark: local vector store query latency and IVF recall.
+Fills a LocalVectorStore in a temp directory with clustered random
+vectors and reports p50/p95 query latency for exact search, filtered search
+and IVF approximate search, plus IVF recall@k against the exact results.
+Single-paper filters are checked under IVF too: they must return as many
+hits as the exact scan (exit status 1 otherwise).
+
+    python -m benchmarks.bench_local_vector_store --rows 300000
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from services.local_vector_store import LocalVectorStore
+
+
+class TopicModel:
+    """Topics -> subtopics -> chunks, so every query has genuine near neighbours."""
+
+    def __init__(self, dims: int, rng, topics: int = 64, subtopics: int = 2000):
+        self.rng = rng
+        centers = rng.standard_normal((topics, dims)).astype(np.float32)
+        self.subtopics = (centers[rng.integers(0, topics, subtopics)]
+                          + 0.7 * rng.standard_normal((subtopics, dims)).astype(np.float32))
+
+    def sample(self, rows: int) -> np.ndarray:
+        picks = self.subtopics[self.rng.integers(0, len(self.subtopics), rows)]
+        return picks + 0.5 * self.rng.standard_normal(picks.shape).astype(np.float32)
+
+
+def timed_queries(store, queries, top_k, **kwargs):
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(store.query(q, top_k=top_k, **kwargs))
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return results, statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def per_paper_queries(store, queries, papers, top_k):
+    """Each query filtered to one paper; returns (results, p50, p95)."""
+    latencies, results = [], []
+    for q, paper in zip(queries, papers):
+        start = time.perf_counter()
+        results.append(store.query(q, top_k=top_k, filter={"paper_id": paper}))
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return results, statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def recall(approx, exact) -> float:
+    return statistics.mean(
+        len({m["id"] for m in a} & {m["id"] for m in e}) / max(len(e), 1)
+        for a, e in zip(approx, exact)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--dims", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=16)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    topics = TopicModel(args.dims, rng)
+    with tempfile.TemporaryDirectory() as path:
+        store = LocalVectorStore(path, dims=args.dims, ivf_min_rows=10 ** 12, nprobe=args.nprobe)
+        start = time.perf_counter()
+        for offset in range(0, args.rows, 10_000):
+            block = topics.sample(min(10_000, args.rows - offset))
+            store.upsert([
+                {"id": f"v{offset + i}", "values": row,
+                 "metadata": {"paper_id": f"paper-{(offset + i) // 40}", "section": "Body"}}
+                for i, row in enumerate(block)
+            ])
+        print(f"upserted {args.rows} vectors in {time.perf_counter() - start:.1f}s")
+
+        queries = list(topics.sample(args.queries))
+        exact, p50, p95 = timed_queries(store, queries, args.top_k)
+        print(f"exact scan     : p50={p50:7.2f}ms p95={p95:7.2f}ms")
+
+        papers = [f"paper-{i}" for i in range(0, args.rows // 40, max(1, args.rows // 4000))]
+        _, p50, p95 = timed_queries(store, queries, args.top_k, filter={"paper_id": papers[:20]})
+        print(f"filtered scan  : p50={p50:7.2f}ms p95={p95:7.2f}ms (20 papers)")
+        one_paper = [papers[i % len(papers)] for i in range(len(queries))]
+        exact_paper, p50, p95 = per_paper_queries(store, queries, one_paper, args.top_k)
+        print(f"1-paper scan   : p50={p50:7.2f}ms p95={p95:7.2f}ms")
+
+        store.ivf_min_rows = 0
+        start = time.perf_counter()
+        store.query(queries[0], top_k=args.top_k)  # starts the background build
+        while store._ivf is None:
+            time.sleep(0.05)
+        print(f"IVF build      : {time.perf_counter() - start:.1f}s")
+        approx, p50, p95 = timed_queries(store, queries, args.top_k)
+        print(f"IVF (nprobe={args.nprobe:<3}): p50={p50:7.2f}ms p95={p95:7.2f}ms "
+              f"recall@{args.top_k}={recall(approx, exact):.3f}")
+        approx_paper, p50, p95 = per_paper_queries(store, queries, one_paper, args.top_k)
+        short = sum(len(a) < len(e) for a, e in zip(approx_paper, exact_paper))
+        print(f"IVF 1-paper    : p50={p50:7.2f}ms p95={p95:7.2f}ms "
+              f"recall@{args.top_k}={recall(approx_paper, exact_paper):.3f} short={short}")
+        if short:
+            raise SystemExit(f"{short} filtered IVF queries returned fewer hits than the exact scan")
+
+
+if __name__ == "__main__":
+    main()
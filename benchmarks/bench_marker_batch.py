@@ -0,0 +1,82 @@
+"""
+Benchmark: Marker documents/minute, single /convert vs /convert_batch.
+Sends the same PDFs to a running Marker service one request per document,
+then in /convert_batch groups, and reports documents per minute for each.
+For a CPU figure start the service with TORCH_DEVICE=cpu, e.g.
+
+    TORCH_DEVICE=cpu MARKER_WORKERS=2 uvicorn app:app --port 8080   (in marker-service/)
+    python -m benchmarks.bench_marker_batch --url http://localhost:8080 --pdfs ./scanned --batch 4
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from contextlib import ExitStack
+
+import httpx
+
+
+def wait_ready(client: httpx.Client, url: str, timeout: float = 600.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if client.get(f"{url}/ready").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(2)
+    raise SystemExit(f"Marker service at {url} did not become ready")
+
+
+def run_single(client: httpx.Client, url: str, pdfs) -> int:
+    converted = 0
+    for path in pdfs:
+        with open(path, "rb") as f:
+            r = client.post(f"{url}/convert",
+                            files={"file": (os.path.basename(path), f, "application/pdf")})
+        converted += r.status_code == 200
+    return converted
+
+
+def run_batched(client: httpx.Client, url: str, pdfs, batch: int) -> int:
+    converted = 0
+    for i in range(0, len(pdfs), batch):
+        with ExitStack() as stack:
+            files = [("files", (os.path.basename(p), stack.enter_context(open(p, "rb")),
+                                "application/pdf")) for p in pdfs[i:i + batch]]
+            with client.stream("POST", f"{url}/convert_batch", files=files) as r:
+                r.raise_for_status()
+                for line in r.iter_lines():
+                    item = json.loads(line) if line.strip() else {}
+                    converted += "markdown" in item
+    return converted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8080")
+    parser.add_argument("--pdfs", required=True, help="Directory of (scanned) PDFs")
+    parser.add_argument("--batch", type=int, default=4, help="Documents per /convert_batch call")
+    parser.add_argument("--limit", type=int, default=12)
+    args = parser.parse_args()
+
+    pdfs = sorted(glob.glob(os.path.join(args.pdfs, "*.pdf")))[:args.limit]
+    if not pdfs:
+        raise SystemExit(f"No PDFs in {args.pdfs}")
+    url = args.url.rstrip("/")
+    with httpx.Client(timeout=3600.0) as client:
+        wait_ready(client, url)
+        print(f"{len(pdfs)} PDFs, service: {client.get(f'{url}/health').json()}")
+        for label, fn in (("single /convert", lambda: run_single(client, url, pdfs)),
+                          (f"/convert_batch x{args.batch}",
+                           lambda: run_batched(client, url, pdfs, args.batch))):
+            start = time.perf_counter()
+            converted = fn()
+            elapsed = time.perf_counter() - start
+            print(f"{label:>20}: {converted}/{len(pdfs)} docs in {elapsed:7.1f}s  "
+                  f"{converted / elapsed * 60:6.2f} docs/min")
+
+
+if __name__ == "__main__":
+    main()
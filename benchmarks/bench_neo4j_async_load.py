@@ -0,0 +1,158 @@
+"""
+Benchmark: /papers/{title} throughput under concurrent load, sync vs async driver.
+Loads synthetic papers (with authors and citations) into Neo4j, then fires
+batches of concurrent GET /papers/{title} requests at two in-process apps:
+the previous handler (sync Neo4jService called inline in the async handler,
+with a verify_connection round trip per request) and the current app, which
+awaits AsyncNeo4jService. Reports requests/s and p50/p95 latency for each.
+
+Pass --url to load a running server instead (current handler only; the
+papers must already exist there, see --prefix). Uses the NEO4J_* settings
+from .env. Synthetic nodes are prefixed with a run id and deleted afterwards.
+
+    python -m benchmarks.bench_neo4j_async_load --concurrency 100 --requests 2000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from urllib.parse import quote
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from services.neo4j_service import Neo4jService
+
+
+def legacy_app(neo4j: Neo4jService) -> FastAPI:
+    """The /papers/{title} handler as it was before the async driver."""
+    legacy = FastAPI()
+
+    @legacy.get("/papers/{title}")
+    async def get_paper(title: str, include_text: bool = False):
+        try:
+            if not neo4j.verify_connection():
+                raise HTTPException(status_code=503, detail="Neo4j not connected")
+            return neo4j.get_paper_by_title(title, include_text=include_text)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return legacy
+
+
+def load(neo4j: Neo4jService, run_id: str, papers: int, chunk: int = 2000):
+    with neo4j.driver.session() as session:
+        for start in range(0, papers, chunk):
+            session.run("""
+                UNWIND range($start, $end - 1) AS i
+                CREATE (p:Paper:Ingested {title: $prefix + ' Paper ' + i,
+                                          citation_key: $prefix + ':paper:' + i,
+                                          job_id: $prefix + '-' + i,
+                                          abstract: 'Synthetic abstract ' + i,
+                                          created_at: datetime()})
+                FOREACH (j IN range(0, 4) |
+                    CREATE (:Author {name: $prefix + ' Author ' + i + '-' + j})-[:AUTHORED]->(p))
+                FOREACH (j IN range(0, 19) |
+                    CREATE (p)-[:CITES]->(:Paper {title: $prefix + ' Reference ' + i + '-' + j,
+                                                  citation_key: $prefix + ':ref:' + i + '-' + j}))
+            """, start=start, end=min(start + chunk, papers), prefix=run_id)
+
+
+def cleanup(neo4j: Neo4jService, run_id: str):
+    with neo4j.driver.session() as session:
+        for label, key in (("Paper", "title"), ("Author", "name")):
+            session.run(f"""
+                MATCH (n:{label}) WHERE n.{key} STARTS WITH $prefix
+                CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF 10000 ROWS
+            """, prefix=run_id)
+
+
+async def drive(client: httpx.AsyncClient, titles, concurrency: int, requests: int):
+    """Keep `concurrency` requests in flight until `requests` have completed."""
+    latencies, errors = [], 0
+    queue = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in queue:
+            title = random.choice(titles)
+            start = time.perf_counter()
+            response = await client.get(f"/papers/{quote(title, safe='')}")
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += response.status_code != 200 or response.json() is None
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95)],
+        "errors": errors,
+    }
+
+
+async def run(label: str, transport, base_url: str, titles, args):
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=120) as client:
+        await drive(client, titles, args.concurrency, args.concurrency)  # warm up the pool
+        stats = await drive(client, titles, args.concurrency, args.requests)
+    print(f"  {label:<24} {stats['rps']:8.1f} req/s   p50 {stats['p50']:8.1f} ms   "
+          f"p95 {stats['p95']:8.1f} ms   errors {stats['errors']}")
+
+
+async def main_async(args):
+    titles = [f"{args.prefix} Paper {i}" for i in range(args.papers)]
+    print(f"{args.requests} GET /papers/{{title}} requests, {args.concurrency} concurrent")
+    if args.url:
+        await run("server", None, args.url, titles, args)
+        return
+
+    from app import app
+    from services.async_neo4j_service import get_async_neo4j_service
+
+    neo4j = Neo4jService().connect()
+    try:
+        await run("sync driver (before)", httpx.ASGITransport(app=legacy_app(neo4j)),
+                  "http://bench", titles, args)
+        await run("async driver (after)", httpx.ASGITransport(app=app),
+                  "http://bench", titles, args)
+    finally:
+        neo4j.close()
+        await get_async_neo4j_service().close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--papers", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--url", help="Load a running server instead of in-process apps")
+    parser.add_argument("--prefix", help="Title prefix of papers already in the graph (with --url)")
+    args = parser.parse_args()
+
+    if args.url:
+        if not args.prefix:
+            raise SystemExit("--url needs --prefix naming papers that already exist")
+        asyncio.run(main_async(args))
+        return
+
+    neo4j = Neo4jService().connect()
+    if not neo4j.verify_connection():
+        raise SystemExit("Cannot connect to Neo4j. Check your connection settings.")
+    args.prefix = f"bench-{uuid.uuid4().hex[:8]}"
+    try:
+        print(f"Loading {args.papers} papers ...")
+        load(neo4j, args.prefix, args.papers)
+        asyncio.run(main_async(args))
+    finally:
+        cleanup(neo4j, args.prefix)
+        neo4j.close()
+
+
+if __name__ == "__main__":
+    main()
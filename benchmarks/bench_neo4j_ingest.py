@@ -0,0 +1,95 @@
+"""
+Benchmark: per-entity vs batched vs grouped Neo4j ingest.
+Writes a synthetic corpus through Neo4jService.ingest_paper_data,
+Neo4jService.ingest_paper_data_batched (one transaction per paper) and
+Neo4jService.ingest_papers_batched (--group papers per transaction) and
+reports papers/sec for each.
+
+Uses the NEO4J_* settings from .env. All synthetic nodes are prefixed with
+a run id and deleted afterwards, so it is safe to point at a dev database.
+
+    python -m benchmarks.bench_neo4j_ingest --papers 1000
+"""
+import argparse
+import random
+import time
+import uuid
+
+from services.neo4j_service import Neo4jService
+
+
+def make_corpus(run_id: str, papers: int, authors: int, citations: int,
+                seed: int = 7):
+    """Build a synthetic corpus with a shared author and reference pool."""
+    rng = random.Random(seed)
+    author_pool = [f"{run_id} Author {i}" for i in range(max(papers, 1) * 2)]
+    reference_pool = [f"{run_id} Reference {i}" for i in range(max(papers, 1) * 20)]
+    method_pool = [f"{run_id} Method {i}" for i in range(50)]
+    corpus = []
+    for i in range(papers):
+        corpus.append({
+            "job_id": f"{run_id}-{i}",
+            "title": f"{run_id} Paper {i}",
+            "authors": rng.sample(author_pool, authors),
+            "citations": rng.sample(reference_pool, citations),
+            "methods": rng.sample(method_pool, 3),
+            "full_text": "lorem ipsum " * 500,
+        })
+    return corpus
+
+
+def cleanup(neo4j: Neo4jService, run_id: str):
+    """Delete every node created by this run."""
+    with neo4j.driver.session() as session:
+        for label, key in (("Paper", "title"), ("Author", "name"), ("Method", "name")):
+            session.run(f"""
+                MATCH (n:{label}) WHERE n.{key} STARTS WITH $prefix
+                CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF 5000 ROWS
+            """, prefix=run_id)
+
+
+def run(neo4j: Neo4jService, corpus, mode: str, group: int) -> float:
+    start = time.perf_counter()
+    if mode == "grouped":
+        for i in range(0, len(corpus), group):
+            neo4j.ingest_papers_batched(corpus[i:i + group])
+    else:
+        ingest = neo4j.ingest_paper_data_batched if mode == "batched" else neo4j.ingest_paper_data
+        for paper in corpus:
+            ingest(**paper)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--papers", type=int, default=1000)
+    parser.add_argument("--authors", type=int, default=8)
+    parser.add_argument("--citations", type=int, default=60)
+    parser.add_argument("--per-entity-papers", type=int, default=None,
+                        help="Limit the (slow) per-entity run to the first N papers")
+    parser.add_argument("--group", type=int, default=8,
+                        help="Papers per transaction in the grouped run")
+    args = parser.parse_args()
+
+    neo4j = Neo4jService().connect()
+    if not neo4j.verify_connection():
+        raise SystemExit("Cannot connect to Neo4j. Check your connection settings.")
+
+    for mode in ("per-entity", "batched", "grouped"):
+        run_id = f"bench-{uuid.uuid4().hex[:8]}"
+        corpus = make_corpus(run_id, args.papers, args.authors, args.citations)
+        if mode == "per-entity" and args.per_entity_papers is not None:
+            corpus = corpus[:args.per_entity_papers]
+        try:
+            elapsed = run(neo4j, corpus, mode, args.group)
+        finally:
+            cleanup(neo4j, run_id)
+        print(f"{mode:>10}: {len(corpus)} papers in {elapsed:.2f}s "
+              f"({len(corpus) / elapsed:.1f} papers/s, "
+              f"{elapsed / max(len(corpus), 1) * 1000:.1f} ms/paper)")
+
+    neo4j.close()
+
+
+if __name__ == "__main__":
+    main()
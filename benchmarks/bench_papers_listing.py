@@ -0,0 +1,110 @@
+"""
+Benchmark: /papers listing, old full sort vs keyset pagination.
+Loads ingested papers plus a much larger number of citation placeholders,
+then times the old get_all_papers query (sort every :Paper, collect authors,
+LIMIT at the end) against Neo4jService.list_papers for the first page and
+for a page deep in the listing, reached by following cursors.
+
+Uses the NEO4J_* settings from .env; run migrations/004 first so the
+:Ingested(created_at, job_id) index exists. Synthetic nodes are prefixed with
+a run id and deleted afterwards.
+
+    python -m benchmarks.bench_papers_listing --papers 20000 --placeholders 1000000
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from services.neo4j_service import Neo4jService
+
+LEGACY_QUERY = """
+MATCH (p:Paper)
+OPTIONAL MATCH (a:Author)-[:AUTHORED]->(p)
+RETURN p.title as title, p.job_id as job_id,
+       collect(DISTINCT a.name) as authors
+ORDER BY p.created_at DESC
+LIMIT $limit
+"""
+
+
+def load(neo4j: Neo4jService, run_id: str, papers: int, placeholders: int, chunk: int = 10000):
+    with neo4j.driver.session() as session:
+        for start in range(0, placeholders, chunk):
+            session.run("""
+                UNWIND range($start, $end - 1) AS i
+                CREATE (:Paper {title: $prefix + ' Reference ' + i,
+                                citation_key: $prefix + ':ref:' + i})
+            """, start=start, end=min(start + chunk, placeholders), prefix=run_id)
+        for start in range(0, papers, chunk):
+            session.run("""
+                UNWIND range($start, $end - 1) AS i
+                CREATE (p:Paper:Ingested {title: $prefix + ' Paper ' + i,
+                                          citation_key: $prefix + ':paper:' + i,
+                                          job_id: $prefix + '-' + i,
+                                          created_at: datetime() - duration({seconds: i})})
+                CREATE (:Author {name: $prefix + ' Author ' + i})-[:AUTHORED]->(p)
+            """, start=start, end=min(start + chunk, papers), prefix=run_id)
+
+
+def cleanup(neo4j: Neo4jService, run_id: str):
+    with neo4j.driver.session() as session:
+        for label, key in (("Paper", "title"), ("Author", "name")):
+            session.run(f"""
+                MATCH (n:{label}) WHERE n.{key} STARTS WITH $prefix
+                CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF 10000 ROWS
+            """, prefix=run_id)
+
+
+def timed(fn, repeats: int) -> float:
+    fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--papers", type=int, default=20000)
+    parser.add_argument("--placeholders", type=int, default=1000000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--deep-page", type=int, default=100, help="Page number for the deep-page timing")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    neo4j = Neo4jService().connect()
+    if not neo4j.verify_connection():
+        raise SystemExit("Cannot connect to Neo4j. Check your connection settings.")
+
+    run_id = f"bench-{uuid.uuid4().hex[:8]}"
+    try:
+        print(f"Loading {args.papers} papers and {args.placeholders} placeholders ...")
+        load(neo4j, run_id, args.papers, args.placeholders)
+
+        def legacy():
+            with neo4j.driver.session() as session:
+                return session.run(LEGACY_QUERY, limit=args.limit).data()
+
+        # Walk the cursors once to find the deep page's cursor
+        cursor, page = None, 1
+        while page < args.deep_page:
+            _, next_cursor = neo4j.list_papers(limit=args.limit, cursor=cursor)
+            if next_cursor is None:
+                break
+            cursor, page = next_cursor, page + 1
+
+        print(f"  old query, page 1:       {timed(legacy, args.repeats):8.2f} ms")
+        print(f"  keyset,    page 1:       "
+              f"{timed(lambda: neo4j.list_papers(limit=args.limit), args.repeats):8.2f} ms")
+        print(f"  keyset,    page {page:<8} "
+              f"{timed(lambda: neo4j.list_papers(limit=args.limit, cursor=cursor), args.repeats):8.2f} ms")
+    finally:
+        cleanup(neo4j, run_id)
+        neo4j.close()
+
+
+if __name__ == "__main__":
+    main()
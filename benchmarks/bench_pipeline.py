@@ -0,0 +1,410 @@
+"""
+Benchmark: end-to-end ingestion throughput offline, with local stand-ins.
+Submits PDFs to app's IngestScheduler the way /ingest does (job store row,
+then the extract -> marker -> embed -> graph -> vectors stage queues and their
+batch handlers, as configured in config.json), then runs hybrid search, with
+no external service:
+  - GROBID: a ThreadingHTTPServer returning canned TEI after --grobid-latency
+    (PDFs named *-scanned.pdf get an empty body, so they go on to Marker)
+  - Marker: a ThreadingHTTPServer returning canned markdown after --marker-latency
+  - embeddings: the deterministic HashingBackend, --embed-latency per call
+  - vectors: the local NumPy vector store
+  - Neo4j: a recording driver; every write transaction is one round trip
+    costing --neo4j-latency, and the author/citation resolvers run for real
+
+A concurrency level is the number of uploads in flight at once: each client
+submits a PDF, polls the job store until it finishes, then submits the next.
+Each level runs in a fresh subprocess and data directory, so caches and peak
+RSS do not carry over. Reports papers/minute, p50/p95 per stage, per stage
+queue wait and for search, and peak RSS. Only scanned PDFs have a marker wait;
+text PDFs skip that queue.
+
+--save-baseline stores papers/minute per level; --baseline compares against a
+stored file and exits 1 if any level is more than --tolerance slower, so it
+can gate a deploy (baselines are per machine):
+
+    python -m benchmarks.bench_pipeline --levels 1 10 50 --pdfs 100
+    python -m benchmarks.bench_pipeline --save-baseline data/pipeline-baseline.json
+    python -m benchmarks.bench_pipeline --baseline data/pipeline-baseline.json
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.bench_tei_parser import make_tei
+
+STAGES = ("grobid", "marker", "chunk", "embed", "graph", "vectors", "total")
+QUEUES = ("extract", "marker", "embed", "graph", "vectors")
+TEMPLATE_TITLE = "A Synthetic Benchmark Paper"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else None
+
+
+def uploaded_filename(body: bytes) -> str:
+    match = re.search(rb'filename="([^"]+)"', body)
+    return match.group(1).decode() if match else "paper.pdf"
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: str, content_type: str = "text/plain"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+
+class FakeGrobid(_FakeHandler):
+    """GROBID /api/isalive and /api/processFulltextDocument."""
+
+    tei = ""
+    empty_tei = ""
+
+    def do_GET(self):
+        if self.path.startswith("/api/isalive"):
+            return self._reply(200, "true")
+        self._reply(404, "not found")
+
+    def do_POST(self):
+        filename = uploaded_filename(self._read_body())
+        time.sleep(self.latency)
+        template = self.empty_tei if "scanned" in filename else self.tei
+        self._reply(200, template.replace(TEMPLATE_TITLE, f"Benchmark paper {filename[:-4]}"),
+                    "application/xml")
+
+
+class FakeMarker(_FakeHandler):
+    """Marker /health, /convert and /convert_batch."""
+
+    markdown = ""
+
+    def do_GET(self):
+        self._reply(200, '{"status": "ok"}', "application/json")
+
+    def do_POST(self):
+        body = self._read_body()
+        if self.path.startswith("/convert_batch"):
+            names = [m.decode() for m in re.findall(rb'filename="([^"]+)"', body)]
+            time.sleep(self.latency * len(names))
+            lines = [json.dumps({"index": i, "markdown": f"# {name}\n\n{self.markdown}"})
+                     for i, name in enumerate(names)]
+            return self._reply(200, "\n".join(lines) + "\n", "application/x-ndjson")
+        time.sleep(self.latency)
+        name = uploaded_filename(body)
+        self._reply(200, json.dumps({"markdown": f"# {name}\n\n{self.markdown}"}), "application/json")
+
+
+def start_server(handler) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class RecordingDriver:
+    """
+    Stands in for the neo4j driver under Neo4jService: reads return nothing,
+    each write transaction sleeps `latency` and echoes per-paper counts.
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.round_trips = 0
+        self.papers = {}
+        self._lock = threading.Lock()
+
+    def session(self):
+        return _RecordingSession(self)
+
+    def close(self):
+        pass
+
+
+class _RecordingSession:
+    """Session that also serves as the transaction passed to execute_write."""
+
+    def __init__(self, driver: RecordingDriver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, parameters=None, **params):
+        """Reads return no rows; the batched ingest query is recorded."""
+        params = {**(parameters or {}), **params}
+        return self._ingest(params["papers"]) if "papers" in params else []
+
+    def execute_write(self, work, *args):
+        return work(self, *args)
+
+    execute_read = execute_write
+
+    def _ingest(self, papers):
+        driver = self.driver
+        time.sleep(driver.latency)
+        with driver._lock:
+            driver.round_trips += 1
+            for paper in papers:
+                driver.papers[paper["title"]] = paper
+        return [
+            {"index": paper["index"], "p": {"title": paper["title"], "job_id": paper["job_id"]},
+             "authors_linked": len(paper["authors"]), "citations_created": len(paper["citations"]),
+             "methods_linked": 0, "datasets_linked": 0, "tasks_linked": 0}
+            for paper in papers
+        ]
+
+
+class RecordedGraph:
+    """Async read service for hybrid search, answering from the recorded writes."""
+
+    def __init__(self, driver: RecordingDriver):
+        self.driver = driver
+
+    async def get_paper_by_title(self, title, include_text=False):
+        paper = self.driver.papers.get(title)
+        if paper is None:
+            return None
+        return {"title": title, "authors": [a["name"] for a in paper["authors"]],
+                "citations": [c.get("title") for c in paper["citations"]],
+                "methods": [], "datasets": [], "tasks": []}
+
+    async def find_related_papers(self, title, limit=20):
+        return []
+
+
+def make_markdown(sections: int = 12, paragraphs: int = 4) -> str:
+    sentence = "The method improves retrieval quality on the benchmark by a clear margin. "
+    return "\n\n".join(
+        f"## Section {s}\n\n" + "\n\n".join(sentence * 10 for _ in range(paragraphs))
+        for s in range(sections)
+    )
+
+
+async def run_level(args) -> dict:
+    """One concurrency level (runs inside the child process)."""
+    tmp = tempfile.mkdtemp(prefix="bench-pipeline-")
+    FakeGrobid.latency = args.grobid_latency
+    FakeGrobid.tei = make_tei(references=args.references, sections=8, paragraphs=3)
+    FakeGrobid.empty_tei = make_tei(references=0, sections=0, paragraphs=0)
+    FakeMarker.latency = args.marker_latency
+    FakeMarker.markdown = make_markdown()
+    grobid, marker = start_server(FakeGrobid), start_server(FakeMarker)
+    os.environ.update({
+        "GRAPHRAG_DATA_DIR": tmp,
+        "GROBID_SERVER_URL": f"http://127.0.0.1:{grobid.server_address[1]}",
+        "MARKER_SERVICE_URL": f"http://127.0.0.1:{marker.server_address[1]}",
+        "VECTOR_STORE": "local",
+        "EMBEDDING_BACKEND": "hash",
+    })
+    sys.path.insert(0, os.getcwd())
+    import app as app_module
+    from services import async_neo4j_service, embedding_engine, neo4j_service
+    from services.hybrid_search import hybrid_search
+    from services.job_store import get_job_store
+
+    embedding_engine._embedding_engine = embedding_engine.EmbeddingEngine(
+        embedding_engine.HashingBackend(latency=args.embed_latency))
+    driver = RecordingDriver(args.neo4j_latency)
+    neo4j = neo4j_service.Neo4jService()
+    neo4j.driver = driver
+    neo4j_service._neo4j_service = neo4j
+    async_neo4j_service._async_neo4j_service = RecordedGraph(driver)
+
+    rng = random.Random(args.level)
+    store = get_job_store()
+    pdfs = []
+    for i in range(args.pdfs):
+        scanned = rng.random() < args.marker_share
+        filename = f"paper-{args.level}-{i:05d}{'-scanned' if scanned else ''}.pdf"
+        path = os.path.join(tmp, filename)
+        data = b"%PDF-1.4\n" + os.urandom(args.pdf_kb * 1024)
+        with open(path, "wb") as f:
+            f.write(data)
+        pdfs.append((path, filename, hashlib.sha256(data).hexdigest()))
+
+    scheduler = app_module.scheduler
+    await scheduler.start()
+    semaphore = asyncio.Semaphore(args.level)
+    job_ids = []
+
+    async def ingest(path, filename, sha256):
+        """What an /ingest client does: upload, then poll the job until it finishes."""
+        async with semaphore:
+            job_id = str(uuid.uuid4())
+            job_ids.append(job_id)
+            store.create(job_id, filename, sha256, path)
+            await scheduler.submit_wait({"job_id": job_id, "temp_path": path,
+                                         "filename": filename, "sha256": sha256})
+            while store.get(job_id)["status"] not in ("completed", "failed"):
+                await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(ingest(*pdf) for pdf in pdfs))
+    elapsed = time.perf_counter() - start
+    await scheduler.stop()
+
+    timings = {stage: [] for stage in STAGES}
+    waits = {queue: [] for queue in QUEUES}
+    failed = 0
+    for job_id in job_ids:
+        stored = store.get(job_id)
+        if stored["status"] != "completed":
+            failed += 1
+            continue
+        for key, value in (stored["result"].get("timings") or {}).items():
+            if key.endswith("_wait_ms") and key[:-8] in waits:
+                waits[key[:-8]].append(value)
+            elif key[:-3] in timings:
+                timings[key[:-3]].append(value)
+
+    search = []
+    words = FakeMarker.markdown.split()
+    for i in range(args.queries):
+        query = " ".join(rng.sample(words, 4)) + f" q{i}"
+        result = await hybrid_search(query, top_k=5)
+        search.append(result["timings"]["total_ms"])
+
+    await app_module.get_grobid_service().close()
+    grobid.shutdown()
+    marker.shutdown()
+    shutil.rmtree(tmp, ignore_errors=True)
+    return {
+        "level": args.level,
+        "pdfs": args.pdfs,
+        "failed": failed,
+        "seconds": round(elapsed, 3),
+        "papers_per_min": round(args.pdfs / elapsed * 60, 1),
+        "stages": {stage: {"n": len(v), "p50": percentile(v, 0.5), "p95": percentile(v, 0.95)}
+                   for stage, v in timings.items() if v},
+        "waits": {queue: {"n": len(v), "p50": percentile(v, 0.5), "p95": percentile(v, 0.95)}
+                  for queue, v in waits.items() if v},
+        "search": {"p50": percentile(search, 0.5), "p95": percentile(search, 0.95)},
+        "neo4j_round_trips": driver.round_trips,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def run_child(level: int, argv) -> dict:
+    cmd = [sys.executable, "-m", "benchmarks.bench_pipeline", "--child", str(level)] + argv
+    out = subprocess.run(cmd, capture_output=True, text=True)
+    if out.returncode != 0:
+        sys.stderr.write(out.stderr)
+        raise SystemExit(f"level {level} failed")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def report(results):
+    print(f"{'conc':>5} {'papers/min':>11} {'failed':>6} {'RSS MB':>7} {'rt/paper':>8} | "
+          + " ".join(f"{s + ' p50/p95 ms':>22}" for s in STAGES) + f" | {'search p50/p95 ms':>18}")
+    for r in results:
+        cells = []
+        for stage in STAGES:
+            s = r["stages"].get(stage)
+            cells.append(f"{s['p50']:>10.1f}/{s['p95']:<11.1f}" if s else f"{'-':>22}")
+        print(f"{r['level']:>5} {r['papers_per_min']:>11.1f} {r['failed']:>6} {r['peak_rss_mb']:>7.0f} "
+              f"{r['neo4j_round_trips'] / max(r['pdfs'] - r['failed'], 1):>8.2f} | "
+              + " ".join(cells)
+              + f" | {r['search']['p50']:>8.1f}/{r['search']['p95']:<9.1f}")
+
+    print(f"\nQueue wait per stage (jobs queued, p50/p95 ms)\n{'conc':>5} | "
+          + " ".join(f"{q:>22}" for q in QUEUES))
+    for r in results:
+        cells = []
+        for queue in QUEUES:
+            w = r["waits"].get(queue)
+            cells.append(f"{w['n']:>4} {w['p50']:>8.1f}/{w['p95']:<8.1f}" if w else f"{'-':>22}")
+        print(f"{r['level']:>5} | " + " ".join(cells))
+
+
+def check_baseline(results, path: str, tolerance: float) -> bool:
+    with open(path) as f:
+        baseline = json.load(f)["papers_per_min"]
+    ok = True
+    for r in results:
+        expected = baseline.get(str(r["level"]))
+        if expected is None:
+            continue
+        change = r["papers_per_min"] / expected - 1
+        regressed = change < -tolerance
+        ok = ok and not regressed
+        print(f"  concurrency {r['level']:>3}: {r['papers_per_min']:.1f} vs baseline {expected:.1f} "
+              f"papers/min ({change:+.1%}){'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--pdfs", type=int, default=100, help="PDFs per level")
+    parser.add_argument("--pdf-kb", type=int, default=256)
+    parser.add_argument("--marker-share", type=float, default=0.1, help="Fraction of scanned PDFs")
+    parser.add_argument("--references", type=int, default=40, help="References per TEI document")
+    parser.add_argument("--grobid-latency", type=float, default=0.5)
+    parser.add_argument("--marker-latency", type=float, default=2.0)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--neo4j-latency", type=float, default=0.02)
+    parser.add_argument("--queries", type=int, default=50, help="Searches run after ingest")
+    parser.add_argument("--baseline", help="Fail if slower than this baseline file")
+    parser.add_argument("--save-baseline", help="Write papers/minute per level to this file")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        args.level = args.child
+        print(json.dumps(asyncio.run(run_level(args))))
+        return
+
+    forwarded = [arg for pair in (
+        ("--pdfs", args.pdfs), ("--pdf-kb", args.pdf_kb), ("--marker-share", args.marker_share),
+        ("--references", args.references), ("--grobid-latency", args.grobid_latency),
+        ("--marker-latency", args.marker_latency), ("--embed-latency", args.embed_latency),
+        ("--neo4j-latency", args.neo4j_latency), ("--queries", args.queries),
+    ) for arg in (pair[0], str(pair[1]))]
+    print(f"{args.pdfs} PDFs per level ({args.marker_share:.0%} scanned); latencies: GROBID "
+          f"{args.grobid_latency}s, Marker {args.marker_latency}s, embed {args.embed_latency}s/call, "
+          f"Neo4j {args.neo4j_latency}s/round trip")
+    results = []
+    for level in args.levels:
+        results.append(run_child(level, forwarded))
+    report(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"papers_per_min": {str(r["level"]): r["papers_per_min"] for r in results},
+                       "settings": vars(args)}, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+    if args.baseline and not check_baseline(results, args.baseline, args.tolerance):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
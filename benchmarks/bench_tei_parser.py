@@ -0,0 +1,152 @@
+"""
+Benchmark: single-pass lxml TEI parser vs the legacy double BeautifulSoup parse.
+Generates a synthetic GROBID TEI file (or takes real ones) and reports parse
+time and peak RSS growth for each implementation. Each measurement runs in a
+fresh subprocess so the RSS peaks do not contaminate each other.
+
+    python -m benchmarks.bench_tei_parser --references 250 --sections 60
+    python -m benchmarks.bench_tei_parser path/to/paper.tei.xml
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+TEI_NS = "http://www.tei-c.org/ns/1.0"
+
+
+def make_tei(references: int, sections: int, paragraphs: int) -> str:
+    """Build a GROBID-shaped TEI document."""
+    out = [f'<?xml version="1.0" encoding="UTF-8"?>\n<TEI xmlns="{TEI_NS}">',
+           "<teiHeader><fileDesc><titleStmt><title level=\"a\" type=\"main\">"
+           "A Synthetic Benchmark Paper</title></titleStmt><sourceDesc><biblStruct><analytic>"]
+    for i in range(6):
+        out.append(f"<author><persName><forename type=\"first\">Author{i}</forename>"
+                   f"<surname>Surname{i}</surname></persName><affiliation>"
+                   f"<orgName type=\"institution\">University {i}</orgName></affiliation></author>")
+    out.append("</analytic></biblStruct></sourceDesc></fileDesc></teiHeader><text><body>")
+    sentence = "This sentence cites prior work <ref type=\"bibr\" target=\"#b1\">[1]</ref> and continues. "
+    for s in range(sections):
+        out.append(f"<div><head n=\"{s}\">Section {s}</head>")
+        for p in range(paragraphs):
+            out.append(f"<p>{sentence * 12}</p>")
+        out.append("</div>")
+    out.append("</body><back><div type=\"references\"><listBibl>")
+    for r in range(references):
+        out.append(
+            f"<biblStruct xml:id=\"b{r}\"><analytic><title level=\"a\" type=\"main\">Referenced work "
+            f"number {r}</title><author><persName><forename type=\"first\">Ref{r}</forename>"
+            f"<surname>Writer{r}</surname></persName></author><author><persName>"
+            f"<forename type=\"first\">Co{r}</forename><surname>Writer{r}</surname></persName></author>"
+            f"<idno type=\"DOI\">10.1000/bench.{r}</idno></analytic><monogr><title level=\"j\">"
+            f"Journal of Benchmarks</title><imprint><date type=\"published\" when=\"{2000 + r % 24}\"/>"
+            f"</imprint></monogr></biblStruct>")
+    out.append("</listBibl></div></back></text></TEI>")
+    return "".join(out)
+
+
+def legacy_parse(xml_out: str):
+    """The previous app.py implementation: two full BeautifulSoup parses."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(xml_out, 'xml')
+    body = soup.find('body')
+    full_text = ""
+    if body:
+        parts = []
+        for elem in body.find_all(['head', 'p']):
+            txt = elem.get_text(separator=' ', strip=True)
+            if txt:
+                parts.append("## " + txt + "\n" if elem.name == 'head' else txt + "\n")
+        full_text = "\n".join(parts).strip() if parts else body.get_text(separator='\n', strip=True)
+
+    soup = BeautifulSoup(xml_out, 'xml')
+    title = "Unknown Title"
+    title_stmt = soup.find('titleStmt')
+    if title_stmt:
+        title_elem = title_stmt.find('title')
+        if title_elem and title_elem.text:
+            title = title_elem.text.strip()
+    authors = []
+    for author in soup.find_all('author'):
+        pers_name = author.find('persName')
+        if pers_name:
+            first = pers_name.find('forename', type='first')
+            last = pers_name.find('surname')
+            first_text = first.get_text(strip=True) if first else ''
+            last_text = last.get_text(strip=True) if last else ''
+            full_name = f"{first_text} {last_text}".strip()
+            if full_name:
+                authors.append(full_name)
+    citations = []
+    for cite in soup.find_all('biblStruct'):
+        c_title = cite.find('title', level='a') or cite.find('title', level='m')
+        if c_title and c_title.text:
+            citations.append(c_title.get_text(strip=True))
+    return {"title": title, "authors": authors, "citations": citations}, full_text
+
+
+def single_pass_parse(xml_out: str):
+    from services.tei_parser import parse_tei
+    return parse_tei(xml_out)
+
+
+def worker(impl: str, path: str, repeats: int):
+    """Run one implementation in this process and print a JSON result line."""
+    parse = legacy_parse if impl == "legacy" else single_pass_parse
+    with open(path, encoding="utf-8") as f:
+        xml_out = f.read()
+    # Import everything before taking the RSS baseline
+    parse("<TEI/>")
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        parse(xml_out)
+        times.append(time.perf_counter() - start)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"best_s": min(times), "peak_rss_growth_kb": peak - baseline}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*", help="Real TEI files (default: synthetic)")
+    parser.add_argument("--references", type=int, default=250)
+    parser.add_argument("--sections", type=int, default=60)
+    parser.add_argument("--paragraphs", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--worker", choices=["legacy", "single-pass"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.files[0], args.repeats)
+        return
+
+    files = args.files
+    if not files:
+        tmp = tempfile.NamedTemporaryFile("w", suffix=".tei.xml", delete=False, encoding="utf-8")
+        tmp.write(make_tei(args.references, args.sections, args.paragraphs))
+        tmp.close()
+        files = [tmp.name]
+
+    for path in files:
+        print(f"{path}: {os.path.getsize(path) / 1024:.0f} KB")
+        for impl in ("legacy", "single-pass"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_tei_parser", path,
+                 "--worker", impl, "--repeats", str(args.repeats)],
+                capture_output=True, text=True, check=True
+            ).stdout.strip().splitlines()[-1]
+            stats = json.loads(out)
+            print(f"  {impl:>11}: {stats['best_s'] * 1000:8.1f} ms, "
+                  f"peak RSS growth {stats['peak_rss_growth_kb'] / 1024:6.1f} MB")
+        if not args.files:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,553 @@
 from fastapi import FastAPI, UploadFile, HTTPException
 from fastapi import File
-from marker.convert import convert_single_pdf
-from marker.models import load_all_models
+from fastapi.responses import JSONResponse, StreamingResponse
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import asyncio
+import json
+import math
+import uuid
+import multiprocessing
 import tempfile
-import os 
+import time
+import os
 
-app = FastAPI()
-# models = load_all_models()
+import worker
 
-_models = None
+# Conversion worker processes; each holds its own copy of the models
+MARKER_WORKERS = max(1, int(os.getenv("MARKER_WORKERS", "1")))
+# Requests allowed to wait for a free worker before new ones get a 503
+MARKER_QUEUE_SIZE = max(0, int(os.getenv("MARKER_QUEUE_SIZE", "8")))
+# Marker batch_multiplier used by /convert_batch (scales per-model batch sizes)
+MARKER_BATCH_MULTIPLIER = max(1, int(os.getenv("MARKER_BATCH_MULTIPLIER", "2")))
+# Documents with at least this many pages are split into page-range shards
+# (of at most MARKER_SHARD_PAGES pages) converted in parallel across workers
+MARKER_SHARD_MIN_PAGES = int(os.getenv("MARKER_SHARD_MIN_PAGES", "40"))
+MARKER_SHARD_PAGES = max(1, int(os.getenv("MARKER_SHARD_PAGES", "20")))
+# Seconds every worker gets to load its models and warm up before startup fails
+MARKER_STARTUP_TIMEOUT = float(os.getenv("MARKER_STARTUP_TIMEOUT", "900"))
 
-def get_models():
-    global _models
-    if _models is None:
-        _models = load_all_models()
-    return _models
-  
+
+class ConversionPool:
+    """
+    Process pool of preloaded Marker workers behind a bounded queue.
+    Workers are spawned (CUDA-safe) and warmed up at startup; ready is set
+    once every worker has loaded its models.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.executor = None
+        self.ready = False
+        self.error = None
+        self.pending = 0
+        self.in_flight = 0
+        self.processed = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+        self.warmup_seconds = None
+
+    async def start(self):
+        """Spawn the workers and load models in all of them concurrently."""
+        self.ready = False
+        self.error = None
+        start = time.perf_counter()
+        context = multiprocessing.get_context("spawn")
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=worker.init_worker,
+            initargs=(context.Barrier(self.workers),)
+        )
+        try:
+            # Each warm-up blocks at the barrier until all have arrived, so they
+            # run in as many distinct processes and every worker gets one
+            warmed = await asyncio.gather(*[
+                asyncio.wrap_future(self.executor.submit(worker.warm_up, MARKER_STARTUP_TIMEOUT))
+                for _ in range(self.workers)
+            ])
+            pids = {pid for pid, _ in warmed}
+            if len(pids) != self.workers:
+                raise RuntimeError(f"only {len(pids)} of {self.workers} workers warmed up")
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            print(f"Marker worker startup failed: {self.error}")
+            return
+        self.warmup_seconds = round(time.perf_counter() - start, 1)
+        self.ready = True
+        print(f"Marker ready: {self.workers} worker(s) loaded in {self.warmup_seconds}s")
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    @property
+    def busy(self) -> int:
+        return min(self.in_flight, self.workers)
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.pending - self.workers)
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_size
+
+    def try_acquire(self, count: int = 1) -> bool:
+        """Reserve count worker/queue slots at once; False when they don't fit."""
+        if self.pending + count > self.capacity:
+            return False
+        self.pending += count
+        return True
+
+    def release(self, count: int = 1):
+        self.pending -= count
+
+    def retry_after(self) -> int:
+        """Rough seconds until a slot frees up, from the mean conversion time."""
+        mean = self.total_seconds / self.processed if self.processed else 60.0
+        return max(1, int(mean * (self.queued + 1) / self.workers))
+
+    async def convert(self, path: str, batch_multiplier: int = 1):
+        """
+        Convert in a worker process. The caller holds a slot from try_acquire.
+        Cancelling drops a conversion that is still queued, but one already
+        running is waited out first, so the caller can't release its slot
+        while a worker is still busy with it.
+        """
+        executor = self.executor
+        start = time.perf_counter()
+        self.in_flight += 1
+        future = executor.submit(worker.convert_pdf, path, batch_multiplier)
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if not future.cancel():
+                await asyncio.wait([asyncio.wrap_future(future)])
+            raise
+        except BrokenProcessPool:
+            self.failed += 1
+            if self.executor is executor:
+                # A worker died (usually OOM-killed); replace the whole pool once
+                self.ready = False
+                self.shutdown()
+                asyncio.create_task(self.start())
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        self.processed += 1
+        self.total_seconds += time.perf_counter() - start
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "workers": self.workers,
+            "busy_workers": self.busy,
+            "queue_depth": self.queued,
+            "shards_waiting": max(0, self.in_flight - self.workers),
+            "queue_size": self.queue_size,
+            "processed": self.processed,
+            "failed": self.failed,
+            "avg_convert_seconds": round(self.total_seconds / self.processed, 2) if self.processed else None,
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.error,
+        }
+
+
+pool = ConversionPool(MARKER_WORKERS, MARKER_QUEUE_SIZE)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load models in the background so /health answers while they load
+    startup = asyncio.create_task(pool.start())
+    yield
+    startup.cancel()
+    pool.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+# Uploads are spooled to disk in blocks of this size, never read whole into memory
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("MARKER_MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+
+
+# Multipart framing around each file: boundaries, part headers, form fields
+MULTIPART_SLACK_BYTES = 64 * 1024
+
+
+class RequestTooLarge(HTTPException):
+    """Raised from the request body stream once it passes the upload limit."""
+
+    def __init__(self):
+        super().__init__(status_code=413, detail="Request exceeds the upload limit")
+
+
+class UploadLimitMiddleware:
+    """
+    Caps /convert and /convert_batch bodies before the multipart parser
+    spools them to disk: a larger Content-Length is refused outright, and a
+    body that streams past the limit (no or a false Content-Length) is cut
+    off with 413 as soon as it does. A batch may carry one full-size file
+    per conversion slot.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def limit(self, path: str) -> Optional[int]:
+        if path == "/convert":
+            return MAX_UPLOAD_BYTES + MULTIPART_SLACK_BYTES
+        if path == "/convert_batch":
+            return pool.capacity * (MAX_UPLOAD_BYTES + MULTIPART_SLACK_BYTES)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        limit = None
+        if scope["type"] == "http" and scope["method"] == "POST":
+            limit = self.limit(scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # An HTTPException: FastAPI passes it through form parsing as-is
+                    raise RequestTooLarge()
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestTooLarge:
+            if response_started:
+                raise
+            await self._reject(scope, receive, send)
+
+    @staticmethod
+    async def _reject(scope, receive, send):
+        response = JSONResponse({"detail": RequestTooLarge().detail}, status_code=413,
+                                headers={"Connection": "close"})
+        await response(scope, receive, send)
+
+
+app.add_middleware(UploadLimitMiddleware)
+
+
+async def save_upload(file: UploadFile) -> str:
+    """Stream an upload to a temp file; 413 once MAX_UPLOAD_BYTES is exceeded."""
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        temp_path = tmp.name
+        while True:
+            block = await file.read(UPLOAD_CHUNK_BYTES)
+            if not block:
+                break
+            size += len(block)
+            if size > MAX_UPLOAD_BYTES:
+                tmp.close()
+                os.unlink(temp_path)
+                raise HTTPException(status_code=413, detail="File exceeds the upload limit")
+            tmp.write(block)
+    return temp_path
+
+
+# conversion_id -> progress of running and recently finished conversions
+_progress: "OrderedDict[str, dict]" = OrderedDict()
+_PROGRESS_KEEP = 200
+
+
+def shard_ranges(pages: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    [start, end) page ranges: one for small documents; otherwise a multiple of
+    the worker count, each at most MARKER_SHARD_PAGES, so rounds stay balanced.
+    """
+    if workers < 2 or pages < MARKER_SHARD_MIN_PAGES:
+        return [(0, pages)]
+    shards = workers * math.ceil(pages / (workers * MARKER_SHARD_PAGES))
+    size = math.ceil(pages / shards)
+    return [(start, min(start + size, pages)) for start in range(0, pages, size)]
+
+
+def _track(progress: dict):
+    _progress[progress["conversion_id"]] = progress
+    while len(_progress) > _PROGRESS_KEEP:
+        oldest = next(iter(_progress))
+        if _progress[oldest]["status"] == "running":
+            break
+        _progress.popitem(last=False)
+
+
+async def convert_document(path: str, filename: str, conversion_id: Optional[str] = None,
+                           batch_multiplier: int = 1):
+    """
+    Convert one PDF. Long documents are split into page shards converted in
+    parallel and stitched back in page order; the caller holds one slot and
+    every further shard takes its own, so a document is only sharded when
+    enough slots are free. Progress is recorded under conversion_id.
+    Returns (markdown, metadata).
+    """
+    progress = {"conversion_id": conversion_id or str(uuid.uuid4()), "filename": filename,
+                "status": "running", "pages": None, "started_at": time.time(), "shards": []}
+    _track(progress)
+    shard_paths = []
+    extra_slots = 0
+    try:
+        try:
+            pages = await asyncio.to_thread(worker.page_count, path)
+        except Exception:
+            pages = None  # pdfium can't read it; let Marker try the whole file
+        progress["pages"] = pages
+        ranges = shard_ranges(pages, pool.workers) if pages else [(0, 0)]
+        if len(ranges) > 1:
+            if pool.try_acquire(len(ranges) - 1):
+                extra_slots = len(ranges) - 1
+            else:
+                ranges = [(0, pages)]  # pool too busy to shard; convert it whole
+        progress["shards"] = [{"index": i, "pages": [start + 1, end], "status": "pending"}
+                              for i, (start, end) in enumerate(ranges)]
+        if len(ranges) > 1:
+            shard_paths = await asyncio.to_thread(worker.split_pdf, path, ranges)
+        else:
+            shard_paths = [path]
+
+        async def convert_shard(i: int):
+            shard = progress["shards"][i]
+            start = time.perf_counter()
+            try:
+                result = await pool.convert(shard_paths[i], batch_multiplier)
+            except Exception as e:
+                shard.update(status="failed", error=f"{type(e).__name__}: {e}")
+                raise
+            shard.update(status="done", seconds=round(time.perf_counter() - start, 1))
+            return result
+
+        results = await asyncio.gather(*[convert_shard(i) for i in range(len(ranges))],
+                                       return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        if len(results) == 1:
+            text, metadata = results[0]
+        else:
+            text = worker.stitch_markdown([r[0] for r in results])
+            metadata = dict(results[0][1] or {})
+            metadata.update({"pages": pages, "shards": len(results)})
+        progress["status"] = "done"
+        return text, metadata
+    except BaseException:
+        progress["status"] = "failed"
+        raise
+    finally:
+        progress["seconds"] = round(time.time() - progress["started_at"], 1)
+        # gather() only returns once every shard's conversion has finished
+        pool.release(extra_slots)
+        for shard_path in shard_paths:
+            if shard_path != path and os.path.exists(shard_path):
+                os.unlink(shard_path)
+
+
+def busy_response() -> JSONResponse:
+    retry_after = pool.retry_after()
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": "Conversion queue is full, retry later",
+            "queue_position": pool.queued + 1,
+            "queue_depth": pool.queued,
+            "busy_workers": pool.busy,
+        },
+        headers={"Retry-After": str(retry_after)}
+    )
 
 
 @app.post('/convert')
-async def convert(file: UploadFile = File(...)):
+async def convert(file: UploadFile = File(...), conversion_id: Optional[str] = None):
+    """
+    Convert one PDF to markdown. Pass conversion_id to follow per-shard
+    progress of a long document at GET /progress/{conversion_id}.
+    """
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="File must be a PDF")
-    
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        tmp.write(await file.read())
-        temp_path = tmp.name
+    if not pool.ready:
+        raise HTTPException(status_code=503, detail="Models are still loading",
+                            headers={"Retry-After": "30"})
+    if not pool.try_acquire():
+        return busy_response()
 
+    temp_path = None
     try:
-        models = get_models()
-        text, images, metadata = convert_single_pdf(temp_path, models)
+        temp_path = await save_upload(file)
+        conversion_id = conversion_id or str(uuid.uuid4())
+        text, metadata = await convert_document(temp_path, file.filename, conversion_id)
         return {
             "markdown": text or "",
-            "metadata": metadata or {}
+            "metadata": metadata or {},
+            "conversion_id": conversion_id
         }
+    except HTTPException:
+        raise
     except MemoryError as e:
         raise HTTPException(
             status_code=507,
             detail=f"Out of memory. Use VM with more RAM (32GB+). {str(e)}"
         )
+    except BrokenProcessPool as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Conversion worker crashed (out of memory?), restarting workers: {e}",
+            headers={"Retry-After": "60"}
+        )
     except Exception as e:
         import traceback
         err_detail = f"{type(e).__name__}: {str(e)}\n{traceback.format_exc()[:800]}"
         raise HTTPException(status_code=500, detail=err_detail)
     finally:
-        if os.path.exists(temp_path):
+        pool.release()
+        if temp_path and os.path.exists(temp_path):
             os.unlink(temp_path)
 
 
+# Conversions of /convert_batch requests, kept referenced while they run
+_batch_tasks: set = set()
+
+
+@app.post('/convert_batch')
+async def convert_batch(files: List[UploadFile] = File(...)):
+    """
+    Convert several PDFs across the worker pool and stream one NDJSON line per
+    document as soon as it finishes, in completion order:
+    {"index", "filename", "markdown", "metadata"} or {"index", "filename", "error", "status"}.
+    A final {"done": true, ...} line closes the stream.
+    """
+    for file in files:
+        if not file.filename.endswith(".pdf"):
+            raise HTTPException(status_code=400, detail=f"{file.filename}: file must be a PDF")
+    if not pool.ready:
+        raise HTTPException(status_code=503, detail="Models are still loading",
+                            headers={"Retry-After": "30"})
+    if len(files) > pool.capacity:
+        raise HTTPException(status_code=413,
+                            detail=f"Batch of {len(files)} exceeds the {pool.capacity} conversion slots")
+    if not pool.try_acquire(len(files)):
+        return busy_response()
+
+    paths = []
+    try:
+        for file in files:
+            paths.append(await save_upload(file))
+    except BaseException:
+        pool.release(len(files))
+        for path in paths:
+            os.unlink(path)
+        raise
+
+    async def convert_one(index: int):
+        try:
+            text, metadata = await convert_document(paths[index], files[index].filename,
+                                                    batch_multiplier=MARKER_BATCH_MULTIPLIER)
+            return {"index": index, "filename": files[index].filename,
+                    "markdown": text or "", "metadata": metadata or {}}
+        except MemoryError as e:
+            return {"index": index, "filename": files[index].filename,
+                    "error": f"Out of memory: {e}", "status": 507}
+        except BrokenProcessPool as e:
+            return {"index": index, "filename": files[index].filename,
+                    "error": f"Conversion worker crashed: {e}", "status": 503}
+        except Exception as e:
+            return {"index": index, "filename": files[index].filename,
+                    "error": f"{type(e).__name__}: {e}", "status": 500}
+        finally:
+            pool.release()
+            if os.path.exists(paths[index]):
+                os.unlink(paths[index])
+
+    # Started before the response, so every slot and temp file is released by
+    # its own task even if the client disconnects before reading a line
+    tasks = [asyncio.create_task(convert_one(i)) for i in range(len(paths))]
+    for task in tasks:
+        _batch_tasks.add(task)
+        task.add_done_callback(_batch_tasks.discard)
+
+    async def results():
+        converted = failed = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                line = await finished
+                if "error" in line:
+                    failed += 1
+                else:
+                    converted += 1
+                yield json.dumps(line) + "\n"
+            yield json.dumps({"done": True, "converted": converted, "failed": failed}) + "\n"
+        finally:
+            # Client went away: queued conversions are dropped, running ones
+            # finish before their slot is released (see ConversionPool.convert)
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@app.get("/progress/{conversion_id}")
+async def get_progress(conversion_id: str):
+    """Per-shard progress of a running or recently finished conversion."""
+    progress = _progress.get(conversion_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail=f"Conversion {conversion_id} not found")
+    done = sum(1 for shard in progress["shards"] if shard["status"] == "done")
+    return {**progress, "shards_done": done, "shards_total": len(progress["shards"])}
+
+
+@app.get("/progress")
+async def list_progress():
+    """Conversions currently running."""
+    return {"running": [
+        {"conversion_id": cid, "filename": p["filename"], "pages": p["pages"],
+         "shards_done": sum(1 for s in p["shards"] if s["status"] == "done"),
+         "shards_total": len(p["shards"])}
+        for cid, p in _progress.items() if p["status"] == "running"
+    ]}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once every worker has loaded its models."""
+    if not pool.ready:
+        return JSONResponse(status_code=503, content={"ready": False, "error": pool.error})
+    return {"ready": True}
+
+
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
\ No newline at end of file
+    status = "ok" if pool.ready else ("error" if pool.error else "loading")
+    return {"status": status, **pool.stats()}
@@ -0,0 +1,125 @@
+"""
+Marker conversion worker.
+Runs inside the service's process pool: each worker process loads the Marker
+models once in its initializer, then converts PDFs on request. Kept apart from
+app.py so spawned workers don't import the web app. The page-splitting helpers
+run in the web process to shard long documents.
+"""
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import List, Tuple
+
+# pdfium is not thread-safe; serialise the splitting helpers
+_pdfium_lock = threading.Lock()
+
+_models = None
+_startup_barrier = None
+
+
+def init_worker(startup_barrier=None):
+    """
+    Process pool initializer: load the models this worker will reuse.
+    startup_barrier is a multiprocessing Barrier sized to the pool (see warm_up).
+    """
+    global _models, _startup_barrier
+    _startup_barrier = startup_barrier
+    from marker.models import load_all_models
+    _models = load_all_models()
+
+
+def warm_up(timeout: float = 900.0) -> Tuple[int, float]:
+    """
+    Convert a one-page blank PDF so the first real request does not pay for
+    lazy CUDA/kernel initialisation, then wait at the startup barrier for the
+    other workers. A process runs one task at a time, so one warm-up per
+    worker held at the barrier is guaranteed to reach every process.
+    Returns (pid, seconds).
+    """
+    start = time.perf_counter()
+    try:
+        if os.getenv("MARKER_WARMUP", "1") == "1":
+            import pypdfium2 as pdfium
+            fd, path = tempfile.mkstemp(suffix=".pdf")
+            os.close(fd)
+            try:
+                pdf = pdfium.PdfDocument.new()
+                pdf.new_page(612, 792)
+                pdf.save(path)
+                convert_pdf(path)
+            finally:
+                os.unlink(path)
+        if _startup_barrier is not None:
+            _startup_barrier.wait(timeout)
+    except BaseException:
+        # Don't leave the other workers waiting for one that failed
+        if _startup_barrier is not None:
+            _startup_barrier.abort()
+        raise
+    return os.getpid(), time.perf_counter() - start
+
+
+def convert_pdf(path: str, batch_multiplier: int = 1):
+    """
+    Convert one PDF with the preloaded models. batch_multiplier scales Marker's
+    per-model batch sizes (more pages per forward pass, more memory).
+    Returns (markdown, metadata).
+    """
+    from marker.convert import convert_single_pdf
+    kwargs = {"batch_multiplier": batch_multiplier} if batch_multiplier != 1 else {}
+    text, images, metadata = convert_single_pdf(path, _models, **kwargs)
+    # Page images are dropped: they are large and the API only returns markdown
+    return text or "", metadata or {}
+
+
+def page_count(path: str) -> int:
+    import pypdfium2 as pdfium
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+
+def split_pdf(path: str, page_ranges: List[Tuple[int, int]]) -> List[str]:
+    """Write each [start, end) page range of path to its own temp PDF."""
+    import pypdfium2 as pdfium
+    shard_paths = []
+    with _pdfium_lock:
+        src = pdfium.PdfDocument(path)
+        try:
+            for start, end in page_ranges:
+                shard = pdfium.PdfDocument.new()
+                shard.import_pages(src, list(range(start, end)))
+                fd, shard_path = tempfile.mkstemp(suffix=f"-p{start}.pdf")
+                os.close(fd)
+                shard.save(shard_path)
+                shard.close()
+                shard_paths.append(shard_path)
+        except BaseException:
+            for shard_path in shard_paths:
+                os.unlink(shard_path)
+            raise
+        finally:
+            src.close()
+    return shard_paths
+
+
+def stitch_markdown(parts: List[str]) -> str:
+    """
+    Join shard markdown in page order. A shard that starts mid-sentence (a
+    paragraph broken across the page boundary) is joined with a space;
+    otherwise, and always before a heading, blocks are separated by a blank line.
+    """
+    text = ""
+    for part in parts:
+        part = part.strip()
+        if not part:
+            continue
+        continues = (text and not part.startswith(("#", "|", "-", "*", "!", ">"))
+                     and re.match(r"[a-z,;(]", part) and not re.search(r"[.!?:]\s*$", text))
+        text += (" " if continues else ("\n\n" if text else "")) + part
+    return text
@@ -0,0 +1,94 @@
+"""
+Author Duplicate Migration
+Folds Author nodes created before author resolution ("J. Doe", "John Doe"
+and "Doe, John" as three nodes) into one node per person. Every ingested
+paper's authors are replayed through a fresh AuthorResolver in ingest order,
+exactly as new papers are resolved, and each AUTHORED edge is moved to the
+node its author resolved to. Authors left without papers are deleted; their
+names are kept as aliases of the node they folded into.
+
+Restart the API afterwards: its in-memory author index still holds the
+deleted names.
+"""
+import argparse
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+from services.author_resolver import AuthorResolver
+from services.neo4j_service import get_neo4j_service
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def migrate_author_duplicates(batch_size: int = 1000, dry_run: bool = False) -> int:
+    """Re-resolve every AUTHORED edge. Returns the number of Author nodes merged away."""
+    neo4j = get_neo4j_service()
+    if not neo4j.verify_connection():
+        print("Cannot connect to Neo4j. Check your connection settings.")
+        return 0
+
+    resolver = AuthorResolver()
+    moves = []
+    papers = 0
+    with neo4j.driver.session() as session:
+        result = session.run("""
+            MATCH (p:Ingested)
+            WITH p ORDER BY p.created_at, p.job_id
+            RETURN elementId(p) AS id,
+                   [(a:Author)-[:AUTHORED]->(p) | {name: a.name, affiliation: a.affiliation}] AS authors
+        """)
+        for record in result:
+            papers += 1
+            for author in resolver.resolve_paper(record["authors"]):
+                if author["name"] != author["mention"]:
+                    moves.append({"paper": record["id"], "dup": author["mention"],
+                                  "keep": author["name"]})
+    merged_names = sorted({move["dup"] for move in moves})
+    print(f"{papers} papers replayed: {len(moves)} authorships to move, "
+          f"{len(merged_names)} author names folded into others")
+    if dry_run:
+        for move in moves[:50]:
+            print(f"  {move['dup']!r} -> {move['keep']!r}")
+        return 0
+
+    deleted = 0
+    with neo4j.driver.session() as session:
+        for batch in _chunks(moves, batch_size):
+            session.run("""
+                UNWIND $moves AS move
+                MATCH (dup:Author {name: move.dup})-[r:AUTHORED]->(p:Paper)
+                WHERE elementId(p) = move.paper
+                MATCH (keep:Author {name: move.keep})
+                MERGE (keep)-[:AUTHORED]->(p)
+                SET keep.affiliation = coalesce(keep.affiliation, dup.affiliation),
+                    keep.aliases = CASE WHEN move.dup IN coalesce(keep.aliases, [])
+                                        THEN keep.aliases
+                                        ELSE coalesce(keep.aliases, []) + move.dup END
+                DELETE r
+            """, moves=batch)
+        # A name can still author papers where it resolved to itself
+        for batch in _chunks(merged_names, batch_size):
+            deleted += session.run("""
+                UNWIND $names AS name
+                MATCH (a:Author {name: name})
+                WHERE NOT (a)-[:AUTHORED]->()
+                DETACH DELETE a
+                RETURN count(*) AS deleted
+            """, names=batch).single()["deleted"]
+
+    print(f"Moved {len(moves)} authorships, deleted {deleted} duplicate authors")
+    return deleted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge duplicate Author nodes")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="Report the merges without writing")
+    args = parser.parse_args()
+    migrate_author_duplicates(args.batch_size, args.dry_run)
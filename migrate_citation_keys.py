@@ -0,0 +1,110 @@
+"""
+Citation Key Migration
+Assigns citation_key to Paper nodes created before citation resolution and
+folds duplicate placeholder papers (title variants of one reference) into a
+single node, moving their incoming CITES relationships. Run after
+migrations/003_citation_keys.cypher.
+"""
+import argparse
+from collections import defaultdict
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+from services.neo4j_service import get_neo4j_service
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def migrate_citation_keys(batch_size: int = 1000) -> int:
+    """Key every unkeyed Paper node. Returns the number of duplicates merged."""
+    neo4j = get_neo4j_service()
+    if not neo4j.verify_connection():
+        print("Cannot connect to Neo4j. Check your connection settings.")
+        return 0
+    resolver = neo4j._citation_resolver()
+
+    with neo4j.driver.session() as session:
+        # Ingested papers first so they claim their keys before placeholders
+        rows = session.run("""
+            MATCH (p:Paper) WHERE p.citation_key IS NULL
+            RETURN elementId(p) AS id, p.title AS title, p.doi AS doi,
+                   p.arxiv AS arxiv, p.job_id IS NOT NULL AS ingested
+            ORDER BY ingested DESC
+        """).data()
+    print(f"{len(rows)} papers without a citation key")
+
+    groups = defaultdict(list)
+    for row in rows:
+        entry = resolver.resolve(row, ingested=row["ingested"])
+        if entry:
+            groups[entry["key"]].append(row)
+
+    with neo4j.driver.session() as session:
+        holders = {}
+        for keys in _chunks(list(groups), batch_size):
+            for record in session.run("""
+                UNWIND $keys AS key
+                MATCH (p:Paper {citation_key: key})
+                RETURN key, elementId(p) AS id, p.job_id IS NOT NULL AS ingested
+            """, keys=keys):
+                holders[record["key"]] = {"id": record["id"], "ingested": record["ingested"]}
+
+        assign, merges, skipped = [], [], 0
+        for key, nodes in groups.items():
+            holder = holders.get(key)
+            candidates = ([holder] if holder else []) + nodes
+            keeper = next((n for n in candidates if n["ingested"]), candidates[0])
+            if keeper is not holder:
+                if holder:
+                    merges.append({"dup": holder["id"], "keep": keeper["id"]})
+                assign.append({"id": keeper["id"], "key": key})
+            for node in nodes:
+                if node is keeper:
+                    continue
+                if node["ingested"]:
+                    # Two ingested papers never merge automatically
+                    skipped += 1
+                    print(f"Skipped ingested duplicate of {key}: {node['title']!r}")
+                else:
+                    merges.append({"dup": node["id"], "keep": keeper["id"]})
+
+        # Merge first: a keeper cannot take a key its placeholder still holds
+        for batch in _chunks(merges, batch_size):
+            session.run("""
+                UNWIND $pairs AS pair
+                MATCH (dup:Paper) WHERE elementId(dup) = pair.dup
+                MATCH (keep:Paper) WHERE elementId(keep) = pair.keep
+                CALL {
+                    WITH dup, keep
+                    MATCH (src:Paper)-[r:CITES]->(dup) WHERE src <> keep
+                    MERGE (src)-[:CITES]->(keep)
+                    DELETE r
+                }
+                SET keep.doi = coalesce(keep.doi, dup.doi),
+                    keep.arxiv = coalesce(keep.arxiv, dup.arxiv),
+                    keep.year = coalesce(keep.year, dup.year)
+                DETACH DELETE dup
+            """, pairs=batch)
+        for batch in _chunks(assign, batch_size):
+            session.run("""
+                UNWIND $rows AS row
+                MATCH (p:Paper) WHERE elementId(p) = row.id
+                SET p.citation_key = row.key
+            """, rows=batch)
+
+    print(f"Keyed {len(assign)} papers, merged {len(merges)} duplicates, "
+          f"skipped {skipped} ingested duplicates")
+    return len(merges)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assign citation keys to existing papers")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    migrate_citation_keys(args.batch_size)
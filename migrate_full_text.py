@@ -0,0 +1,61 @@
+"""
+Full Text Migration
+Moves Paper.full_text written before the blob store existed out of Neo4j:
+each paper's text goes to the blob store and the node keeps only
+full_text_ref and full_text_size.
+"""
+import argparse
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+from services.blob_store import get_blob_store
+from services.neo4j_service import get_neo4j_service
+
+
+def migrate_full_text(batch_size: int = 200) -> int:
+    """Offload full text in batches of batch_size papers. Returns papers migrated."""
+    neo4j = get_neo4j_service()
+    if not neo4j.verify_connection():
+        print("Cannot connect to Neo4j. Check your connection settings.")
+        return 0
+
+    store = get_blob_store()
+    migrated = 0
+    stored_bytes = 0
+    with neo4j.driver.session() as session:
+        while True:
+            rows = session.run("""
+                MATCH (p:Paper) WHERE p.full_text IS NOT NULL
+                RETURN elementId(p) AS id, p.full_text AS full_text
+                LIMIT $limit
+            """, limit=batch_size).data()
+            if not rows:
+                break
+            updates = []
+            for row in rows:
+                blob = store.put_text(row["full_text"])
+                stored_bytes += blob["stored_bytes"]
+                updates.append({"id": row["id"], "ref": blob["ref"], "size": blob["size"]})
+            # Blobs are written before the property is removed, so an
+            # interrupted run never loses text
+            session.run("""
+                UNWIND $updates AS u
+                MATCH (p:Paper) WHERE elementId(p) = u.id
+                SET p.full_text_ref = u.ref, p.full_text_size = u.size
+                REMOVE p.full_text
+            """, updates=updates)
+            migrated += len(rows)
+            print(f"Migrated {migrated} papers ({stored_bytes / 1e6:.1f} MB compressed)")
+
+    print(f"Done: {migrated} papers moved to {store.root} ({store.codec})")
+    return migrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move Paper.full_text into the blob store")
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    migrate_full_text(args.batch_size)
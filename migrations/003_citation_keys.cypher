@@ -0,0 +1,21 @@
+// ===================================
+// Citation identity (Neo4j 5.x syntax)
+// ===================================
+// Papers are identified by citation_key (doi:..., arxiv:... or title:<fingerprint>)
+// instead of their exact title string. Run `python migrate_citation_keys.py`
+// afterwards to key and de-duplicate papers created before this migration.
+
+
+// Titles are no longer identity: two references may share a title and
+// variants of one title now resolve to the same key
+DROP CONSTRAINT paper_title_unique IF EXISTS;
+
+// Title lookups (/papers/{title}, search) still need an index
+CREATE INDEX paper_title_index IF NOT EXISTS FOR (p:Paper) ON (p.title);
+
+// One node per citation key
+CREATE CONSTRAINT paper_citation_key_unique IF NOT EXISTS
+FOR (p:Paper) REQUIRE p.citation_key IS UNIQUE;
+
+// DOI lookups
+CREATE INDEX paper_doi_index IF NOT EXISTS FOR (p:Paper) ON (p.doi);
@@ -0,0 +1,15 @@
+// ===================================
+// Ingested paper listing (Neo4j 5.x syntax)
+// ===================================
+// Ingested papers carry an :Ingested label so listings never touch citation
+// placeholders, and a composite index serves /papers keyset pagination.
+
+
+// Label papers ingested before the label existed
+MATCH (p:Paper) WHERE p.job_id IS NOT NULL AND NOT p:Ingested
+CALL { WITH p SET p:Ingested, p.created_at = coalesce(p.created_at, datetime()) }
+IN TRANSACTIONS OF 10000 ROWS;
+
+// Keyset order for /papers: newest first, job_id breaks ties
+CREATE INDEX ingested_created_job IF NOT EXISTS
+FOR (p:Ingested) ON (p.created_at, p.job_id);
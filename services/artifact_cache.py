@@ -0,0 +1,128 @@
+"""
+Content-addressed extraction artifact cache.
+Stores raw GROBID TEI, Marker markdown and parsed entities on disk keyed by the
+SHA-256 of the uploaded PDF, with size-bounded LRU eviction.
+"""
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from services.config import data_dir, get_section
+
+
+class ArtifactCache:
+    """On-disk cache: <root>/<sha[:2]>/<sha>/<artifact name>."""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # sha -> total bytes of that entry, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Rebuild the LRU order from entry directory mtimes."""
+        found = []
+        for prefix in os.listdir(self.root):
+            prefix_dir = os.path.join(self.root, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for sha in os.listdir(prefix_dir):
+                entry_dir = os.path.join(prefix_dir, sha)
+                size = sum(
+                    os.path.getsize(os.path.join(entry_dir, name))
+                    for name in os.listdir(entry_dir)
+                )
+                found.append((os.path.getmtime(entry_dir), sha, size))
+        for _, sha, size in sorted(found):
+            self._entries[sha] = size
+            self._total += size
+
+    def _entry_dir(self, sha: str) -> str:
+        return os.path.join(self.root, sha[:2], sha)
+
+    def get_text(self, sha: str, name: str) -> Optional[str]:
+        """Return a cached artifact, or None on a miss."""
+        path = os.path.join(self._entry_dir(sha), name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            if sha in self._entries:
+                self._entries.move_to_end(sha)
+        try:
+            os.utime(self._entry_dir(sha))
+        except OSError:
+            pass
+        return text
+
+    def put_text(self, sha: str, name: str, text: str):
+        """Write an artifact atomically, then evict old entries past max_bytes."""
+        entry_dir = self._entry_dir(sha)
+        os.makedirs(entry_dir, exist_ok=True)
+        path = os.path.join(entry_dir, name)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(tmp_path, path)
+        added = os.path.getsize(path) - old_size
+
+        with self._lock:
+            self._entries[sha] = self._entries.get(sha, 0) + added
+            self._entries.move_to_end(sha)
+            self._total += added
+            evicted = []
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                old_sha, size = self._entries.popitem(last=False)
+                self._total -= size
+                evicted.append(old_sha)
+        for old_sha in evicted:
+            shutil.rmtree(self._entry_dir(old_sha), ignore_errors=True)
+
+    def get_json(self, sha: str, name: str) -> Optional[Any]:
+        text = self.get_text(sha, name)
+        return json.loads(text) if text is not None else None
+
+    def put_json(self, sha: str, name: str, value: Any):
+        self.put_text(sha, name, json.dumps(value))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Singleton instance
+_artifact_cache = None
+
+def get_artifact_cache() -> ArtifactCache:
+    """Get or create the artifact cache singleton."""
+    global _artifact_cache
+    if _artifact_cache is None:
+        cfg = get_section("artifact_cache")
+        _artifact_cache = ArtifactCache(
+            root=os.getenv("ARTIFACT_CACHE_DIR") or cfg.get("dir") or data_dir("artifacts"),
+            max_bytes=int(os.getenv("ARTIFACT_CACHE_MAX_BYTES") or cfg.get("max_bytes", 2 * 1024 ** 3))
+        )
+    return _artifact_cache
@@ -0,0 +1,110 @@
+"""
+Async Neo4j Service
+Read path for the API on the neo4j AsyncGraphDatabase driver, so request
+handlers await the graph instead of blocking the event loop. Same queries
+and result shapes as Neo4jService; every read runs in a read transaction so
+Aura can route it to a read replica. Ingestion keeps using the sync service
+from the pipeline's worker threads.
+"""
+import asyncio
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from neo4j import AsyncGraphDatabase
+
+from services.neo4j_service import (
+    PAPER_DETAIL_QUERY,
+    RELATED_PAPERS_QUERY,
+    driver_settings,
+    list_papers_page,
+    list_papers_query,
+    paper_from_row,
+    related_from_rows,
+    related_params,
+)
+
+load_dotenv()
+
+
+async def _fetch_rows(tx, query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    result = await tx.run(query, params)
+    return await result.data()
+
+
+class AsyncNeo4jService:
+    """Async counterpart of Neo4jService's read operations."""
+
+    def __init__(self):
+        self.uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
+        # Aura uses NEO4J_USERNAME; fallback to NEO4J_USER
+        self.user = os.getenv("NEO4J_USER") or os.getenv("NEO4J_USERNAME", "neo4j")
+        self.password = os.getenv("NEO4J_PASSWORD", "password")
+        self.driver = None
+
+    def connect(self):
+        """Create the driver; connections are opened lazily from the pool."""
+        if not self.driver:
+            self.driver = AsyncGraphDatabase.driver(
+                self.uri,
+                auth=(self.user, self.password),
+                **driver_settings()
+            )
+        return self
+
+    async def close(self):
+        """Close the driver and its pooled connections."""
+        if self.driver:
+            await self.driver.close()
+            self.driver = None
+
+    async def _read(self, query: str, **params) -> List[Dict[str, Any]]:
+        """Run a query in a read transaction (routable to read replicas)."""
+        async with self.driver.session() as session:
+            return await session.execute_read(_fetch_rows, query, params)
+
+    async def verify_connection(self) -> bool:
+        """Verify that the connection to Neo4j is working."""
+        try:
+            await self.driver.verify_connectivity()
+            return True
+        except Exception as e:
+            print(f"Neo4j connection failed: {e}")
+            return False
+
+    async def get_paper_by_title(self, title: str, include_text: bool = False) -> Optional[Dict[str, Any]]:
+        """See Neo4jService.get_paper_by_title; full text is read off the event loop."""
+        rows = await self._read(PAPER_DETAIL_QUERY, title=title, include_text=include_text)
+        if not rows:
+            return None
+        if include_text:
+            return await asyncio.to_thread(paper_from_row, rows[0], True)
+        return paper_from_row(rows[0])
+
+    async def list_papers(self, limit: int = 100, cursor: str = None,
+                          max_authors: int = 20) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """See Neo4jService.list_papers."""
+        query, params = list_papers_query(limit, cursor, max_authors)
+        return list_papers_page(await self._read(query, **params), limit)
+
+    async def get_all_papers(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get the newest ingested papers with basic info."""
+        return (await self.list_papers(limit=limit))[0]
+
+    async def find_related_papers(self, title: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """See Neo4jService.find_related_papers."""
+        return related_from_rows(await self._read(RELATED_PAPERS_QUERY, **related_params(title, limit)))
+
+
+# Singleton instance
+_async_neo4j_service = None
+_async_neo4j_service_lock = threading.Lock()
+
+def get_async_neo4j_service() -> AsyncNeo4jService:
+    """Get or create the async Neo4j service singleton."""
+    global _async_neo4j_service
+    with _async_neo4j_service_lock:
+        if _async_neo4j_service is None:
+            _async_neo4j_service = AsyncNeo4jService().connect()
+    return _async_neo4j_service
@@ -0,0 +1,265 @@
+"""
+Author entity resolution.
+Maps author mentions ("J. Doe", "John Doe", "Doe, John") to existing Author
+nodes. Candidates come from a blocking index on surname + first initial, so
+only a handful of authors are ever compared; within a block they are scored
+on name compatibility, affiliation overlap and shared co-authors.
+
+The index is held in memory, loaded from Neo4j on first use and updated as
+papers are ingested.
+"""
+import re
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+_PARTICLES = {"van", "von", "der", "den", "de", "del", "della", "da", "di", "du",
+              "la", "le", "ter", "ten", "dos", "das", "bin", "al", "el"}
+_AFFILIATION_STOPWORDS = {"university", "universite", "universitat", "universidad",
+                          "department", "dept", "institute", "school", "college",
+                          "faculty", "laboratory", "lab", "center", "centre",
+                          "the", "and", "for", "of", "de", "inc", "ltd"}
+
+# A name with a full forename matches its identical form outright; a
+# compatible but different form ("J. Doe" / "John Doe") scores
+# _COMPATIBLE_NAME and needs affiliation or co-author evidence to pass
+_COMPATIBLE_NAME = 0.3
+_AFFILIATION_WEIGHT = 0.3
+_COAUTHOR_WEIGHT = 0.2
+_MAX_COAUTHORS = 64
+
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def split_name(name: str, surname: str = None, forenames: List[str] = None) -> Tuple[List[str], str]:
+    """
+    (forenames, surname), lowercase and accent-folded. Uses GROBID's
+    surname/forenames when given, else parses "Doe, John A." or "John A. Doe".
+    Initials come back as single letters.
+    """
+    if surname:
+        given = " ".join(forenames or [])
+        family = surname
+    elif "," in name:
+        family, given = name.split(",", 1)
+    else:
+        tokens = name.split()
+        # Keep particles with the surname ("Ludwig van Beethoven")
+        cut = len(tokens) - 1
+        while cut > 1 and _fold(tokens[cut - 1]).strip(".") in _PARTICLES:
+            cut -= 1
+        given, family = " ".join(tokens[:cut]), " ".join(tokens[cut:])
+    given_tokens = []
+    for token in re.findall(r"[^\W\d_]+\.?|-", _fold(given)):
+        if token == "-":
+            continue
+        if token.endswith(".") or len(token) == 1:
+            # "J.A." arrives as "j." "a."
+            given_tokens.append(token.rstrip(".")[:1])
+        else:
+            given_tokens.append(token)
+    family_norm = " ".join(re.findall(r"[^\W\d_]+", _fold(family)))
+    return given_tokens, family_norm
+
+
+def block_key(forenames: List[str], surname: str) -> str:
+    """Blocking key: surname plus first initial ("doe|j")."""
+    return f"{surname}|{forenames[0][:1] if forenames else ''}"
+
+
+def _forenames_compatible(a: List[str], b: List[str]) -> bool:
+    """Initials match full names with the same letter; two full names must agree."""
+    for x, y in zip(a, b):
+        if len(x) > 1 and len(y) > 1:
+            if x != y:
+                return False
+        elif x[:1] != y[:1]:
+            return False
+    return True
+
+
+def _affiliation_tokens(affiliation: Optional[str]) -> frozenset:
+    if not affiliation:
+        return frozenset()
+    return frozenset(t for t in re.findall(r"[a-z0-9]+", _fold(affiliation))
+                     if len(t) > 2 and t not in _AFFILIATION_STOPWORDS)
+
+
+class _Author:
+    __slots__ = ("name", "forenames", "affiliation", "coauthors")
+
+    def __init__(self, name: str, forenames: List[str], affiliation: frozenset):
+        self.name = name
+        self.forenames = forenames
+        self.affiliation = affiliation
+        self.coauthors: Set[int] = set()
+
+
+class AuthorResolver:
+    """In-memory blocking index over Author nodes."""
+
+    def __init__(self, threshold: float = 0.5):
+        self.threshold = threshold
+        self._authors: List[_Author] = []
+        self._blocks: Dict[str, List[int]] = {}
+        # normalised "forenames surname" -> author id, for identical names
+        self._exact: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._counts = {"exact": 0, "resolved": 0, "new": 0}
+        self._loaded = False
+
+    @staticmethod
+    def _mention(author: Union[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if isinstance(author, str):
+            author = {"name": author}
+        name = (author.get("name") or "").strip()
+        if not name:
+            return None
+        forenames, surname = split_name(name, author.get("surname"), author.get("forenames"))
+        if not surname:
+            return None
+        return {
+            "name": name,
+            "forenames": forenames,
+            "surname": surname,
+            "exact": f"{' '.join(forenames)} {surname}".strip(),
+            "affiliation": author.get("affiliation"),
+            "affiliation_tokens": _affiliation_tokens(author.get("affiliation")),
+        }
+
+    def _score(self, candidate: _Author, mention: Dict[str, Any], context: Set[int]) -> float:
+        if not _forenames_compatible(candidate.forenames, mention["forenames"]):
+            return 0.0
+        score = _COMPATIBLE_NAME
+        if mention["affiliation_tokens"] and candidate.affiliation:
+            overlap = len(mention["affiliation_tokens"] & candidate.affiliation)
+            score += _AFFILIATION_WEIGHT * overlap / len(mention["affiliation_tokens"] | candidate.affiliation)
+        if context:
+            score += _COAUTHOR_WEIGHT * min(len(candidate.coauthors & context), 2)
+        return score
+
+    def _best(self, mention: Dict[str, Any], context: Set[int],
+              fallback: bool = True) -> Tuple[Optional[int], str]:
+        exact = self._exact.get(mention["exact"])
+        initials_only = all(len(f) == 1 for f in mention["forenames"])
+        if exact is not None and not initials_only:
+            return exact, "exact"
+        # "J. Doe" goes to the author the evidence points at, and only falls
+        # back to an existing "J. Doe" node when there is none
+        best, best_score = None, self.threshold
+        for author_id in self._blocks.get(block_key(mention["forenames"], mention["surname"]), ()):
+            if author_id == exact:
+                continue
+            score = self._score(self._authors[author_id], mention, context)
+            if score >= best_score:
+                best, best_score = author_id, score
+        if best is not None:
+            return best, "resolved"
+        return (exact, "exact") if exact is not None and fallback else (None, "new")
+
+    def _add(self, mention: Dict[str, Any]) -> int:
+        author_id = len(self._authors)
+        self._authors.append(_Author(mention["name"], mention["forenames"], mention["affiliation_tokens"]))
+        self._blocks.setdefault(block_key(mention["forenames"], mention["surname"]), []).append(author_id)
+        self._exact.setdefault(mention["exact"], author_id)
+        return author_id
+
+    def _link(self, ids: List[int]):
+        for author_id in ids:
+            coauthors = self._authors[author_id].coauthors
+            if len(coauthors) < _MAX_COAUTHORS:
+                coauthors.update(i for i in ids if i != author_id)
+
+    def resolve_paper(self, authors: List[Union[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Resolve one paper's author list (names or {"name", "surname"?,
+        "forenames"?, "affiliation"?} dicts). Returns one entry per usable
+        author: {"name": Author node name, "mention", "affiliation", "match"}
+        where match is exact, resolved or new; the index learns the result.
+        """
+        mentions = [m for m in (self._mention(a) for a in authors) if m]
+        with self._lock:
+            ids: List[Optional[int]] = [None] * len(mentions)
+            matches = ["new"] * len(mentions)
+            # Pass 1: name and affiliation only. Pass 2: the rest, with the
+            # co-authors found in pass 1 as evidence.
+            for i, mention in enumerate(mentions):
+                ids[i], matches[i] = self._best(mention, set(), fallback=False)
+            context = {i for i in ids if i is not None}
+            for i, mention in enumerate(mentions):
+                if ids[i] is None:
+                    ids[i], matches[i] = self._best(mention, context)
+            for i, mention in enumerate(mentions):
+                if ids[i] is None:
+                    ids[i] = self._add(mention)
+                    context.add(ids[i])
+                elif mention["affiliation_tokens"] and not self._authors[ids[i]].affiliation:
+                    self._authors[ids[i]].affiliation = mention["affiliation_tokens"]
+                self._counts[matches[i]] += 1
+            self._link(ids)
+            return [
+                {
+                    "name": self._authors[author_id].name,
+                    "mention": mention["name"],
+                    "affiliation": mention["affiliation"],
+                    "match": match,
+                }
+                for author_id, mention, match in zip(ids, mentions, matches)
+            ]
+
+    def load(self, rows) -> int:
+        """Index existing {"name", "affiliation", "coauthors": [names]} rows."""
+        count = 0
+        with self._lock:
+            links = []
+            for row in rows:
+                mention = self._mention(row)
+                if not mention or mention["exact"] in self._exact:
+                    continue
+                links.append((self._add(mention), row.get("coauthors") or []))
+                count += 1
+            by_name = {author.name: i for i, author in enumerate(self._authors)}
+            for author_id, coauthors in links:
+                self._authors[author_id].coauthors.update(
+                    by_name[name] for name in coauthors[:_MAX_COAUTHORS] if name in by_name)
+            self._loaded = True
+        return count
+
+    def ensure_loaded(self, driver) -> int:
+        """Build the index from the graph's Author nodes (once per process)."""
+        with self._lock:
+            if self._loaded:
+                return 0
+        start = time.perf_counter()
+        with driver.session() as session:
+            result = session.run("""
+                MATCH (a:Author)
+                RETURN a.name AS name, a.affiliation AS affiliation,
+                       [(a)-[:AUTHORED]->(:Paper)<-[:AUTHORED]-(c:Author) | c.name][..$limit] AS coauthors
+            """, limit=_MAX_COAUTHORS)
+            count = self.load(record.data() for record in result)
+        if count:
+            print(f"Author index: {count} authors loaded in {time.perf_counter() - start:.1f}s")
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"authors": len(self._authors), "blocks": len(self._blocks),
+                    "resolved": dict(self._counts)}
+
+
+# Singleton instance
+_author_resolver = None
+_author_resolver_lock = threading.Lock()
+
+def get_author_resolver() -> AuthorResolver:
+    """Get or create the process-wide author resolver."""
+    global _author_resolver
+    with _author_resolver_lock:
+        if _author_resolver is None:
+            _author_resolver = AuthorResolver()
+    return _author_resolver
@@ -0,0 +1,111 @@
+"""
+Content-addressed blob store for paper full text.
+Text is stored compressed (zstd when the zstandard package is installed,
+gzip otherwise) at <root>/<sha[:2]>/<sha>.<zst|gz>, keyed by the SHA-256 of
+the uncompressed UTF-8 bytes. Paper nodes only keep the ref and the size.
+"""
+import gzip
+import hashlib
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from services.config import data_dir, env_int
+
+_zstd = None
+
+
+def _get_zstd():
+    """zstandard module, or None when it is not installed."""
+    global _zstd
+    if _zstd is None:
+        try:
+            import zstandard
+            _zstd = zstandard
+        except ImportError:
+            _zstd = False
+    return _zstd or None
+
+
+_EXTENSIONS = {"zstd": "zst", "gzip": "gz"}
+
+
+class BlobStore:
+    """Compressed, content-addressed text blobs on local disk."""
+
+    def __init__(self, root: str, codec: str = None, level: int = None):
+        if codec is None:
+            codec = "zstd" if _get_zstd() else "gzip"
+        if codec not in _EXTENSIONS:
+            raise ValueError(f"Unknown blob codec: {codec}")
+        if codec == "zstd" and not _get_zstd():
+            raise ValueError("zstd codec requires the zstandard package")
+        self.root = root
+        self.codec = codec
+        self.level = level if level is not None else (10 if codec == "zstd" else 6)
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, sha: str, codec: str) -> str:
+        return os.path.join(self.root, sha[:2], f"{sha}.{_EXTENSIONS[codec]}")
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return _get_zstd().ZstdCompressor(level=self.level).compress(data)
+        return gzip.compress(data, compresslevel=self.level)
+
+    def put_text(self, text: str) -> Dict[str, Any]:
+        """Store text (no-op if already present). Returns {"ref", "size", "stored_bytes"}."""
+        data = text.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        ref = f"sha256:{sha}"
+        for codec in _EXTENSIONS:
+            existing = self._path(sha, codec)
+            if os.path.exists(existing):
+                return {"ref": ref, "size": len(data), "stored_bytes": os.path.getsize(existing)}
+
+        path = self._path(sha, self.codec)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        blob = self._compress(data)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)
+        return {"ref": ref, "size": len(data), "stored_bytes": len(blob)}
+
+    def get_text(self, ref: str) -> Optional[str]:
+        """Return the text for a ref, or None if the blob is missing."""
+        sha = ref.split(":", 1)[-1]
+        for codec in _EXTENSIONS:
+            path = self._path(sha, codec)
+            try:
+                with open(path, "rb") as f:
+                    blob = f.read()
+            except FileNotFoundError:
+                continue
+            if codec == "zstd":
+                zstd = _get_zstd()
+                if not zstd:
+                    raise RuntimeError(f"Blob {ref} is zstd-compressed but zstandard is not installed")
+                data = zstd.ZstdDecompressor().decompress(blob)
+            else:
+                data = gzip.decompress(blob)
+            return data.decode("utf-8")
+        return None
+
+
+# Singleton instance
+_blob_store = None
+_blob_store_lock = threading.Lock()
+
+def get_blob_store() -> BlobStore:
+    """Get or create the blob store (BLOB_STORE_DIR, BLOB_STORE_CODEC, BLOB_STORE_LEVEL)."""
+    global _blob_store
+    with _blob_store_lock:
+        if _blob_store is None:
+            level = os.getenv("BLOB_STORE_LEVEL")
+            _blob_store = BlobStore(
+                os.getenv("BLOB_STORE_DIR") or data_dir("blobs"),
+                codec=os.getenv("BLOB_STORE_CODEC") or None,
+                level=env_int("BLOB_STORE_LEVEL", 0) if level else None
+            )
+    return _blob_store
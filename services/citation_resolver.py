@@ -0,0 +1,384 @@
+"""
+Citation identity resolution.
+Maps a bibliography entry to a stable citation_key - doi:<doi>, else
+arxiv:<id>, else title:<fingerprint of the normalised title> - and catches
+near-duplicate titles (OCR slips, dropped words, truncation) with MinHash LSH
+over character trigrams, so a lookup only compares against the few titles
+sharing an LSH bucket instead of every title in the graph. Title matches,
+exact or fuzzy, are vetoed when both sides carry a DOI (or arXiv id) and the
+ids differ: "Part I" and "Part II" stay two papers.
+
+The index is a SQLite file (WAL mode): aliases and LSH buckets are B-tree
+lookups, so resolution cost stays flat at millions of references and the
+index survives restarts. An empty index is rebuilt from Neo4j on first use.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from services.config import data_dir
+
+# Mersenne prime 2^31 - 1: (a * h + b) stays below 2^63 for 32-bit h
+_PRIME = np.uint64((1 << 31) - 1)
+
+_DOI_PREFIX = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+_ARXIV_ID = re.compile(r"(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[a-z]{2})?/\d{7})(?:v\d+)?", re.IGNORECASE)
+
+
+def normalize_doi(doi: Optional[str]) -> Optional[str]:
+    """Lowercase DOI without resolver prefix ("https://doi.org/10.1/X" -> "10.1/x")."""
+    if not doi:
+        return None
+    doi = _DOI_PREFIX.sub("", doi.strip()).lower().rstrip(".")
+    return doi if doi.startswith("10.") else None
+
+
+def normalize_arxiv(arxiv: Optional[str]) -> Optional[str]:
+    """arXiv id without prefix or version ("arXiv:1706.03762v5" -> "1706.03762")."""
+    if not arxiv:
+        return None
+    match = _ARXIV_ID.search(arxiv)
+    return match.group(1).lower() if match else None
+
+
+def canonical_title(title: Optional[str]) -> str:
+    """Accent-folded, lowercase, alphanumeric words separated by single spaces."""
+    if not title:
+        return ""
+    text = unicodedata.normalize("NFKD", title)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+def title_fingerprint(title: Optional[str]) -> Optional[str]:
+    canonical = canonical_title(title)
+    if not canonical:
+        return None
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:20]
+
+
+class MinHasher:
+    """
+    MinHash signatures over character trigrams, cut into bands for LSH.
+    Band hashes are stable across processes so they can be stored.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = {text[i:i + 3] for i in range(max(len(text) - 2, 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0).astype(np.uint32)
+
+    def band_hashes(self, signature: np.ndarray) -> List[int]:
+        """One signed 64-bit hash per band (salted with the band number)."""
+        hashes = []
+        for band in range(self.bands):
+            digest = hashlib.blake2b(signature[band * self.rows:(band + 1) * self.rows].tobytes(),
+                                     digest_size=8, salt=band.to_bytes(2, "little")).digest()
+            hashes.append(int.from_bytes(digest, "little", signed=True))
+        return hashes
+
+    @staticmethod
+    def pack(signature: np.ndarray) -> bytes:
+        # The low 16 bits are plenty to estimate agreement and halve the storage
+        return signature.astype(np.uint16).tobytes()
+
+    @staticmethod
+    def similarity(signature: np.ndarray, packed: bytes) -> float:
+        """Estimated trigram Jaccard between a signature and a stored one."""
+        return float((np.frombuffer(packed, dtype=np.uint16) == signature.astype(np.uint16)).mean())
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,
+    citation_key TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS ingested (
+    citation_key TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+-- Strong identifiers known for each key, to veto conflicting title matches
+CREATE TABLE IF NOT EXISTS key_ids (
+    citation_key TEXT PRIMARY KEY,
+    doi TEXT,
+    arxiv TEXT
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS titles (
+    id INTEGER PRIMARY KEY,
+    citation_key TEXT NOT NULL,
+    signature BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    band_hash INTEGER NOT NULL,
+    title_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lsh_buckets_hash ON lsh_buckets(band_hash);
+"""
+
+
+class CitationResolver:
+    """SQLite-backed citation identity index: exact aliases plus fuzzy title LSH."""
+
+    def __init__(self, path: str, threshold: float = 0.85, min_fuzzy_chars: int = 15,
+                 max_candidates: int = 64):
+        self.path = path
+        self.threshold = threshold
+        self.min_fuzzy_chars = min_fuzzy_chars
+        self.max_candidates = max_candidates
+        self.hasher = MinHasher()
+        self._lock = threading.Lock()
+        self._counts = {"doi": 0, "arxiv": 0, "title": 0, "fuzzy": 0, "new": 0}
+        self._loaded = False
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _aliases(reference: Dict[str, Any]):
+        doi = normalize_doi(reference.get("doi"))
+        arxiv = normalize_arxiv(reference.get("arxiv"))
+        canonical = canonical_title(reference.get("title"))
+        aliases = []
+        if doi:
+            aliases.append(f"doi:{doi}")
+        if arxiv:
+            aliases.append(f"arxiv:{arxiv}")
+        if canonical:
+            aliases.append(f"title:{title_fingerprint(canonical)}")
+        elif (reference.get("title") or "").strip():
+            # Titles with no latin letters or digits are keyed on their exact text
+            raw = reference["title"].strip().lower()
+            aliases.append(f"title:{hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]}")
+        return doi, arxiv, canonical, aliases
+
+    def _key_ids(self, key: str):
+        """(doi, arxiv) known for key; keys named after an id imply it."""
+        row = self._conn.execute(
+            "SELECT doi, arxiv FROM key_ids WHERE citation_key = ?", (key,)).fetchone()
+        doi, arxiv = row if row else (None, None)
+        if doi is None and key.startswith("doi:"):
+            doi = key[4:]
+        if arxiv is None and key.startswith("arxiv:"):
+            arxiv = key[6:]
+        return doi, arxiv
+
+    def _conflicts(self, key: str, doi: Optional[str], arxiv: Optional[str]) -> bool:
+        """Whether key is known under a different DOI or arXiv id than the reference."""
+        if not (doi or arxiv):
+            return False
+        known_doi, known_arxiv = self._key_ids(key)
+        return bool(doi and known_doi and doi != known_doi) or \
+            bool(arxiv and known_arxiv and arxiv != known_arxiv)
+
+    def _lookup_alias(self, aliases: List[str], doi: Optional[str], arxiv: Optional[str]):
+        for alias in aliases:
+            row = self._conn.execute(
+                "SELECT citation_key FROM aliases WHERE alias = ?", (alias,)).fetchone()
+            if row:
+                kind = alias.split(":", 1)[0]
+                if kind == "title" and self._conflicts(row[0], doi, arxiv):
+                    continue
+                return row[0], kind
+        return None, "new"
+
+    def _lookup_fuzzy(self, signature: np.ndarray, ingested: bool,
+                      doi: Optional[str], arxiv: Optional[str]) -> Optional[str]:
+        bands = self.hasher.band_hashes(signature)
+        rows = self._conn.execute(
+            f"SELECT DISTINCT t.citation_key, t.signature FROM lsh_buckets b "
+            f"JOIN titles t ON t.id = b.title_id "
+            f"WHERE b.band_hash IN ({','.join('?' * len(bands))}) LIMIT ?",
+            (*bands, self.max_candidates)).fetchall()
+        best, best_score = None, self.threshold
+        for key, packed in rows:
+            score = self.hasher.similarity(signature, packed)
+            if score >= best_score and not self._conflicts(key, doi, arxiv):
+                best, best_score = key, score
+        if best and ingested and self._conn.execute(
+                "SELECT 1 FROM ingested WHERE citation_key = ?", (best,)).fetchone():
+            # Two ingested papers with similar titles are two papers
+            return None
+        return best
+
+    def _register(self, key: str, aliases: List[str], canonical: str,
+                  signature: Optional[np.ndarray], ingested: bool,
+                  doi: Optional[str] = None, arxiv: Optional[str] = None):
+        title_alias = next((a for a in aliases if a.startswith("title:")), None)
+        if (title_alias and len(canonical) >= self.min_fuzzy_chars and not self._conn.execute(
+                "SELECT 1 FROM aliases WHERE alias = ?", (title_alias,)).fetchone()):
+            if signature is None:
+                signature = self.hasher.signature(canonical)
+            title_id = self._conn.execute(
+                "INSERT INTO titles (citation_key, signature) VALUES (?, ?)",
+                (key, self.hasher.pack(signature))).lastrowid
+            self._conn.executemany(
+                "INSERT INTO lsh_buckets (band_hash, title_id) VALUES (?, ?)",
+                [(band, title_id) for band in self.hasher.band_hashes(signature)])
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO aliases (alias, citation_key) VALUES (?, ?)",
+            [(alias, key) for alias in [key, *aliases]])
+        if doi or arxiv:
+            self._conn.execute(
+                "INSERT INTO key_ids (citation_key, doi, arxiv) VALUES (?, ?, ?) "
+                "ON CONFLICT (citation_key) DO UPDATE SET "
+                "doi = coalesce(doi, excluded.doi), arxiv = coalesce(arxiv, excluded.arxiv)",
+                (key, doi, arxiv))
+        if ingested:
+            self._conn.execute("INSERT OR IGNORE INTO ingested (citation_key) VALUES (?)", (key,))
+
+    def _resolve(self, reference: Dict[str, Any], ingested: bool) -> Optional[Dict[str, Any]]:
+        doi, arxiv, canonical, aliases = self._aliases(reference)
+        if not aliases:
+            return None
+        key, match = self._lookup_alias(aliases, doi, arxiv)
+        signature = None
+        if key is None and len(canonical) >= self.min_fuzzy_chars:
+            signature = self.hasher.signature(canonical)
+            key = self._lookup_fuzzy(signature, ingested, doi, arxiv)
+            match = "fuzzy" if key else "new"
+        if key is None:
+            key = aliases[0]
+        self._register(key, aliases, canonical, signature, ingested, doi, arxiv)
+        self._counts[match] += 1
+        return {
+            "key": key,
+            "match": match,
+            "title": (reference.get("title") or "").strip() or None,
+            "doi": doi,
+            "arxiv": arxiv,
+            "year": reference.get("year"),
+        }
+
+    def resolve(self, reference: Dict[str, Any], ingested: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Resolve {"title", "doi"?, "arxiv"?, "year"?} to its citation_key.
+        Returns the normalised reference with "key" and "match" (doi, arxiv,
+        title, fuzzy or new), or None when it has no usable identifier.
+        ingested=True marks the key as an ingested paper's own.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                entry = self._resolve(reference, ingested)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return entry
+
+    def resolve_many(self, references: Iterable[Dict[str, Any]],
+                     exclude_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Resolve a bibliography in one transaction, dropping unresolvable and
+        repeated entries (and exclude_key, e.g. the citing paper itself).
+        """
+        resolved, seen = [], {exclude_key}
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for reference in references:
+                    entry = self._resolve(reference, False)
+                    if entry and entry["key"] not in seen:
+                        seen.add(entry["key"])
+                        resolved.append(entry)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return resolved
+
+    def load(self, rows: Iterable[Dict[str, Any]], chunk: int = 5000) -> int:
+        """Index existing {"key", "title", "doi", "arxiv", "ingested"} rows."""
+        count = 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for row in rows:
+                    if not row.get("key"):
+                        continue
+                    doi, arxiv, canonical, aliases = self._aliases(row)
+                    self._register(row["key"], aliases, canonical, None, bool(row.get("ingested")),
+                                   doi, arxiv)
+                    count += 1
+                    if count % chunk == 0:
+                        self._conn.execute("COMMIT")
+                        self._conn.execute("BEGIN")
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return count
+
+    def ensure_loaded(self, driver) -> int:
+        """
+        Rebuild an empty index from every keyed Paper node (e.g. a fresh
+        container pointed at an existing graph). Cheap once loaded.
+        """
+        with self._lock:
+            if self._loaded:
+                return 0
+            if self._conn.execute("SELECT 1 FROM aliases LIMIT 1").fetchone():
+                self._loaded = True
+                return 0
+        start = time.perf_counter()
+        with driver.session() as session:
+            result = session.run("""
+                MATCH (p:Paper) WHERE p.citation_key IS NOT NULL
+                RETURN p.citation_key AS key, p.title AS title, p.doi AS doi,
+                       p.arxiv AS arxiv, p.job_id IS NOT NULL AS ingested
+            """)
+            count = self.load(record.data() for record in result)
+        self._loaded = True
+        if count:
+            print(f"Citation index rebuilt from Neo4j: {count} papers in "
+                  f"{time.perf_counter() - start:.1f}s")
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            aliases = self._conn.execute("SELECT count(*) FROM aliases").fetchone()[0]
+            titles = self._conn.execute("SELECT count(*) FROM titles").fetchone()[0]
+            return {"aliases": aliases, "fuzzy_titles": titles, "resolved": dict(self._counts)}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Singleton instance
+_citation_resolver = None
+_citation_resolver_lock = threading.Lock()
+
+def get_citation_resolver() -> CitationResolver:
+    """Get or create the citation resolver (CITATION_INDEX_PATH, default data/citations.sqlite)."""
+    global _citation_resolver
+    with _citation_resolver_lock:
+        if _citation_resolver is None:
+            _citation_resolver = CitationResolver(
+                os.getenv("CITATION_INDEX_PATH") or data_dir("citations.sqlite"))
+    return _citation_resolver
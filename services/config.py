@@ -0,0 +1,44 @@
+"""
+App configuration helpers.
+Reads config.json once; callers apply environment overrides per setting.
+"""
+import json
+import os
+from typing import Any, Dict
+
+_config = None
+
+
+def get_config(path: str = "config.json") -> Dict[str, Any]:
+    """Load config.json (cached). Returns {} if the file is missing or invalid."""
+    global _config
+    if _config is None:
+        try:
+            with open(path) as f:
+                _config = json.load(f)
+        except Exception:
+            _config = {}
+    return _config
+
+
+def get_section(name: str) -> Dict[str, Any]:
+    """Return a nested section of config.json, e.g. "pipeline"."""
+    section = get_config().get(name)
+    return section if isinstance(section, dict) else {}
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer environment variable, falling back to default."""
+    value = os.getenv(name)
+    if value is None or value == "":
+        return int(default)
+    try:
+        return int(value)
+    except ValueError:
+        return int(default)
+
+
+def data_dir(*parts: str) -> str:
+    """Path under the local data directory (GRAPHRAG_DATA_DIR, default ./data)."""
+    root = os.getenv("GRAPHRAG_DATA_DIR") or get_config().get("data_dir", "data")
+    return os.path.join(root, *parts)
@@ -0,0 +1,166 @@
+"""
+Persistent embedding cache.
+SQLite table of float32 vectors keyed by hash(model, dims, text), consulted
+before calling the embedding API so only cache misses cost quota and latency.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Tuple
+
+from services.config import data_dir, env_int
+
+# SQLite limits host parameters per statement; stay well below the minimum
+_SQL_CHUNK = 500
+
+
+def embedding_key(model: str, dims: int, text: str) -> str:
+    """Cache key for one text under one model/truncation setting."""
+    return hashlib.sha256(f"{model}\0{dims}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache with size-based LRU eviction."""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings(last_access)"
+        )
+        row = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embeddings").fetchone()
+        self._entries, self._bytes = row
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """Return {key: vector} for every cached key; refreshes their LRU position."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for i in range(0, len(keys), _SQL_CHUNK):
+                batch = keys[i:i + _SQL_CHUNK]
+                marks = ",".join("?" * len(batch))
+                for key, blob in self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", batch
+                ):
+                    found[key] = array("f", blob).tolist()
+                hit_keys = [k for k in batch if k in found]
+                if hit_keys:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_access = ? "
+                        f"WHERE key IN ({','.join('?' * len(hit_keys))})",
+                        [time.time(), *hit_keys]
+                    )
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, List[float]]]):
+        """Store vectors as float32, then evict least recently used rows past max_bytes."""
+        now = time.time()
+        rows = []
+        for key, vector in items:
+            blob = array("f", vector).tobytes()
+            rows.append((key, blob, len(blob), now))
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for row in rows:
+                    old = self._conn.execute(
+                        "SELECT size FROM embeddings WHERE key = ?", (row[0],)
+                    ).fetchone()
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO embeddings (key, vector, size, last_access) "
+                        "VALUES (?, ?, ?, ?)", row
+                    )
+                    if old:
+                        self._bytes += row[2] - old[0]
+                    else:
+                        self._entries += 1
+                        self._bytes += row[2]
+                self._evict()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                row = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM embeddings"
+                ).fetchone()
+                self._entries, self._bytes = row
+                raise
+
+    def _evict(self):
+        """Drop the oldest rows until the cache is back under 90% of max_bytes."""
+        if self._bytes <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        while self._bytes > target and self._entries > 0:
+            victims = self._conn.execute(
+                "SELECT key, size FROM embeddings ORDER BY last_access LIMIT ?", (_SQL_CHUNK,)
+            ).fetchall()
+            if not victims:
+                break
+            doomed = []
+            for key, size in victims:
+                doomed.append(key)
+                self._bytes -= size
+                self._entries -= 1
+                if self._bytes <= target:
+                    break
+            self._conn.execute(
+                f"DELETE FROM embeddings WHERE key IN ({','.join('?' * len(doomed))})", doomed
+            )
+            self.evictions += len(doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Singleton instance
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the embedding cache singleton."""
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache(
+                path=os.getenv("EMBEDDING_CACHE_PATH") or data_dir("embeddings.sqlite"),
+                max_bytes=env_int("EMBEDDING_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+            )
+    return _embedding_cache
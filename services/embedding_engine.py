@@ -0,0 +1,264 @@
+"""
+Batch embedding engine.
+Splits texts into batches sized by estimated tokens, embeds the batches
+concurrently under a configurable limit, retries rate limits and transient
+errors with exponential backoff and jitter, and returns vectors in input order.
+Backends are pluggable: Gemini for production, a local hashing stub for
+offline tests and benchmarks.
+"""
+import hashlib
+import logging
+import math
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from services.config import env_int
+from services.metrics import EMBED_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Lazy import to avoid startup errors if deps missing
+_genai = None
+
+
+def _get_genai():
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+        if api_key:
+            genai.configure(api_key=api_key)
+        _genai = genai
+    return _genai
+
+
+class RateLimitError(Exception):
+    """Raised by backends when the provider rejects a call with a rate limit."""
+
+
+_RETRYABLE_NAMES = ("ResourceExhausted", "TooManyRequests", "ServiceUnavailable",
+                    "DeadlineExceeded", "InternalServerError", "TimeoutError")
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for rate limits (429) and transient server/network errors."""
+    if isinstance(error, (RateLimitError, TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in _RETRYABLE_NAMES:
+        return True
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if callable(code):
+        try:
+            code = code()
+        except Exception:
+            code = None
+    if code in (429, 500, 502, 503, 504):
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "quota" in message
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)."""
+    return max(1, math.ceil(len(text) / 4))
+
+
+class EmbeddingBackend:
+    """Embeds one batch of texts. Subclasses set model and dims."""
+
+    model = ""
+    dims = 0
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+
+class GeminiBackend(EmbeddingBackend):
+    """Gemini embedding API; vectors are truncated to dims for the Pinecone index."""
+
+    def __init__(self, model: str = "models/embedding-001", dims: int = 768):
+        self.model = model
+        self.dims = dims
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        genai = _get_genai()
+        if not (os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")):
+            raise ValueError("GEMINI_API_KEY or GOOGLE_API_KEY required for embeddings")
+
+        # models/embedding-001 outputs 3072 dims; truncate to 768 for Pinecone index
+        result = genai.embed_content(model=self.model, content=texts)
+
+        # A list of contents returns {"embedding": [[...], ...]}, one vector per
+        # text; a single content returns {"embedding": [...]}
+        embeddings = result.get("embedding", result.get("embeddings", []))
+        if embeddings and not isinstance(embeddings[0], (list, tuple)):
+            embeddings = [embeddings]
+        if len(embeddings) != len(texts):
+            raise ValueError(f"Gemini returned {len(embeddings)} embeddings for {len(texts)} texts")
+        return [[float(x) for x in emb[:self.dims]] for emb in embeddings]
+
+
+class HashingBackend(EmbeddingBackend):
+    """
+    Deterministic local embedder: hashed bag of words, L2-normalized.
+    Optional simulated latency and rate limiting make it usable for
+    benchmarking the batching and retry logic offline.
+    """
+
+    def __init__(self, dims: int = 768, latency: float = 0.0,
+                 latency_per_token: float = 0.0, rate_limit_rate: float = 0.0,
+                 seed: int = 0):
+        self.model = "local/hashing-v1"
+        self.dims = dims
+        self.latency = latency
+        self.latency_per_token = latency_per_token
+        self.rate_limit_rate = rate_limit_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            self.calls += 1
+            limited = self._random.random() < self.rate_limit_rate
+        if self.latency or self.latency_per_token:
+            tokens = sum(estimate_tokens(t) for t in texts)
+            time.sleep(self.latency + self.latency_per_token * tokens)
+        if limited:
+            raise RateLimitError("429 simulated rate limit")
+        return [self.embed_one(t) for t in texts]
+
+    def embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dims
+        for token in re.findall(r"\w+", text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dims
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+
+class EmbeddingEngine:
+    """Token-aware, concurrent, retrying batch embedder."""
+
+    def __init__(self, backend: EmbeddingBackend, max_batch_tokens: int = 16000,
+                 max_batch_size: int = 100, concurrency: int = 4,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.backend = backend
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.batches = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency,
+                                        thread_name_prefix="embed")
+
+    @property
+    def model(self) -> str:
+        return self.backend.model
+
+    @property
+    def dims(self) -> int:
+        return self.backend.dims
+
+    def make_batches(self, texts: List[str]) -> List[List[int]]:
+        """Group text indices into batches under the token and size limits."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for i, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if current and (current_tokens + tokens > self.max_batch_tokens
+                            or len(current) >= self.max_batch_size):
+                batches.append(current)
+                current, current_tokens = [], 0
+            # An oversized single text still gets a batch of its own
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, preserving input order in the output."""
+        if not texts:
+            return []
+        batches = self.make_batches(texts)
+        if len(batches) == 1:
+            results = [self._embed_batch([texts[i] for i in batches[0]])]
+        else:
+            futures = [self._pool.submit(self._embed_batch, [texts[i] for i in batch])
+                       for batch in batches]
+            results = [f.result() for f in futures]
+
+        vectors: List[List[float]] = [None] * len(texts)
+        for batch, batch_vectors in zip(batches, results):
+            if len(batch_vectors) != len(batch):
+                raise ValueError(f"Expected {len(batch)} embeddings, got {len(batch_vectors)}")
+            for i, vector in zip(batch, batch_vectors):
+                vectors[i] = vector
+        return vectors
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        EMBED_BATCH_SIZE.observe(len(texts))
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self._lock:
+                    self.batches += 1
+                return self.backend.embed(texts)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                # Exponential backoff with full jitter
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                with self._lock:
+                    self.retries += 1
+                logger.warning("Embedding batch of %d failed (%s), retry %d in %.2fs",
+                               len(texts), e, attempt + 1, delay)
+                time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.model,
+            "batches": self.batches,
+            "retries": self.retries,
+            "concurrency": self.concurrency,
+        }
+
+
+def make_backend(name: str = None) -> EmbeddingBackend:
+    """Build the backend named by EMBEDDING_BACKEND ("gemini" or "hash")."""
+    name = (name or os.getenv("EMBEDDING_BACKEND", "gemini")).lower()
+    if name == "hash":
+        return HashingBackend()
+    if name == "gemini":
+        return GeminiBackend()
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {name}")
+
+
+# Singleton instance
+_embedding_engine = None
+_embedding_engine_lock = threading.Lock()
+
+def get_embedding_engine() -> EmbeddingEngine:
+    """Get or create the embedding engine singleton."""
+    global _embedding_engine
+    with _embedding_engine_lock:
+        if _embedding_engine is None:
+            _embedding_engine = EmbeddingEngine(
+                make_backend(),
+                max_batch_tokens=env_int("EMBEDDING_BATCH_TOKENS", 16000),
+                max_batch_size=env_int("EMBEDDING_BATCH_SIZE", 100),
+                concurrency=env_int("EMBEDDING_CONCURRENCY", 4),
+                max_retries=env_int("EMBEDDING_MAX_RETRIES", 5)
+            )
+    return _embedding_engine
@@ -0,0 +1,119 @@
+"""
+Async GROBID client.
+Shares one keep-alive httpx.AsyncClient for the app's lifetime so parsing a PDF
+never blocks the event loop or pays a fresh TCP/TLS handshake.
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from services.config import get_config
+
+logger = logging.getLogger(__name__)
+
+
+class GrobidService:
+    """Async wrapper around the GROBID REST API."""
+
+    def __init__(self, server: str = None, timeout: float = None,
+                 coordinates: List[str] = None, max_connections: int = None,
+                 busy_retries: int = None, busy_retry_delay: float = None,
+                 transport: httpx.AsyncBaseTransport = None):
+        cfg = get_config()
+        self.server = (server or os.getenv("GROBID_SERVER_URL")
+                       or cfg.get("grobid_server", "")).rstrip("/")
+        self.timeout = float(timeout or cfg.get("timeout", 180))
+        self.coordinates = coordinates or cfg.get("coordinates", [])
+        self.max_connections = max_connections or cfg.get("grobid_max_connections", 10)
+        # GROBID answers 503 when its own worker pool is saturated
+        self.busy_retries = busy_retries if busy_retries is not None else cfg.get("grobid_busy_retries", 3)
+        self.busy_retry_delay = busy_retry_delay or cfg.get("grobid_busy_retry_delay", 5)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared pooled client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.server,
+                timeout=httpx.Timeout(self.timeout, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                transport=self._transport
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def is_alive(self) -> bool:
+        r = await self.client.get("/api/isalive", timeout=10.0)
+        return r.status_code == 200
+
+    async def process_pdf(self, service: str, pdf_path: str,
+                          generateIDs: bool = False,
+                          consolidate_header: bool = True,
+                          consolidate_citations: bool = False,
+                          include_raw_citations: bool = False,
+                          include_raw_affiliations: bool = False,
+                          tei_coordinates: bool = False,
+                          segment_sentences: bool = False,
+                          timeout: float = None) -> Tuple[str, int, Optional[str]]:
+        """
+        Send a PDF to a GROBID service (e.g. "processFulltextDocument").
+        Returns (pdf_path, status, text) like grobid_client's process_pdf.
+        """
+        data: Dict[str, Any] = {}
+        if generateIDs:
+            data["generateIDs"] = "1"
+        if consolidate_header:
+            data["consolidateHeader"] = "1"
+        if consolidate_citations:
+            data["consolidateCitations"] = "1"
+        if include_raw_citations:
+            data["includeRawCitations"] = "1"
+        if include_raw_affiliations:
+            data["includeRawAffiliations"] = "1"
+        if tei_coordinates:
+            data["teiCoordinates"] = self.coordinates
+        if segment_sentences:
+            data["segmentSentences"] = "1"
+
+        request_timeout = httpx.Timeout(timeout or self.timeout, connect=10.0)
+        for attempt in range(self.busy_retries + 1):
+            try:
+                with open(pdf_path, "rb") as pdf_file:
+                    r = await self.client.post(
+                        f"/api/{service}",
+                        files={"input": (os.path.basename(pdf_path), pdf_file, "application/pdf")},
+                        data=data,
+                        headers={"Accept": "text/plain"},
+                        timeout=request_timeout
+                    )
+            except httpx.TimeoutException as e:
+                return pdf_path, 408, f"Request timeout: {e}"
+
+            if r.status_code == 503 and attempt < self.busy_retries:
+                logger.info("GROBID busy (503), retrying in %ss", self.busy_retry_delay)
+                await asyncio.sleep(self.busy_retry_delay)
+                continue
+            return pdf_path, r.status_code, r.text
+
+
+# Singleton instance
+_grobid_service = None
+
+def get_grobid_service() -> GrobidService:
+    """Get or create the GROBID service singleton."""
+    global _grobid_service
+    if _grobid_service is None:
+        _grobid_service = GrobidService()
+    return _grobid_service
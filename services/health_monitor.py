@@ -0,0 +1,211 @@
+"""
+Dependency health monitor.
+Heartbeats Neo4j, GROBID, Marker and the vector store in the background and
+keeps the last result of each, so request handlers read a cached status
+instead of making a round trip first. Every dependency has a circuit breaker:
+after a run of failed heartbeats or calls it opens and callers fail fast (or
+take their fallback path) until a heartbeat or a trial call succeeds again.
+A dependency registered without a check is never polled (e.g. a GPU service
+that should be free to scale to zero); its status follows real calls only.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from services.config import env_int, get_section
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    """
+    closed: calls go through. open: calls are refused until reset_timeout has
+    passed, then one trial call is let through (half_open); its outcome
+    closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> bool:
+        """Count a failure; True if this one opened the breaker."""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                return True
+            if self.state == OPEN:
+                self.opened_at = time.monotonic()
+            return False
+
+
+class Dependency:
+    """A monitored dependency: its heartbeat check, breaker and last result."""
+
+    def __init__(self, name: str, check: Optional[Callable[[], Awaitable[Any]]],
+                 breaker: CircuitBreaker):
+        self.name = name
+        self.check = check
+        self.breaker = breaker
+        self.up: Optional[bool] = None
+        self.latency_ms: Optional[float] = None
+        self.last_checked: Optional[float] = None
+        self.last_seen: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+
+class HealthMonitor:
+    """Background heartbeats plus a circuit breaker per dependency."""
+
+    def __init__(self, interval: float = 15.0, timeout: float = 5.0,
+                 failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.interval = interval
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._dependencies: Dict[str, Dependency] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, check: Optional[Callable[[], Awaitable[Any]]] = None):
+        """
+        Monitor a dependency. check is an async callable that raises (or
+        returns False) when the dependency is unhealthy; without one the
+        dependency is not heartbeated and only real calls update it.
+        """
+        self._dependencies[name] = Dependency(
+            name, check, CircuitBreaker(self.failure_threshold, self.reset_timeout))
+
+    async def _heartbeat(self, dep: Dependency):
+        start = time.perf_counter()
+        try:
+            ok = await asyncio.wait_for(dep.check(), self.timeout)
+            error = None if ok is not False else "check returned False"
+        except asyncio.TimeoutError:
+            error = f"no answer within {self.timeout:g}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        dep.latency_ms = round((time.perf_counter() - start) * 1000, 2)
+        dep.last_checked = time.time()
+        if error is None:
+            dep.last_seen = dep.last_checked
+            if dep.up is False:
+                logger.info("%s is back up (%.0f ms)", dep.name, dep.latency_ms)
+            self.record_success(dep.name)
+        else:
+            if dep.up is not False:
+                logger.warning("%s heartbeat failed: %s", dep.name, error)
+            self.record_failure(dep.name, error)
+        dep.up = error is None
+
+    async def check_all(self):
+        """One heartbeat round over every dependency, concurrently."""
+        await asyncio.gather(*(self._heartbeat(dep) for dep in self._dependencies.values()
+                               if dep.check is not None))
+
+    async def _run(self):
+        while True:
+            await self.check_all()
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        """Run a first round (so status is known at startup), then heartbeat in the background."""
+        if self._task is None:
+            await self.check_all()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def available(self, name: str) -> bool:
+        """Whether callers should use the dependency now (unknown names are always available)."""
+        dep = self._dependencies.get(name)
+        return dep is None or dep.breaker.allow()
+
+    def record_success(self, name: str):
+        """Feed a successful real call into the dependency's breaker."""
+        dep = self._dependencies.get(name)
+        if dep is not None:
+            dep.breaker.record_success()
+            if dep.check is None:
+                dep.up = True
+                dep.last_seen = time.time()
+
+    def record_failure(self, name: str, error: Any = None):
+        """Feed a failed real call into the dependency's breaker."""
+        dep = self._dependencies.get(name)
+        if dep is None:
+            return
+        if error is not None:
+            dep.last_error = str(error)[:300]
+        if dep.check is None:
+            dep.up = False
+        if dep.breaker.record_failure():
+            logger.warning("Circuit for %s opened after %d failures", name, dep.breaker.failures)
+
+    def is_up(self, name: str) -> bool:
+        """Last heartbeat result (False if never checked)."""
+        dep = self._dependencies.get(name)
+        return bool(dep and dep.up)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Cached status of every dependency, for /health."""
+        now = time.time()
+        return {
+            dep.name: {
+                "status": "unknown" if dep.up is None else ("up" if dep.up else "down"),
+                "circuit": dep.breaker.state,
+                "latency_ms": dep.latency_ms,
+                "last_seen_seconds_ago": round(now - dep.last_seen, 1) if dep.last_seen else None,
+                "last_error": dep.last_error,
+            }
+            for dep in self._dependencies.values()
+        }
+
+
+# Singleton instance
+_health_monitor = None
+_health_monitor_lock = threading.Lock()
+
+def get_health_monitor() -> HealthMonitor:
+    """Get or create the health monitor configured by the "health" section of config.json."""
+    global _health_monitor
+    with _health_monitor_lock:
+        if _health_monitor is None:
+            cfg = get_section("health")
+            _health_monitor = HealthMonitor(
+                interval=env_int("HEALTH_INTERVAL_SECONDS", cfg.get("interval_seconds", 15)),
+                timeout=env_int("HEALTH_TIMEOUT_SECONDS", cfg.get("timeout_seconds", 5)),
+                failure_threshold=cfg.get("failure_threshold", 3),
+                reset_timeout=cfg.get("reset_seconds", 30),
+            )
+    return _health_monitor
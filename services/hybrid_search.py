@@ -0,0 +1,207 @@
+"""
+Hybrid GraphRAG retrieval.
+Embeds the query, runs the vector search, then expands the top hit papers in
+Neo4j concurrently (paper details + related papers) and fuses everything into
+ranked context blocks. The whole call runs under a deadline: if the graph is
+slow the vector results are returned on their own instead of timing out.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from neo4j.exceptions import ServiceUnavailable, SessionExpired
+
+from services.config import get_section
+from services.health_monitor import get_health_monitor
+from services.metrics import SEARCH_PHASE_SECONDS
+from services.async_neo4j_service import get_async_neo4j_service
+from services.pinecone_service import embed_query, query_vectors
+from services.vector_store import get_vector_store
+from services.query_cache import freeze_filters, normalize_query, search_result_cache
+
+logger = logging.getLogger(__name__)
+
+# Graph properties copied into paper blocks (full_text is never included)
+PAPER_FIELDS = ("title", "year", "venue", "abstract", "authors", "citations",
+                "methods", "datasets", "tasks")
+
+
+async def _paper_details(title: str) -> Optional[Dict[str, Any]]:
+    paper = await get_async_neo4j_service().get_paper_by_title(title)
+    if not paper:
+        return None
+    details = {field: paper.get(field) for field in PAPER_FIELDS if paper.get(field) is not None}
+    if "citations" in details:
+        details["citations_count"] = len(details["citations"])
+        details["citations"] = details["citations"][:10]
+    return details
+
+
+async def _related_papers(title: str, limit: int) -> List[Dict[str, Any]]:
+    return await get_async_neo4j_service().find_related_papers(title, limit=limit)
+
+
+def _fuse(matches: List[Dict[str, Any]], details: Dict[str, Dict[str, Any]],
+          related: Dict[str, List[Dict[str, Any]]], related_weight: float,
+          related_per_paper: int) -> List[Dict[str, Any]]:
+    """
+    Rank chunk, paper and related-paper blocks on one scale: chunks keep their
+    vector score, a paper block inherits its best chunk score, and related
+    papers get a decayed share of the paper score they were reached from.
+    """
+    blocks = []
+    best_score: Dict[str, float] = {}
+    for m in matches:
+        blocks.append({"type": "chunk", **m})
+        title = m.get("paper_title")
+        if title:
+            best_score[title] = max(best_score.get(title, float("-inf")), m.get("score") or 0.0)
+
+    for title, paper in details.items():
+        if paper:
+            blocks.append({"type": "paper", "score": best_score.get(title, 0.0), **paper})
+
+    seen = set(best_score)
+    for title, papers in related.items():
+        parent = best_score.get(title, 0.0)
+        for rank, rel in enumerate(papers[:related_per_paper]):
+            rel_title = rel.get("title")
+            if not rel_title or rel_title in seen:
+                continue
+            seen.add(rel_title)
+            blocks.append({
+                **rel,
+                "type": "related_paper",
+                "score": parent * related_weight / (1 + rank),
+                "relatedness": rel.get("score"),
+                "via": title,
+            })
+
+    blocks.sort(key=lambda b: b.get("score") or 0.0, reverse=True)
+    return blocks
+
+
+async def hybrid_search(query: str, top_k: int = 5,
+                        filters: Optional[Dict[str, Any]] = None,
+                        deadline_ms: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Vector search + concurrent graph expansion under an overall deadline.
+    Returns {"results", "timings", "partial", "degraded", "cached"}; timings
+    are in ms and cached says whether the results came from the result cache.
+    Complete results are cached until the TTL expires or new vectors are upserted.
+    """
+    cfg = get_section("search")
+    deadline_ms = deadline_ms or cfg.get("deadline_ms", 2500)
+    graph_papers = cfg.get("graph_papers", 3)
+
+    start = time.perf_counter()
+    deadline = start + deadline_ms / 1000.0
+    timings: Dict[str, float] = {}
+    degraded: List[str] = []
+
+    def remaining() -> float:
+        return max(0.0, deadline - time.perf_counter())
+
+    def elapsed_ms(since: float) -> float:
+        return round((time.perf_counter() - since) * 1000, 2)
+
+    def response(results, partial: bool, cached: bool = False) -> Dict[str, Any]:
+        timings["total_ms"] = elapsed_ms(start)
+        for phase in ("embed", "vector", "graph", "total"):
+            if f"{phase}_ms" in timings:
+                SEARCH_PHASE_SECONDS.observe(timings[f"{phase}_ms"] / 1000, phase)
+        return {"query": query, "results": results, "timings": timings,
+                "partial": partial, "degraded": degraded, "cached": cached}
+
+    monitor = get_health_monitor()
+    config_error = get_vector_store().configuration_error()
+    if config_error or not monitor.available("vector_store"):
+        degraded.append("vector")
+        return response([], True)
+
+    cache_key = ("hybrid", normalize_query(query), top_k, freeze_filters(filters))
+    cached = search_result_cache.get(cache_key)
+    if cached is not None:
+        return response(cached, False, cached=True)
+    generation = search_result_cache.generation
+
+    # 1. Embed the query
+    stage = time.perf_counter()
+    try:
+        embedding = await asyncio.wait_for(asyncio.to_thread(embed_query, query), remaining())
+    except asyncio.TimeoutError:
+        timings["embed_ms"] = elapsed_ms(stage)
+        degraded.append("embed")
+        return response([], True)
+    timings["embed_ms"] = elapsed_ms(stage)
+
+    # 2. Vector search
+    stage = time.perf_counter()
+    try:
+        matches = await asyncio.wait_for(
+            asyncio.to_thread(query_vectors, embedding, top_k, filters), remaining()
+        )
+    except asyncio.TimeoutError:
+        timings["vector_ms"] = elapsed_ms(stage)
+        degraded.append("vector")
+        return response([], True)
+    timings["vector_ms"] = elapsed_ms(stage)
+
+    # 3. Graph expansion of the top distinct papers, all lookups at once
+    titles: List[str] = []
+    for m in matches:
+        title = m.get("paper_title")
+        if title and title not in titles:
+            titles.append(title)
+    titles = titles[:graph_papers]
+    partial = False
+    if titles and not monitor.available("neo4j"):
+        # Graph circuit open: answer from the vectors alone rather than wait on Neo4j
+        titles = []
+        partial = True
+        degraded.append("graph_unavailable")
+
+    # Fetch a few spare related papers; ones already in the results are skipped
+    related_limit = cfg.get("related_per_paper", 5) * 2
+    stage = time.perf_counter()
+    tasks = {}
+    for title in titles:
+        tasks[asyncio.create_task(_paper_details(title))] = ("details", title)
+        tasks[asyncio.create_task(_related_papers(title, related_limit))] = ("related", title)
+
+    details: Dict[str, Dict[str, Any]] = {}
+    related: Dict[str, List[Dict[str, Any]]] = {}
+    if tasks:
+        done, pending = await asyncio.wait(tasks.keys(), timeout=remaining())
+        for task in pending:
+            # Cancelling drops the query and returns its connection to the pool
+            task.cancel()
+        if pending:
+            partial = True
+            degraded.append("graph_timeout")
+        failed = False
+        for task in done:
+            kind, title = tasks[task]
+            if task.exception() is not None:
+                failed = True
+                logger.warning("Graph expansion failed for %s: %s", title, task.exception())
+                if isinstance(task.exception(), (ServiceUnavailable, SessionExpired)):
+                    monitor.record_failure("neo4j", task.exception())
+                continue
+            if kind == "details":
+                details[title] = task.result()
+            else:
+                related[title] = task.result() or []
+        if failed:
+            partial = True
+            degraded.append("graph_error")
+    timings["graph_ms"] = elapsed_ms(stage)
+
+    results = _fuse(matches, details, related,
+                    related_weight=cfg.get("related_weight", 0.5),
+                    related_per_paper=cfg.get("related_per_paper", 5))
+    if not partial:
+        # Partial answers are never cached so a slow graph is retried next time
+        search_result_cache.put(cache_key, results, generation)
+    return response(results, partial)
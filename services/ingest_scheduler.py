@@ -0,0 +1,233 @@
+"""
+In-process ingestion scheduler.
+Runs PDF jobs through a pipeline of stages (extract -> embed -> graph -> vectors),
+each with its own asyncio queue and worker pool, so consecutive papers overlap:
+while one paper is embedded the next one is already being extracted.
+Stages with a batch_handler drain several waiting jobs at once so writes can
+be grouped across papers. A stage with an accepts predicate only sees the jobs
+that need it (e.g. Marker for scanned PDFs); every other job goes straight on
+to the next stage, so it never waits behind that stage's queue.
+The time each job spends queued for a stage is recorded as
+timings["<stage>_wait_ms"] on the job.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Job = Dict[str, Any]
+StageHandler = Callable[[Job], Awaitable[None]]
+JobFilter = Callable[[Job], bool]
+BatchHandler = Callable[[List[Job]], Awaitable[Optional[List[Optional[Exception]]]]]
+
+
+class QueueFullError(Exception):
+    """Raised when the first pipeline stage cannot accept another job."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Ingestion queue is full")
+        self.retry_after = retry_after
+
+
+class Stage:
+    """
+    A pipeline stage: a bounded queue drained by a fixed pool of workers.
+    With a batch_handler and batch_size > 1, a worker takes every job already
+    waiting (up to batch_size, after lingering batch_wait seconds for more)
+    and hands them over in one call. The batch handler may return one
+    Optional[Exception] per job to fail jobs individually; if it raises, the
+    whole batch fails. With accepts, only jobs for which it returns True are
+    queued here; the rest skip the stage.
+    """
+
+    def __init__(self, name: str, handler: StageHandler, workers: int = 1,
+                 queue_size: int = 0, batch_handler: Optional[BatchHandler] = None,
+                 batch_size: int = 1, batch_wait: float = 0.0,
+                 accepts: Optional[JobFilter] = None):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.batch_handler = batch_handler
+        self.batch_size = max(1, batch_size) if batch_handler else 1
+        self.batch_wait = batch_wait
+        self.accepts = accepts
+        self.queue: Optional[asyncio.Queue] = None
+        self.busy = 0
+        self.processed = 0
+        self.failed = 0
+        self.batches = 0
+
+    async def next_jobs(self) -> List[Job]:
+        """Wait for one job, then collect up to batch_size - 1 more."""
+        jobs = [await self.queue.get()]
+        if self.batch_size == 1:
+            return jobs
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_wait
+        while len(jobs) < self.batch_size:
+            if not self.queue.empty():
+                jobs.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                jobs.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return jobs
+
+    async def run(self, jobs: List[Job]) -> List[Optional[Exception]]:
+        """Run the handler; returns one error (or None) per job."""
+        if self.batch_size > 1:
+            self.batches += 1
+            errors = await self.batch_handler(jobs)
+            return list(errors) if errors else [None] * len(jobs)
+        await self.handler(jobs[0])
+        return [None]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "busy": self.busy,
+            "queued": self.queue.qsize() if self.queue else 0,
+            "queue_size": self.queue_size,
+            "processed": self.processed,
+            "failed": self.failed,
+            "batch_size": self.batch_size,
+            "batches": self.batches,
+        }
+
+
+class IngestScheduler:
+    """
+    Pipelined job scheduler with per-stage concurrency limits.
+
+    A job is a dict that every stage handler reads and updates in place.
+    The first stage takes every submitted job; later stages may skip jobs
+    (see Stage.accepts).
+    When a downstream queue is full, upstream workers block on put(), so
+    backpressure propagates back to submit(), which raises QueueFullError.
+    """
+
+    def __init__(self, stages: List[Stage],
+                 on_complete: Optional[Callable[[Job], Awaitable[None]]] = None,
+                 on_error: Optional[Callable[[Job, Exception], Awaitable[None]]] = None,
+                 retry_after: int = 30):
+        if not stages:
+            raise ValueError("IngestScheduler needs at least one stage")
+        self.stages = stages
+        self.on_complete = on_complete
+        self.on_error = on_error
+        self.retry_after = retry_after
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        """Create the stage queues and spawn worker tasks."""
+        if self._tasks:
+            return
+        for stage in self.stages:
+            stage.queue = asyncio.Queue(maxsize=stage.queue_size)
+        for position, stage in enumerate(self.stages):
+            for i in range(stage.workers):
+                self._tasks.append(asyncio.create_task(
+                    self._worker(position, stage),
+                    name=f"ingest-{stage.name}-{i}"
+                ))
+        logger.info("Ingest scheduler started: %s",
+                    ", ".join(f"{s.name}x{s.workers}" for s in self.stages))
+
+    async def stop(self):
+        """Cancel all workers. Jobs still queued are left as they are."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def is_full(self) -> bool:
+        queue = self.stages[0].queue
+        return queue is not None and queue.full()
+
+    def submit(self, job: Job):
+        """Enqueue a job without waiting. Raises QueueFullError when saturated."""
+        if not self._tasks:
+            raise RuntimeError("IngestScheduler is not running")
+        job["queued_at"] = time.perf_counter()
+        try:
+            self.stages[0].queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(self.retry_after)
+
+    async def submit_wait(self, job: Job):
+        """Enqueue a job, waiting for room in the first stage."""
+        if not self._tasks:
+            raise RuntimeError("IngestScheduler is not running")
+        job["queued_at"] = time.perf_counter()
+        await self.stages[0].queue.put(job)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "in_flight": sum(s.busy + (s.queue.qsize() if s.queue else 0)
+                             for s in self.stages),
+            "stages": {s.name: s.stats() for s in self.stages},
+        }
+
+    def _next_stage(self, position: int, job: Job) -> Optional[Stage]:
+        """The first stage after position that takes job, or None when it is done."""
+        for stage in self.stages[position + 1:]:
+            if stage.accepts is None or stage.accepts(job):
+                return stage
+        return None
+
+    async def _worker(self, position: int, stage: Stage):
+        while True:
+            jobs = await stage.next_jobs()
+            dequeued = time.perf_counter()
+            for job in jobs:
+                queued_at = job.pop("queued_at", dequeued)
+                job.setdefault("timings", {})[f"{stage.name}_wait_ms"] = round(
+                    (dequeued - queued_at) * 1000, 2)
+            stage.busy += len(jobs)
+            try:
+                errors = await stage.run(jobs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                errors = [e] * len(jobs)
+            finally:
+                stage.busy -= len(jobs)
+                for _ in jobs:
+                    stage.queue.task_done()
+
+            for job, error in zip(jobs, errors):
+                if error is not None:
+                    stage.failed += 1
+                    await self._fail(job, error)
+                    continue
+                stage.processed += 1
+                next_stage = self._next_stage(position, job)
+                if next_stage is not None:
+                    job["queued_at"] = time.perf_counter()
+                    await next_stage.queue.put(job)
+                elif self.on_complete is not None:
+                    try:
+                        await self.on_complete(job)
+                    except Exception as e:
+                        logger.error("on_complete failed for job %s: %s", job.get("job_id"), e)
+
+    async def _fail(self, job: Job, error: Exception):
+        if self.on_error is None:
+            logger.error("Job %s failed: %s", job.get("job_id"), error)
+            return
+        try:
+            await self.on_error(job, error)
+        except Exception as e:
+            logger.error("on_error failed for job %s: %s", job.get("job_id"), e)
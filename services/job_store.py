@@ -0,0 +1,298 @@
+"""
+Durable ingestion job store.
+Jobs live in a SQLite table (WAL mode) so they survive restarts; per-status
+counts are maintained by triggers, so summaries never scan the table, and
+listing pages through jobs newest first with a seq cursor. Jobs uploaded
+together share a batch_id for aggregate progress.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.config import data_dir
+
+STATUSES = ("queued", "processing", "completed", "failed")
+UNFINISHED = ("queued", "processing")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT UNIQUE NOT NULL,
+    status TEXT NOT NULL,
+    filename TEXT,
+    sha256 TEXT,
+    temp_path TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_seq ON jobs(status, seq);
+CREATE INDEX IF NOT EXISTS jobs_sha256 ON jobs(sha256);
+
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id TEXT PRIMARY KEY,
+    total INTEGER NOT NULL,
+    duplicates TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS job_counts (
+    status TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS job_counts_insert AFTER INSERT ON jobs BEGIN
+    INSERT OR IGNORE INTO job_counts (status, count) VALUES (new.status, 0);
+    UPDATE job_counts SET count = count + 1 WHERE status = new.status;
+END;
+
+CREATE TRIGGER IF NOT EXISTS job_counts_update AFTER UPDATE OF status ON jobs
+WHEN old.status != new.status BEGIN
+    UPDATE job_counts SET count = count - 1 WHERE status = old.status;
+    INSERT OR IGNORE INTO job_counts (status, count) VALUES (new.status, 0);
+    UPDATE job_counts SET count = count + 1 WHERE status = new.status;
+END;
+
+CREATE TRIGGER IF NOT EXISTS job_counts_delete AFTER DELETE ON jobs BEGIN
+    UPDATE job_counts SET count = count - 1 WHERE status = old.status;
+END;
+"""
+
+_COLUMNS = ("seq, job_id, status, filename, sha256, temp_path, result, error, "
+            "created_at, updated_at, batch_id")
+
+
+def _row_to_job(row) -> Dict[str, Any]:
+    (seq, job_id, status, filename, sha256, temp_path, result, error,
+     created_at, updated_at, batch_id) = row
+    job = {
+        "job_id": job_id,
+        "status": status,
+        "filename": filename,
+        "sha256": sha256,
+        "created_at": created_at,
+        "updated_at": updated_at,
+    }
+    if batch_id is not None:
+        job["batch_id"] = batch_id
+    if result is not None:
+        job["result"] = json.loads(result)
+    if error is not None:
+        job["error"] = error
+    return job
+
+
+class JobStore:
+    """SQLite-backed job table with trigger-maintained status counters."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "batch_id" not in columns:
+            # Stores created before batch ingest
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN batch_id TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_batch ON jobs(batch_id, seq)")
+
+    def create(self, job_id: str, filename: str, sha256: str = None,
+               temp_path: str = None, status: str = "queued", batch_id: str = None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, filename, sha256, temp_path, batch_id, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, status, filename, sha256, temp_path, batch_id, now, now)
+            )
+
+    def create_batch(self, batch_id: str, jobs: List[Dict[str, Any]],
+                     duplicates: List[Dict[str, Any]] = None):
+        """
+        Record a batch and its queued jobs in one transaction. jobs are dicts
+        with job_id, filename, sha256 and temp_path; duplicates are the
+        deduplicated files, kept only for reporting.
+        """
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.execute(
+                    "INSERT INTO batches (batch_id, total, duplicates, created_at) VALUES (?, ?, ?, ?)",
+                    (batch_id, len(jobs), json.dumps(duplicates or []), now)
+                )
+                self._conn.executemany(
+                    "INSERT INTO jobs (job_id, status, filename, sha256, temp_path, batch_id, "
+                    "created_at, updated_at) VALUES (?, 'queued', ?, ?, ?, ?, ?, ?)",
+                    [(j["job_id"], j["filename"], j.get("sha256"), j.get("temp_path"),
+                      batch_id, now, now) for j in jobs]
+                )
+
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Batch progress: per-status counts, throughput over the batch lifetime,
+        an ETA for the remaining jobs, and every job's id and status.
+        """
+        with self._lock:
+            batch = self._conn.execute(
+                "SELECT total, duplicates, created_at FROM batches WHERE batch_id = ?", (batch_id,)
+            ).fetchone()
+            if not batch:
+                return None
+            rows = self._conn.execute(
+                "SELECT job_id, filename, status, error, updated_at FROM jobs "
+                "WHERE batch_id = ? ORDER BY seq", (batch_id,)
+            ).fetchall()
+        total, duplicates, created_at = batch
+        summary = {status: 0 for status in STATUSES}
+        last_finished = created_at
+        jobs = []
+        for job_id, filename, status, error, updated_at in rows:
+            summary[status] = summary.get(status, 0) + 1
+            if status not in UNFINISHED:
+                last_finished = max(last_finished, updated_at)
+            job = {"job_id": job_id, "filename": filename, "status": status}
+            if error is not None:
+                job["error"] = error
+            jobs.append(job)
+
+        finished = summary["completed"] + summary["failed"]
+        remaining = summary["queued"] + summary["processing"]
+        end = time.time() if remaining else last_finished
+        elapsed = max(end - created_at, 1e-6)
+        rate = finished / elapsed
+        if not remaining:
+            eta = 0.0
+        else:
+            # No estimate until the first paper of the batch has finished
+            eta = round(remaining / rate, 1) if rate else None
+        return {
+            "batch_id": batch_id,
+            "total": total,
+            "done": summary["completed"],
+            "failed": summary["failed"],
+            "queued": summary["queued"],
+            "processing": summary["processing"],
+            "finished": remaining == 0,
+            "elapsed_seconds": round(elapsed, 1),
+            "papers_per_minute": round(rate * 60, 2),
+            "eta_seconds": eta,
+            "jobs": jobs,
+            "duplicates": json.loads(duplicates),
+        }
+
+    def update(self, job_id: str, status: str = None, result: Any = None, error: str = None):
+        """Set any of status, result (JSON-serializable) and error on a job."""
+        fields, params = ["updated_at = ?"], [time.time()]
+        if status is not None:
+            fields.append("status = ?")
+            params.append(status)
+        if result is not None:
+            fields.append("result = ?")
+            params.append(json.dumps(result))
+        if error is not None:
+            fields.append("error = ?")
+            params.append(error)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {', '.join(fields)} WHERE job_id = ?",
+                               (*params, job_id))
+
+    def delete(self, job_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return _row_to_job(row) if row else None
+
+    def list(self, status: str = None, limit: int = 100,
+             cursor: int = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        One page of jobs, newest first. Pass the returned cursor back to get
+        the next page; it is None on the last page.
+        """
+        where, params = [], []
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if cursor is not None:
+            where.append("seq < ?")
+            params.append(cursor)
+        sql = f"SELECT {_COLUMNS} FROM jobs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY seq DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit + 1)).fetchall()
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return [_row_to_job(r) for r in rows[:limit]], next_cursor
+
+    def counts(self) -> Dict[str, int]:
+        """Jobs per status, read from the trigger-maintained counter table."""
+        summary = {status: 0 for status in STATUSES}
+        with self._lock:
+            for status, count in self._conn.execute("SELECT status, count FROM job_counts"):
+                summary[status] = count
+        return summary
+
+    def find_active_by_hash(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """Newest queued/processing job for these PDF bytes, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE sha256 = ? AND status IN (?, ?) "
+                f"ORDER BY seq DESC LIMIT 1",
+                (sha256, *UNFINISHED)
+            ).fetchone()
+        return _row_to_job(row) if row else None
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        """Jobs left queued or processing, oldest first, with their temp paths."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE status IN (?, ?) ORDER BY seq",
+                UNFINISHED
+            ).fetchall()
+        jobs = []
+        for row in rows:
+            job = _row_to_job(row)
+            job["temp_path"] = row[5]
+            jobs.append(job)
+        return jobs
+
+    def prune(self, older_than_seconds: float) -> int:
+        """Delete finished jobs last updated before the cutoff. Returns rows removed."""
+        cutoff = time.time() - older_than_seconds
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                ("completed", "failed", cutoff)
+            )
+        return cur.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Singleton instance
+_job_store = None
+_job_store_lock = threading.Lock()
+
+def get_job_store() -> JobStore:
+    """Get or create the job store (JOB_STORE_PATH, default data/jobs.sqlite)."""
+    global _job_store
+    with _job_store_lock:
+        if _job_store is None:
+            _job_store = JobStore(os.getenv("JOB_STORE_PATH") or data_dir("jobs.sqlite"))
+    return _job_store
@@ -0,0 +1,288 @@
+"""
+Local in-process vector index.
+Normalized float32 embeddings live in a memory-mapped matrix on disk and are
+searched with a batched matrix product; chunk metadata lives in SQLite. Past
+ivf_min_rows the store switches to an IVF (inverted file) approximate mode
+that only scans the nprobe closest clusters. The IVF index is built (and
+rebuilt as the corpus grows) in a background thread; queries keep using the
+previous index, or an exact scan, until it is ready.
+"""
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from services.config import data_dir, env_int
+from services.vector_store import VectorStore
+
+# Metadata fields that get an in-memory code array for fast filtering
+FILTER_FIELDS = ("paper_id", "section")
+
+
+class _IVFIndex:
+    """Spherical k-means clustering of the rows present when it was built."""
+
+    def __init__(self, matrix: np.ndarray, nlist: int, iterations: int = 8, seed: int = 0):
+        n = matrix.shape[0]
+        rng = np.random.default_rng(seed)
+        sample = matrix[rng.choice(n, size=min(n, nlist * 64), replace=False)]
+        centroids = sample[rng.choice(sample.shape[0], size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+        self.centroids = centroids
+        self.built_rows = n
+
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, 65536):
+            block = matrix[start:start + 65536]
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        self.order = np.argsort(assign, kind="stable").astype(np.int64)
+        self.offsets = np.searchsorted(assign[self.order], np.arange(nlist + 1))
+
+    def candidates(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        nprobe = min(nprobe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in lists])
+
+
+class LocalVectorStore(VectorStore):
+    """Memory-mapped NumPy vector index with exact and IVF search."""
+
+    name = "local"
+
+    def __init__(self, path: str, dims: int = 768, ivf_min_rows: int = 50_000,
+                 nprobe: int = 16, initial_capacity: int = 1024):
+        self.path = path
+        self.dims = dims
+        self.ivf_min_rows = ivf_min_rows
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self._matrix_path = os.path.join(path, "vectors.f32")
+
+        self._db = sqlite3.connect(os.path.join(path, "meta.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS rows (
+                row INTEGER PRIMARY KEY,
+                id TEXT UNIQUE NOT NULL,
+                paper_id TEXT,
+                section TEXT,
+                metadata TEXT NOT NULL
+            )
+        """)
+
+        self._ids: Dict[str, int] = {}
+        self._codes: Dict[str, Dict[Any, int]] = {f: {} for f in FILTER_FIELDS}
+        count = self._db.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+        self._count = count
+        capacity = max(initial_capacity, count)
+        self._field_arrays = {f: np.full(capacity, -1, dtype=np.int32) for f in FILTER_FIELDS}
+        for row, vec_id, paper_id, section in self._db.execute(
+            "SELECT row, id, paper_id, section FROM rows"
+        ):
+            self._ids[vec_id] = row
+            self._set_codes(row, {"paper_id": paper_id, "section": section})
+        self._open_matrix(capacity)
+        self._ivf: Optional[_IVFIndex] = None
+        self._ivf_building = False
+
+    @classmethod
+    def from_env(cls) -> "LocalVectorStore":
+        return cls(
+            path=os.getenv("LOCAL_VECTOR_STORE_DIR") or data_dir("vectors"),
+            dims=env_int("LOCAL_VECTOR_STORE_DIMS", 768),
+            ivf_min_rows=env_int("LOCAL_VECTOR_STORE_IVF_MIN_ROWS", 50_000),
+            nprobe=env_int("LOCAL_VECTOR_STORE_NPROBE", 16)
+        )
+
+    def _open_matrix(self, capacity: int):
+        needed = capacity * self.dims * 4
+        mode = "r+b" if os.path.exists(self._matrix_path) else "w+b"
+        with open(self._matrix_path, mode) as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < needed:
+                f.truncate(needed)
+        size = os.path.getsize(self._matrix_path) // (self.dims * 4)
+        self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r+",
+                                 shape=(size, self.dims))
+        for field, arr in self._field_arrays.items():
+            if len(arr) < size:
+                grown = np.full(size, -1, dtype=np.int32)
+                grown[:len(arr)] = arr
+                self._field_arrays[field] = grown
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self._matrix.shape[0]:
+            return
+        capacity = self._matrix.shape[0]
+        while capacity < rows:
+            capacity *= 2
+        self._matrix.flush()
+        del self._matrix
+        self._open_matrix(capacity)
+
+    def _code(self, field: str, value, create: bool) -> int:
+        codes = self._codes[field]
+        if value not in codes:
+            if not create:
+                return -2  # matches nothing
+            codes[value] = len(codes)
+        return codes[value]
+
+    def _set_codes(self, row: int, metadata: Dict[str, Any]):
+        for field in FILTER_FIELDS:
+            value = metadata.get(field)
+            self._field_arrays[field][row] = -1 if value is None else self._code(field, value, True)
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> int:
+        if not vectors:
+            return 0
+        values = np.asarray([v["values"] for v in vectors], dtype=np.float32)
+        if values.ndim != 2 or values.shape[1] != self.dims:
+            raise ValueError(f"Expected {self.dims}-dim vectors, got shape {values.shape}")
+        norms = np.linalg.norm(values, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+
+        with self._lock:
+            rows = []
+            for vec in vectors:
+                row = self._ids.get(vec["id"])
+                if row is None:
+                    row = self._count
+                    self._count += 1
+                    self._ids[vec["id"]] = row
+                rows.append(row)
+            self._ensure_capacity(self._count)
+            self._matrix[rows] = values / norms
+            self._matrix.flush()
+
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO rows (row, id, paper_id, section, metadata) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (row, vec["id"], (vec.get("metadata") or {}).get("paper_id"),
+                         (vec.get("metadata") or {}).get("section"),
+                         json.dumps(vec.get("metadata") or {}))
+                        for row, vec in zip(rows, vectors)
+                    ]
+                )
+            for row, vec in zip(rows, vectors):
+                self._set_codes(row, vec.get("metadata") or {})
+
+            self._maybe_build_ivf()
+            return len(vectors)
+
+    def _maybe_build_ivf(self):
+        """
+        Start a background IVF build once the store reaches ivf_min_rows, and a
+        rebuild once it has grown by half since the last one. Call under _lock.
+        """
+        n = self._count
+        if self._ivf_building or n < self.ivf_min_rows:
+            return
+        if self._ivf is not None and n <= self._ivf.built_rows * 1.5:
+            return
+        self._ivf_building = True
+        # The slice keeps its own reference to the mapping, so the build reads a
+        # stable view even if upserts grow (and remap) the matrix meanwhile
+        matrix = self._matrix[:n]
+
+        def build():
+            ivf = None
+            try:
+                ivf = _IVFIndex(matrix, nlist=int(np.sqrt(n)))
+            except Exception as e:
+                print(f"IVF index build failed: {e}")
+            with self._lock:
+                if ivf is not None:
+                    self._ivf = ivf
+                self._ivf_building = False
+
+        threading.Thread(target=build, name="ivf-build", daemon=True).start()
+
+    def _filter_mask(self, filter: Optional[Dict[str, Any]], n: int) -> Optional[np.ndarray]:
+        if not filter:
+            return None
+        mask = np.ones(n, dtype=bool)
+        for field, value in filter.items():
+            if field not in FILTER_FIELDS:
+                raise ValueError(f"Local vector store can only filter on {FILTER_FIELDS}")
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            codes = [self._code(field, v, False) for v in values]
+            mask &= np.isin(self._field_arrays[field][:n], codes)
+        return mask
+
+    def _candidate_rows(self, query: np.ndarray, n: int) -> Optional[np.ndarray]:
+        """Rows to score in approximate mode, or None for an exact scan."""
+        if n < self.ivf_min_rows:
+            return None
+        self._maybe_build_ivf()
+        if self._ivf is None:
+            return None  # first build still running
+        rows = self._ivf.candidates(query, self.nprobe)
+        if self._ivf.built_rows < n:
+            # Rows added after the build are always scanned exactly
+            rows = np.concatenate([rows, np.arange(self._ivf.built_rows, n)])
+        return rows
+
+    def query(self, vector: List[float], top_k: int = 5,
+              filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            n = self._count
+            if n == 0 or top_k <= 0:
+                return []
+            query = np.asarray(vector, dtype=np.float32)
+            # A new array: vector may be the caller's own float32 array
+            query = query / (np.linalg.norm(query) or 1.0)
+
+            rows = self._candidate_rows(query, n)
+            mask = self._filter_mask(filter, n)
+            if mask is not None:
+                allowed = np.flatnonzero(mask)
+                if rows is not None:
+                    probed = rows[mask[rows]]
+                    # Scan every match exactly when that is no dearer than the
+                    # probe, or when the probed clusters hold fewer than top_k
+                    # of them (a selective filter, e.g. one paper_id)
+                    if len(allowed) > len(rows) and len(probed) >= min(top_k, len(allowed)):
+                        allowed = probed
+                rows = allowed
+
+            if rows is None:
+                scores = self._matrix[:n] @ query
+                rows = np.arange(n)
+            else:
+                if len(rows) == 0:
+                    return []
+                scores = self._matrix[rows] @ query
+
+            k = min(top_k, len(scores))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            hits = [(int(rows[i]), float(scores[i])) for i in best]
+
+            marks = ",".join("?" * len(hits))
+            meta = {
+                row: (vec_id, json.loads(metadata))
+                for row, vec_id, metadata in self._db.execute(
+                    f"SELECT row, id, metadata FROM rows WHERE row IN ({marks})",
+                    [row for row, _ in hits]
+                )
+            }
+        return [
+            {"id": meta[row][0], "score": score, "metadata": meta[row][1]}
+            for row, score in hits if row in meta
+        ]
+
+    def __len__(self) -> int:
+        return self._count
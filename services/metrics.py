@@ -0,0 +1,244 @@
+"""
+Prometheus metrics.
+A small in-process registry of counters, histograms and callback gauges,
+rendered in the Prometheus text exposition format by GET /metrics. Updates
+are a dict lookup and an integer add under a lock, cheap enough for every
+pipeline stage and search; gauges (queue depths, dependency health) are only
+computed when scraped.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Seconds; spans a cached lookup up to a long Marker conversion
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Tuple) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return tuple(str(v) for v in labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    """Monotonic counter, optionally labelled."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        # An unlabelled counter is exported as 0 before its first increment
+        self._values: Dict[Tuple[str, ...], float] = {} if self.labelnames else {(): 0.0}
+
+    def inc(self, *labels, amount: float = 1.0):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution (cumulative buckets, sum and count on render)."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, *labels) -> Optional[Dict[str, Any]]:
+        """{"buckets": {le: cumulative count}, "sum", "count"} for one series."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            if series is None:
+                return None
+            counts, total, count = list(series[0]), series[1], series[2]
+        cumulative, running = {}, 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            running += n
+            cumulative[bound] = running
+        return {"buckets": cumulative, "sum": total, "count": count}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            keys = sorted(self._series)
+        lines = self.header()
+        for key in keys:
+            snap = self.snapshot(*key)
+            for bound, n in snap["buckets"].items():
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {n}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(snap['sum'])}")
+            lines.append(f"{self.name}_count{labels} {snap['count']}")
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    Gauge whose value is read when scraped. callback returns a number, or
+    a {label values tuple: number} dict for a labelled gauge.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, callback: Callable[[], Any],
+                 labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        value = self.callback()
+        if not isinstance(value, dict):
+            value = {(): value}
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(value.items()) if v is not None
+        ]
+
+
+class Registry:
+    """Named metrics, rendered together for /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            # Re-registering (e.g. a module reloaded) keeps the existing series
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name: str, help: str, callback: Callable[[], Any],
+              labelnames: Sequence[str] = ()) -> Gauge:
+        """Register (or replace) a callback gauge."""
+        gauge = Gauge(name, help, callback, labelnames)
+        with self._lock:
+            self._metrics[name] = gauge
+        return gauge
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # A failing gauge callback must not take the whole scrape down
+                lines.append(f"# {metric.name} unavailable: {e}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "ingest_stage_seconds",
+    "Time spent in each ingestion step (grobid, marker, chunk, embed, graph, vectors); "
+    "batched steps observe once per batch",
+    ["stage"])
+JOB_SECONDS = REGISTRY.histogram(
+    "ingest_job_seconds", "Time from a job entering the pipeline to completion or failure", ["status"])
+JOBS = REGISTRY.counter("ingest_jobs_total", "Finished ingestion jobs", ["status"])
+EXTRACT_ROUTE = REGISTRY.counter(
+    "ingest_extract_route_total",
+    "How each PDF's text was obtained: grobid, marker, or cache (stored artifacts)",
+    ["route"])
+EMBED_BATCH_SIZE = REGISTRY.histogram(
+    "embedding_batch_size", "Texts per embedding backend call (cache misses only)",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500))
+NEO4J_ROUND_TRIPS = REGISTRY.counter(
+    "ingest_neo4j_round_trips_total",
+    "Neo4j write round trips made by the graph stage; divide by "
+    "ingest_graph_papers_total for round trips per paper")
+GRAPH_PAPERS = REGISTRY.counter("ingest_graph_papers_total", "Papers written by the graph stage")
+SEARCH_PHASE_SECONDS = REGISTRY.histogram(
+    "search_phase_seconds", "Hybrid search latency by phase (embed, vector, graph, total)",
+    ["phase"])
+
+
+@contextmanager
+def stage_timer(stage: str, jobs: Sequence[Dict[str, Any]] = ()):
+    """
+    Time a pipeline step: one STAGE_SECONDS observation, and the elapsed
+    milliseconds recorded as timings["<stage>_ms"] on every job in jobs.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage)
+        for job in jobs:
+            job.setdefault("timings", {})[f"{stage}_ms"] = round(elapsed * 1000, 2)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text format."""
+    return REGISTRY.render()
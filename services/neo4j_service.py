@@ -3,13 +3,304 @@ Neo4j Database Service
 Handles all graph database operations for the research paper knowledge graph.
 """
 from neo4j import GraphDatabase
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+import base64
 import os
+import re
+from datetime import datetime
 from dotenv import load_dotenv
 
+from services.author_resolver import get_author_resolver
+from services.blob_store import get_blob_store
+from services.citation_resolver import get_citation_resolver
+from services.config import env_int, get_section
+from services.metrics import GRAPH_PAPERS, NEO4J_ROUND_TRIPS
+
 load_dotenv()
 
 
+# Paper properties returned by read queries. Full text lives in the blob store
+# and is only loaded when a caller asks for it.
+PAPER_PROJECTION = """p {
+    .title, .citation_key, .doi, .abstract, .year, .venue, .job_id,
+    .full_text_ref, .full_text_size,
+    created_at: toString(p.created_at), updated_at: toString(p.updated_at)
+}"""
+
+
+def _offload_text(full_text: Optional[str]) -> Dict[str, Any]:
+    """Store full text in the blob store; returns the ref/size properties for the node."""
+    if not full_text:
+        return {"full_text_ref": None, "full_text_size": None}
+    blob = get_blob_store().put_text(full_text)
+    return {"full_text_ref": blob["ref"], "full_text_size": blob["size"]}
+
+
+# Single-statement ingest used by ingest_papers_batched. One row per paper is
+# unwound from $papers; each CALL subquery expands one of that paper's entity
+# lists and aggregates its own count, so an empty list still yields a row
+# (count 0) and never collapses the result.
+INGEST_PAPERS_QUERY = """
+UNWIND $papers AS paper
+MERGE (p:Paper {citation_key: paper.citation_key})
+ON MATCH SET
+    p.updated_at = datetime()
+// A placeholder created by an earlier citation takes the paper's own title
+SET p.title = CASE WHEN p.job_id IS NULL THEN paper.title ELSE p.title END
+// :Ingested separates real papers from citation placeholders for listings
+SET p:Ingested
+// coalesce keeps the first ingest's values but also fills in placeholder
+// papers that were created earlier as someone's citation
+SET p.created_at = coalesce(p.created_at, datetime()),
+    p.job_id = coalesce(p.job_id, paper.job_id),
+    p.full_text_ref = coalesce(p.full_text_ref, paper.full_text_ref),
+    p.full_text_size = coalesce(p.full_text_size, paper.full_text_size)
+WITH p, paper
+CALL {
+    WITH p, paper
+    UNWIND paper.authors AS author
+    MERGE (a:Author {name: author.name})
+    ON CREATE SET a.created_at = datetime()
+    SET a.affiliation = coalesce(a.affiliation, author.affiliation)
+    // Remember the spellings that resolved to this author
+    FOREACH (_ IN CASE WHEN author.mention <> a.name
+                        AND NOT author.mention IN coalesce(a.aliases, []) THEN [1] ELSE [] END |
+        SET a.aliases = coalesce(a.aliases, []) + author.mention)
+    MERGE (a)-[:AUTHORED]->(p)
+    RETURN count(*) AS authors_linked
+}
+CALL {
+    WITH p, paper
+    UNWIND paper.citations AS ref
+    MERGE (cited:Paper {citation_key: ref.key})
+    ON CREATE SET cited.title = ref.title
+    SET cited.doi = coalesce(cited.doi, ref.doi),
+        cited.arxiv = coalesce(cited.arxiv, ref.arxiv),
+        cited.year = coalesce(cited.year, ref.year)
+    MERGE (p)-[:CITES]->(cited)
+    RETURN count(*) AS citations_created
+}
+CALL {
+    WITH p, paper
+    UNWIND paper.methods AS method_name
+    MERGE (m:Method {name: method_name})
+    MERGE (p)-[:USES_METHOD]->(m)
+    RETURN count(*) AS methods_linked
+}
+CALL {
+    WITH p, paper
+    UNWIND paper.datasets AS dataset_name
+    MERGE (d:Dataset {name: dataset_name})
+    MERGE (p)-[:USES_DATASET]->(d)
+    RETURN count(*) AS datasets_linked
+}
+CALL {
+    WITH p, paper
+    UNWIND paper.tasks AS task_name
+    MERGE (t:Task {name: task_name})
+    MERGE (p)-[:ADDRESSES_TASK]->(t)
+    RETURN count(*) AS tasks_linked
+}
+RETURN paper.index AS index,
+       p { .title, .citation_key, .job_id, .full_text_ref, .full_text_size } AS p,
+       authors_linked, citations_created, methods_linked, datasets_linked, tasks_linked
+"""
+
+
+# Each relationship list is built by its own pattern comprehension, so the
+# row count stays at one instead of the product of all the expansions.
+PAPER_DETAIL_QUERY = f"""
+MATCH (p:Paper {{title: $title}})
+RETURN {PAPER_PROJECTION} AS p,
+       CASE WHEN $include_text AND p.full_text_ref IS NULL
+            THEN p.full_text END AS legacy_full_text,
+       [(a:Author)-[:AUTHORED]->(p) | a.name] AS authors,
+       [(p)-[:CITES]->(cited:Paper) | cited.title] AS citations,
+       [(p)-[:USES_METHOD]->(m:Method) | m.name] AS methods,
+       [(p)-[:USES_DATASET]->(d:Dataset) | d.name] AS datasets,
+       [(p)-[:ADDRESSES_TASK]->(t:Task) | t.name] AS tasks
+"""
+
+# Related-paper signals. Every branch caps its first hop and its expansion at
+# $fanout rows, so hub papers, prolific authors and popular methods cost the
+# same as anything else. A shared neighbour contributes 1 / log(2 + degree):
+# sharing a rare method says more than sharing one half the corpus uses.
+RELATED_PAPERS_QUERY = """
+MATCH (p:Paper {title: $title})
+CALL {
+    WITH p
+    MATCH (p)<-[:AUTHORED]-(a:Author)
+    WITH p, a LIMIT $fanout
+    WITH p, a, COUNT { (a)-[:AUTHORED]->() } AS degree ORDER BY degree
+    MATCH (a)-[:AUTHORED]->(r:Paper) WHERE r <> p
+    WITH r, degree LIMIT $fanout
+    RETURN r, 'authors' AS signal, count(*) AS shared, sum(1.0 / log(2 + degree)) AS overlap
+  UNION ALL
+    WITH p
+    MATCH (p)-[:USES_METHOD]->(m:Method)
+    WITH p, m LIMIT $fanout
+    WITH p, m, COUNT { (m)<-[:USES_METHOD]-() } AS degree ORDER BY degree
+    MATCH (m)<-[:USES_METHOD]-(r:Paper) WHERE r <> p
+    WITH r, degree LIMIT $fanout
+    RETURN r, 'methods' AS signal, count(*) AS shared, sum(1.0 / log(2 + degree)) AS overlap
+  UNION ALL
+    // co-citation: papers cited alongside p
+    WITH p
+    MATCH (p)<-[:CITES]-(c:Paper)
+    WITH p, c LIMIT $fanout
+    WITH p, c, COUNT { (c)-[:CITES]->() } AS degree ORDER BY degree
+    MATCH (c)-[:CITES]->(r:Paper) WHERE r <> p
+    WITH r, degree LIMIT $fanout
+    RETURN r, 'co_citation' AS signal, count(*) AS shared, sum(1.0 / log(2 + degree)) AS overlap
+  UNION ALL
+    // bibliographic coupling: papers citing the same references as p
+    WITH p
+    MATCH (p)-[:CITES]->(x:Paper)
+    WITH p, x LIMIT $fanout
+    WITH p, x, COUNT { (x)<-[:CITES]-() } AS degree ORDER BY degree
+    MATCH (x)<-[:CITES]-(r:Paper) WHERE r <> p
+    WITH r, degree LIMIT $fanout
+    RETURN r, 'coupling' AS signal, count(*) AS shared, sum(1.0 / log(2 + degree)) AS overlap
+  UNION ALL
+    WITH p
+    MATCH (p)-[:CITES]-(r:Paper) WHERE r <> p
+    WITH r LIMIT $fanout
+    RETURN r, 'citation' AS signal, count(*) AS shared, 1.0 AS overlap
+}
+WITH r, sum($weights[signal] * overlap) AS score, collect([signal, shared]) AS signals
+ORDER BY score DESC, r.title
+LIMIT $limit
+RETURN r.title AS title, r.job_id AS job_id, score, signals
+"""
+
+# Weight of each related-paper signal; override under "related" in config.json
+RELATED_WEIGHTS = {
+    "authors": 1.0,
+    "methods": 0.5,
+    "co_citation": 0.8,
+    "coupling": 0.8,
+    "citation": 1.0,
+}
+
+
+# Newest ingested papers first, keyset-paginated on (created_at, job_id). The
+# composite index on :Ingested(created_at, job_id) serves both the seek and
+# the order, so LIMIT stops the scan and a deep page costs the same as the
+# first; authors are only fetched for the rows on the page.
+LIST_PAPERS_QUERY = """
+MATCH (p:Ingested)
+WHERE {where}
+WITH p ORDER BY p.created_at DESC, p.job_id DESC
+LIMIT $limit
+RETURN p.title AS title, p.job_id AS job_id, toString(p.created_at) AS created_at,
+       [(a:Author)-[:AUTHORED]->(p) | a.name][..$max_authors] AS authors
+"""
+# Separate predicates (rather than "$cursor IS NULL OR ...") keep the plan an index seek
+_FIRST_PAGE = "p.created_at IS NOT NULL AND p.job_id IS NOT NULL"
+# created_at <= cursor is the seekable range; the second line only drops
+# rows that share the cursor's timestamp
+_NEXT_PAGE = """p.created_at <= datetime($created_at) AND p.job_id IS NOT NULL
+  AND (p.created_at < datetime($created_at) OR p.job_id < $job_id)"""
+
+
+def encode_cursor(created_at: str, job_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at}|{job_id}".encode("utf-8")).decode("ascii")
+
+
+def _parse_created_at(value: str) -> datetime:
+    """
+    Parse a created_at as rendered by toString(datetime()). Neo4j writes up to
+    nanoseconds and a "Z"; Python 3.10's fromisoformat takes neither, so the
+    fraction is fitted to microseconds first.
+    """
+    text = value[:-1] + "+00:00" if value.endswith("Z") else value
+    text = re.sub(r"\.(\d+)", lambda m: "." + (m.group(1) + "000000")[:6], text, count=1)
+    return datetime.fromisoformat(text)
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Inverse of encode_cursor; raises ValueError on a malformed cursor,
+    including one whose created_at Neo4j's datetime() would reject.
+    """
+    try:
+        created_at, job_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        _parse_created_at(created_at)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return created_at, job_id
+
+
+def driver_settings() -> Dict[str, Any]:
+    """
+    Driver pool settings shared by the sync and async services: "neo4j" in
+    config.json, overridden by NEO4J_MAX_POOL_SIZE, NEO4J_ACQUISITION_TIMEOUT
+    (seconds) and NEO4J_FETCH_SIZE (records per pull).
+    """
+    cfg = get_section("neo4j")
+    return {
+        "max_connection_pool_size": env_int("NEO4J_MAX_POOL_SIZE", cfg.get("max_pool_size", 100)),
+        "connection_acquisition_timeout": float(
+            env_int("NEO4J_ACQUISITION_TIMEOUT", cfg.get("acquisition_timeout", 60))),
+        "fetch_size": env_int("NEO4J_FETCH_SIZE", cfg.get("fetch_size", 1000)),
+    }
+
+
+def _fetch_rows(tx, query: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return tx.run(query, params).data()
+
+
+def paper_from_row(row: Dict[str, Any], include_text: bool = False) -> Dict[str, Any]:
+    """Shape a PAPER_DETAIL_QUERY row; include_text reads the blob store."""
+    paper_data = dict(row["p"])
+    if include_text:
+        # Papers ingested before the blob store still carry p.full_text
+        ref = paper_data.get("full_text_ref")
+        paper_data["full_text"] = get_blob_store().get_text(ref) if ref else row["legacy_full_text"]
+    for field in ("authors", "citations", "methods", "datasets", "tasks"):
+        paper_data[field] = row[field]
+    return paper_data
+
+
+def related_params(title: str, limit: int) -> Dict[str, Any]:
+    cfg = get_section("related")
+    return {"title": title, "limit": limit, "fanout": cfg.get("fanout", 500),
+            "weights": {**RELATED_WEIGHTS, **cfg.get("weights", {})}}
+
+
+def related_from_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "title": row["title"],
+            "job_id": row["job_id"],
+            "score": round(row["score"], 4),
+            "signals": {signal: shared for signal, shared in row["signals"]},
+        }
+        for row in rows
+    ]
+
+
+def list_papers_query(limit: int, cursor: Optional[str], max_authors: int) -> Tuple[str, Dict[str, Any]]:
+    """Query and parameters for one listing page (fetches one extra row to detect the end)."""
+    created_at, job_id = decode_cursor(cursor) if cursor else (None, None)
+    query = LIST_PAPERS_QUERY.format(where=_NEXT_PAGE if cursor else _FIRST_PAGE)
+    return query, {"created_at": created_at, "job_id": job_id,
+                   "limit": limit + 1, "max_authors": max_authors}
+
+
+def list_papers_page(rows: List[Dict[str, Any]], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(last["created_at"], last["job_id"])
+    return rows[:limit], next_cursor
+
+
+def _clean_names(names: Optional[List[str]]) -> List[str]:
+    """Strip names and drop empty ones (mirrors the per-entity path)."""
+    return [n.strip() for n in (names or []) if n and n.strip()]
+
+
 class Neo4jService:
     """Service class for Neo4j database operations."""
     
@@ -25,7 +316,8 @@ class Neo4jService:
         if not self.driver:
             self.driver = GraphDatabase.driver(
                 self.uri, 
-                auth=(self.user, self.password)
+                auth=(self.user, self.password),
+                **driver_settings()
             )
         return self
     
@@ -35,6 +327,23 @@ class Neo4jService:
             self.driver.close()
             self.driver = None
     
+    def _author_resolver(self):
+        """Author blocking index, loaded from the graph on first use."""
+        resolver = get_author_resolver()
+        resolver.ensure_loaded(self.driver)
+        return resolver
+
+    def _citation_resolver(self):
+        """Citation identity index, rebuilt from the graph if it starts out empty."""
+        resolver = get_citation_resolver()
+        resolver.ensure_loaded(self.driver)
+        return resolver
+
+    def _read(self, query: str, **params) -> List[Dict[str, Any]]:
+        """Run a query in a read transaction (routable to read replicas)."""
+        with self.driver.session() as session:
+            return session.execute_read(_fetch_rows, query, params)
+
     def verify_connection(self) -> bool:
         """Verify that the connection to Neo4j is working."""
         try:
@@ -52,22 +361,32 @@ class Neo4jService:
     def create_paper(self, title: str, abstract: str = None, 
                      year: int = None, venue: str = None,
                      full_text: str = None, job_id: str = None) -> Dict[str, Any]:
-        """Create or merge a Paper node."""
+        """
+        Create or merge a Paper node, keyed by its resolved citation_key.
+        full_text goes to the blob store, not the node.
+        """
+        text = _offload_text(full_text)
+        key = self._citation_resolver().resolve({"title": title}, ingested=bool(job_id))["key"]
         with self.driver.session() as session:
-            result = session.run("""
-                MERGE (p:Paper {title: $title})
+            result = session.run(f"""
+                MERGE (p:Paper {{citation_key: $key}})
                 ON CREATE SET 
+                    p.title = $title,
                     p.abstract = $abstract,
                     p.year = $year,
-                    p.venue = $venue,
-                    p.full_text = $full_text,
-                    p.job_id = $job_id,
-                    p.created_at = datetime()
+                    p.venue = $venue
                 ON MATCH SET
                     p.updated_at = datetime()
-                RETURN p
-            """, title=title, abstract=abstract, year=year, 
-                venue=venue, full_text=full_text, job_id=job_id)
+                SET p.title = CASE WHEN p.job_id IS NULL AND $job_id IS NOT NULL
+                                   THEN $title ELSE p.title END
+                FOREACH (_ IN CASE WHEN $job_id IS NOT NULL THEN [1] ELSE [] END | SET p:Ingested)
+                SET p.created_at = coalesce(p.created_at, datetime()),
+                    p.job_id = coalesce(p.job_id, $job_id),
+                    p.full_text_ref = coalesce(p.full_text_ref, $full_text_ref),
+                    p.full_text_size = coalesce(p.full_text_size, $full_text_size)
+                RETURN {PAPER_PROJECTION} AS p
+            """, key=key, title=title, abstract=abstract, year=year, 
+                venue=venue, job_id=job_id, **text)
             record = result.single()
             return dict(record["p"]) if record else None
     
@@ -105,19 +424,24 @@ class Neo4jService:
     
     def create_citation(self, citing_title: str, cited_title: str) -> bool:
         """Create CITES relationship between two papers."""
+        cited = self._citation_resolver().resolve({"title": cited_title})
+        if cited is None:
+            return False
         with self.driver.session() as session:
             # First ensure cited paper exists (even if just as title placeholder)
             session.run("""
-                MERGE (p:Paper {title: $cited_title})
-            """, cited_title=cited_title)
+                MERGE (p:Paper {citation_key: $key})
+                ON CREATE SET p.title = $cited_title
+            """, key=cited["key"], cited_title=cited_title)
             
             # Create the citation relationship
             result = session.run("""
                 MATCH (citing:Paper {title: $citing_title})
-                MATCH (cited:Paper {title: $cited_title})
+                MATCH (cited:Paper {citation_key: $key})
+                WHERE citing <> cited
                 MERGE (citing)-[r:CITES]->(cited)
                 RETURN r
-            """, citing_title=citing_title, cited_title=cited_title)
+            """, citing_title=citing_title, key=cited["key"])
             return result.single() is not None
     
     # ==========================================
@@ -218,12 +542,11 @@ class Neo4jService:
             job_id=job_id
         )
         
-        # Link authors
-        for author_name in authors:
-            if author_name.strip():
-                self.create_author(author_name.strip())
-                if self.link_author_to_paper(author_name.strip(), title):
-                    results["authors_linked"] += 1
+        # Link authors (resolved to existing Author nodes where possible)
+        for author in self._author_resolver().resolve_paper(_clean_names(authors)):
+            self.create_author(author["name"])
+            if self.link_author_to_paper(author["name"], title):
+                results["authors_linked"] += 1
         
         # Create citation relationships
         for cited_title in citations:
@@ -257,69 +580,111 @@ class Neo4jService:
         
         return results
     
+    def ingest_paper_data_batched(self, job_id: str, title: str, authors: List[str],
+                                  citations: List[str], full_text: str = None,
+                                  methods: List[str] = None, datasets: List[str] = None,
+                                  tasks: List[str] = None,
+                                  references: List[Dict[str, Any]] = None,
+                                  author_details: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Batched variant of ingest_paper_data.
+        Writes the paper and all of its relationships in a single managed
+        write transaction, expanding each entity list with UNWIND, so the
+        whole paper costs one round trip instead of one per entity.
+        Returns the same counts dict as ingest_paper_data.
+        """
+        return self.ingest_papers_batched([{
+            "job_id": job_id, "title": title, "authors": authors, "citations": citations,
+            "full_text": full_text, "methods": methods, "datasets": datasets, "tasks": tasks,
+            "references": references, "author_details": author_details
+        }])[0]
+
+    def ingest_papers_batched(self, papers: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Write several papers in one transaction and one round trip.
+        Each paper is a dict with the ingest_paper_data_batched arguments
+        (job_id, title, authors, citations, full_text, methods, datasets, tasks,
+        references, author_details). Papers and their references are merged on
+        citation_key: "references" (parsed biblStructs with doi/arxiv) is used
+        when present, otherwise the plain "citations" titles. Authors are
+        resolved against existing Author nodes, using "author_details"
+        (surname, forenames, affiliation) when present.
+        Returns one counts dict per paper, in input order.
+        """
+        resolver = self._citation_resolver()
+        authors = self._author_resolver()
+        params = []
+        for i, paper in enumerate(papers):
+            key = resolver.resolve({"title": paper["title"]}, ingested=True)["key"]
+            references = paper.get("references") or [
+                {"title": title} for title in _clean_names(paper.get("citations"))
+            ]
+            params.append({
+                "index": i,
+                "title": paper["title"],
+                "citation_key": key,
+                **_offload_text(paper.get("full_text")),
+                "job_id": paper.get("job_id"),
+                "authors": authors.resolve_paper(
+                    paper.get("author_details") or _clean_names(paper.get("authors"))),
+                "citations": resolver.resolve_many(references, exclude_key=key),
+                "methods": _clean_names(paper.get("methods")),
+                "datasets": _clean_names(paper.get("datasets")),
+                "tasks": _clean_names(paper.get("tasks")),
+            })
+        if not params:
+            return []
+        with self.driver.session() as session:
+            records = session.execute_write(
+                lambda tx: list(tx.run(INGEST_PAPERS_QUERY, papers=params))
+            )
+        NEO4J_ROUND_TRIPS.inc()
+        GRAPH_PAPERS.inc(amount=len(params))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(papers)
+        for record in records:
+            results[record["index"]] = {
+                "paper": dict(record["p"]),
+                "authors_linked": record["authors_linked"],
+                "citations_created": record["citations_created"],
+                "methods_linked": record["methods_linked"],
+                "datasets_linked": record["datasets_linked"],
+                "tasks_linked": record["tasks_linked"]
+            }
+        return results
+    
     # ==========================================
     # Query Operations
     # ==========================================
     
-    def get_paper_by_title(self, title: str) -> Optional[Dict[str, Any]]:
-        """Get a paper and its relationships by title."""
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (p:Paper {title: $title})
-                OPTIONAL MATCH (a:Author)-[:AUTHORED]->(p)
-                OPTIONAL MATCH (p)-[:CITES]->(cited:Paper)
-                OPTIONAL MATCH (p)-[:USES_METHOD]->(m:Method)
-                OPTIONAL MATCH (p)-[:USES_DATASET]->(d:Dataset)
-                OPTIONAL MATCH (p)-[:ADDRESSES_TASK]->(t:Task)
-                RETURN p,
-                       collect(DISTINCT a.name) as authors,
-                       collect(DISTINCT cited.title) as citations,
-                       collect(DISTINCT m.name) as methods,
-                       collect(DISTINCT d.name) as datasets,
-                       collect(DISTINCT t.name) as tasks
-            """, title=title)
-            record = result.single()
-            if record:
-                paper_data = dict(record["p"])
-                paper_data["authors"] = record["authors"]
-                paper_data["citations"] = record["citations"]
-                paper_data["methods"] = record["methods"]
-                paper_data["datasets"] = record["datasets"]
-                paper_data["tasks"] = record["tasks"]
-                return paper_data
-            return None
+    def get_paper_by_title(self, title: str, include_text: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get a paper and its relationships by title. Only projected properties
+        are returned; include_text=True also loads full_text from the blob store.
+        """
+        rows = self._read(PAPER_DETAIL_QUERY, title=title, include_text=include_text)
+        return paper_from_row(rows[0], include_text) if rows else None
     
+    def list_papers(self, limit: int = 100, cursor: str = None,
+                    max_authors: int = 20) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of ingested papers, newest first (title, job_id, created_at,
+        authors). Pass the returned cursor back to get the next page; it is
+        None on the last page.
+        """
+        query, params = list_papers_query(limit, cursor, max_authors)
+        return list_papers_page(self._read(query, **params), limit)
+
     def get_all_papers(self, limit: int = 100) -> List[Dict[str, Any]]:
-        """Get all papers with basic info."""
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (p:Paper)
-                OPTIONAL MATCH (a:Author)-[:AUTHORED]->(p)
-                RETURN p.title as title, p.job_id as job_id,
-                       collect(DISTINCT a.name) as authors
-                ORDER BY p.created_at DESC
-                LIMIT $limit
-            """, limit=limit)
-            return [dict(record) for record in result]
+        """Get the newest ingested papers with basic info."""
+        return self.list_papers(limit=limit)[0]
     
-    def find_related_papers(self, title: str) -> List[Dict[str, Any]]:
-        """Find papers related through shared authors, methods, or citations."""
-        with self.driver.session() as session:
-            result = session.run("""
-                MATCH (p:Paper {title: $title})
-                OPTIONAL MATCH (p)<-[:AUTHORED]-(a:Author)-[:AUTHORED]->(related:Paper)
-                WHERE related.title <> $title
-                OPTIONAL MATCH (p)-[:USES_METHOD]->(m:Method)<-[:USES_METHOD]-(method_related:Paper)
-                WHERE method_related.title <> $title
-                OPTIONAL MATCH (p)-[:CITES]->(cited:Paper)
-                OPTIONAL MATCH (citing:Paper)-[:CITES]->(p)
-                WITH collect(DISTINCT related) + collect(DISTINCT method_related) + 
-                     collect(DISTINCT cited) + collect(DISTINCT citing) as all_related
-                UNWIND all_related as r
-                RETURN DISTINCT r.title as title, r.job_id as job_id
-                LIMIT 20
-            """, title=title)
-            return [dict(record) for record in result]
+    def find_related_papers(self, title: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Rank papers related through shared authors, shared methods, co-citation,
+        bibliographic coupling and direct citation. Each result has a weighted
+        score and the number of shared neighbours per signal.
+        """
+        return related_from_rows(self._read(RELATED_PAPERS_QUERY, **related_params(title, limit)))
 
 
 # Singleton instance
@@ -1,6 +1,7 @@
 """
 Pinecone vector store service for paper chunk embeddings.
-Chunks markdown by section headers, embeds with Gemini, upserts to Pinecone.
+Chunks markdown by section headers, embeds with Gemini, upserts to the
+configured vector store (Pinecone by default, see services/vector_store.py).
 """
 import os
 import re
@@ -8,11 +9,18 @@ from typing import List, Dict, Any, Optional
 
 from dotenv import load_dotenv
 
+from services.embedding_cache import embedding_key, get_embedding_cache
+from services.embedding_engine import get_embedding_engine
+from services.vector_store import get_vector_store
+from services.query_cache import (
+    freeze_filters, invalidate_search_results, normalize_query,
+    query_embedding_cache, search_result_cache
+)
+
 load_dotenv()
 
 # Lazy imports to avoid startup errors if deps missing
 _pinecone = None
-_genai = None
 
 
 def _get_pinecone():
@@ -23,17 +31,6 @@ def _get_pinecone():
     return _pinecone
 
 
-def _get_genai():
-    global _genai
-    if _genai is None:
-        import google.generativeai as genai
-        api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-        if api_key:
-            genai.configure(api_key=api_key)
-        _genai = genai
-    return _genai
-
-
 def chunk_markdown_by_sections(markdown: str, max_chunk_size: int = 1000) -> List[Dict[str, str]]:
     """
     Split markdown into chunks by ## headers. Each chunk has section name and content.
@@ -84,46 +81,46 @@ def chunk_markdown_by_sections(markdown: str, max_chunk_size: int = 1000) -> Lis
 
 
 def embed_texts(texts: List[str]) -> List[List[float]]:
-    """Embed a list of texts using Gemini. Returns list of embedding vectors (768 dims)."""
-    genai = _get_genai()
-    api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY or GOOGLE_API_KEY required for embeddings")
-
-    # models/embedding-001 outputs 3072 dims; truncate to 768 for Pinecone index
-    result = genai.embed_content(
-        model="models/embedding-001",
-        content=texts
-    )
-
-    # Single content returns {"embedding": [...]}, batch returns {"embeddings": [[...], ...]}
-    if "embedding" in result:
-        emb = result["embedding"]
-        return [[float(x) for x in emb[:768]]]
-    embeddings = result.get("embeddings", [])
-    return [[float(x) for x in emb[:768]] for emb in embeddings]
+    """
+    Embed a list of texts (Gemini by default). Returns list of embedding vectors (768 dims).
+    Vectors are served from the local embedding cache when possible; only
+    misses (deduplicated) go to the embedding engine, which batches them.
+    """
+    engine = get_embedding_engine()
+    cache = get_embedding_cache()
+    keys = [embedding_key(engine.model, engine.dims, t) for t in texts]
+    vectors = cache.get_many(keys)
 
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in vectors:
+            missing.setdefault(key, text)
+    if missing:
+        fresh = engine.embed(list(missing.values()))
+        new_items = list(zip(missing.keys(), fresh))
+        cache.put_many(new_items)
+        vectors.update(new_items)
 
-def upsert_paper_chunks(
+    return [vectors[key] for key in keys]
+
+
+def prepare_paper_vectors(
     job_id: str,
     title: str,
     chunks: List[Dict[str, str]]
 ) -> Dict[str, Any]:
     """
-    Embed chunks and upsert to Pinecone. Returns count of vectors upserted.
+    Embed chunks and build Pinecone vector records without upserting them.
+    Returns {"vectors": [...]} or an {"error", "upserted"} dict like upsert_paper_chunks.
     """
-    api_key = os.getenv("PINECONE_API_KEY")
-    index_name = os.getenv("PINECONE_INDEX", "graphrag-papers")
-    if not api_key:
-        return {"error": "PINECONE_API_KEY not set", "upserted": 0}
+    config_error = get_vector_store().configuration_error()
+    if config_error:
+        return {"error": config_error, "upserted": 0}
 
     if not chunks:
         return {"upserted": 0, "message": "No chunks to embed"}
 
     try:
-        pc = _get_pinecone()
-        index = pc.Index(index_name)
-
         # Embed all chunks (batch for efficiency)
         texts = [c["content"] for c in chunks]
         embeddings = embed_texts(texts)
@@ -141,53 +138,97 @@ def upsert_paper_chunks(
                     "content": chunk["content"][:40000],  # Pinecone metadata limit
                 }
             })
+        return {"vectors": vectors, "chunks": len(chunks)}
+    except Exception as e:
+        return {"error": str(e), "upserted": 0}
 
-        # Upsert in batches of 100
-        batch_size = 100
-        upserted = 0
-        for i in range(0, len(vectors), batch_size):
-            batch = vectors[i : i + batch_size]
-            index.upsert(vectors=batch)
-            upserted += len(batch)
 
-        return {"upserted": upserted, "chunks": len(chunks)}
+def upsert_vectors(vectors: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Upsert prebuilt vector records to the vector store. Returns count of vectors upserted.
+    """
+    store = get_vector_store()
+    config_error = store.configuration_error()
+    if config_error:
+        return {"error": config_error, "upserted": 0}
+
+    try:
+        upserted = store.upsert(vectors)
+        if upserted:
+            invalidate_search_results()
+        return {"upserted": upserted}
     except Exception as e:
         return {"error": str(e), "upserted": 0}
 
 
-def search(query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+def upsert_paper_chunks(
+    job_id: str,
+    title: str,
+    chunks: List[Dict[str, str]]
+) -> Dict[str, Any]:
+    """
+    Embed chunks and upsert to Pinecone. Returns count of vectors upserted.
+    """
+    prepared = prepare_paper_vectors(job_id, title, chunks)
+    if "vectors" not in prepared:
+        return prepared
+
+    result = upsert_vectors(prepared["vectors"])
+    if "error" not in result:
+        result["chunks"] = prepared["chunks"]
+    return result
+
+
+def embed_query(query: str) -> List[float]:
+    """
+    Embed a single search query, served from the in-process LRU when possible.
+    The cache is keyed on the normalized query; the query itself is embedded as given.
+    """
+    key = (get_embedding_engine().model, normalize_query(query))
+    embedding = query_embedding_cache.get(key)
+    if embedding is None:
+        embedding = embed_texts([query])[0]
+        query_embedding_cache.put(key, embedding)
+    return embedding
+
+
+def query_vectors(query_embedding: List[float], top_k: int = 5,
+                  filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Nearest chunks for an embedded query, flattened to chunk dicts."""
+    results = get_vector_store().query(query_embedding, top_k=top_k, filter=filters)
+
+    matches = []
+    for m in results:
+        meta = m.get("metadata") or {}
+        matches.append({
+            "score": m.get("score"),
+            "paper_id": meta.get("paper_id"),
+            "paper_title": meta.get("paper_title"),
+            "section": meta.get("section"),
+            "content": meta.get("content", ""),
+        })
+    return matches
+
+
+def search(query: str, top_k: int = 5,
+           filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """
     Semantic search over paper chunks. Returns matching chunks with metadata.
+    filters may restrict paper_id and/or section to a value or list of values.
     """
-    api_key = os.getenv("PINECONE_API_KEY")
-    index_name = os.getenv("PINECONE_INDEX", "graphrag-papers")
-    if not api_key:
+    if get_vector_store().configuration_error():
         return []
 
+    key = ("chunks", normalize_query(query), top_k, freeze_filters(filters))
+    cached = search_result_cache.get(key)
+    if cached is not None:
+        return cached
+
+    generation = search_result_cache.generation
     try:
-        # Embed query
-        query_embedding = embed_texts([query])[0]
-
-        pc = _get_pinecone()
-        index = pc.Index(index_name)
-
-        results = index.query(
-            vector=query_embedding,
-            top_k=top_k,
-            include_metadata=True
-        )
-
-        matches = []
-        for m in results.get("matches", []):
-            meta = m.get("metadata") or {}
-            matches.append({
-                "score": m.get("score"),
-                "paper_id": meta.get("paper_id"),
-                "paper_title": meta.get("paper_title"),
-                "section": meta.get("section"),
-                "content": meta.get("content", ""),
-            })
+        matches = query_vectors(embed_query(query), top_k=top_k, filters=filters)
+        search_result_cache.put(key, matches, generation)
         return matches
     except Exception as e:
-        print(f"Pinecone search failed: {e}")
+        print(f"Vector search failed: {e}")
         return []
@@ -0,0 +1,113 @@
+"""
+In-process caches for the retrieval path.
+An LRU of query embeddings keyed by normalized query text, and a TTL cache of
+search results keyed by (query, top_k, filters) that is cleared whenever new
+vectors are written. Clearing bumps a generation number: a result computed
+before the clear is dropped rather than cached. Both report hit rates so they
+can be sized.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from services.config import env_int
+
+_MISSING = object()
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query."""
+    return " ".join(query.lower().split())
+
+
+def freeze_filters(filters: Optional[Dict[str, Any]]) -> Tuple:
+    """Hashable, order-independent form of a filters dict."""
+    if not filters:
+        return ()
+    return tuple(sorted(
+        (k, tuple(sorted(v)) if isinstance(v, (list, tuple, set)) else v)
+        for k, v in filters.items()
+    ))
+
+
+class LRUCache:
+    """Thread-safe LRU cache with optional per-entry time-to-live."""
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Bumped by clear(); put() with an older generation is a no-op
+        self.generation = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and self.ttl is not None and entry[0] < time.monotonic():
+                del self._data[key]
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, generation: Optional[int] = None):
+        """
+        Store value. Pass the generation read before computing it, so a value
+        computed across a clear() (possibly from stale data) is not stored.
+        """
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else 0.0
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+            self.generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+query_embedding_cache = LRUCache(maxsize=env_int("QUERY_EMBEDDING_CACHE_SIZE", 1024))
+search_result_cache = LRUCache(
+    maxsize=env_int("SEARCH_RESULT_CACHE_SIZE", 256),
+    ttl=float(os.getenv("SEARCH_RESULT_CACHE_TTL", "300"))
+)
+
+
+def invalidate_search_results():
+    """Drop every cached search result (called after new vectors are written)."""
+    search_result_cache.clear()
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "query_embeddings": query_embedding_cache.stats(),
+        "search_results": search_result_cache.stats(),
+    }
@@ -0,0 +1,181 @@
+"""
+Single-pass GROBID TEI parser.
+Walks the TEI once with lxml iterparse and produces the title, header authors,
+bibliography entries and section-structured body text, clearing elements as
+soon as they have been read so memory stays flat on large documents.
+"""
+from io import BytesIO
+from typing import Any, Dict, List, Optional
+
+from lxml import etree
+
+
+def _local(tag) -> str:
+    """Tag name without its namespace ("{ns}p" -> "p")."""
+    if not isinstance(tag, str):
+        return ""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _text(elem, separator: str = " ") -> str:
+    """Stripped text nodes joined with separator (BeautifulSoup get_text(strip=True))."""
+    return separator.join(t.strip() for t in elem.itertext() if t and t.strip())
+
+
+def _find_all(elem, name: str) -> list:
+    return [e for e in elem.iter() if _local(e.tag) == name]
+
+
+def _find(elem, name: str, **attrs):
+    for e in elem.iter():
+        if _local(e.tag) == name and all(
+            (e.get(k) or "").lower() == v.lower() for k, v in attrs.items()
+        ):
+            return e
+    return None
+
+
+def _release(elem):
+    """Free a processed element and the already-processed siblings before it."""
+    elem.clear(keep_tail=True)
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
+
+def _person_name(author) -> str:
+    pers_name = _find(author, "persName")
+    if pers_name is None:
+        return ""
+    first = _find(pers_name, "forename", type="first")
+    last = _find(pers_name, "surname")
+    first_text = _text(first, "") if first is not None else ""
+    last_text = _text(last, "") if last is not None else ""
+    return f"{first_text} {last_text}".strip()
+
+
+def _header_author(author) -> Optional[Dict[str, Any]]:
+    name = _person_name(author)
+    if not name:
+        return None
+    surname = _find(author, "surname")
+    forenames = [_text(f, "") for f in _find_all(author, "forename")]
+    affiliation = None
+    aff = _find(author, "affiliation")
+    if aff is not None:
+        orgs = [_text(o) for o in _find_all(aff, "orgName")]
+        affiliation = ", ".join(o for o in orgs if o) or None
+    return {
+        "name": name,
+        "forenames": [f for f in forenames if f],
+        "surname": _text(surname, "") if surname is not None else "",
+        "affiliation": affiliation,
+    }
+
+
+def _reference(bibl) -> Optional[Dict[str, Any]]:
+    title_elem = _find(bibl, "title", level="a")
+    if title_elem is None:
+        title_elem = _find(bibl, "title", level="m")
+    title = _text(title_elem, "") if title_elem is not None else ""
+    if not title:
+        return None
+    doi = _find(bibl, "idno", type="DOI")
+    arxiv = _find(bibl, "idno", type="arXiv")
+    date = _find(bibl, "date", type="published")
+    year = None
+    if date is not None and (date.get("when") or "")[:4].isdigit():
+        year = int(date.get("when")[:4])
+    authors = [n for n in (_person_name(a) for a in _find_all(bibl, "author")) if n]
+    return {
+        "title": title,
+        "doi": (_text(doi, "").lower() or None) if doi is not None else None,
+        "arxiv": (_text(arxiv, "") or None) if arxiv is not None else None,
+        "year": year,
+        "authors": authors,
+    }
+
+
+def parse_tei(xml_out) -> Dict[str, Any]:
+    """
+    Parse GROBID TEI XML in one pass.
+
+    Returns {"title", "authors" (header authors only, as dicts),
+    "references", "sections", "full_text"}; full_text matches the markdown
+    layout previously produced by extract_full_text_from_tei.
+    """
+    result: Dict[str, Any] = {
+        "title": "Unknown Title",
+        "authors": [],
+        "references": [],
+        "sections": [],
+        "full_text": "",
+    }
+    if not xml_out:
+        return result
+    data = xml_out.encode("utf-8") if isinstance(xml_out, str) else xml_out
+
+    title: Optional[str] = None
+    parts: List[str] = []
+    sections: List[Dict[str, Any]] = []
+    stack: List[str] = []
+    in_body = False
+    body_seen = False
+    body_depth = 0
+    body_fallback = ""
+
+    context = etree.iterparse(BytesIO(data), events=("start", "end"),
+                              recover=True, huge_tree=True)
+    try:
+        for event, elem in context:
+            name = _local(elem.tag)
+            if event == "start":
+                if name == "body" and not body_seen:
+                    in_body, body_seen, body_depth = True, True, len(stack)
+                stack.append(name)
+                continue
+
+            stack.pop()
+            if "teiHeader" in stack:
+                if name == "title" and title is None and stack[-1:] == ["titleStmt"]:
+                    title = _text(elem, "")
+                elif name == "author" and "analytic" in stack and "sourceDesc" in stack:
+                    author = _header_author(elem)
+                    if author:
+                        result["authors"].append(author)
+            elif name == "biblStruct":
+                reference = _reference(elem)
+                if reference:
+                    result["references"].append(reference)
+                _release(elem)
+            elif in_body and name in ("head", "p"):
+                txt = _text(elem)
+                if txt:
+                    if name == "head":
+                        parts.append("## " + txt + "\n")
+                        sections.append({"head": txt, "paragraphs": []})
+                    else:
+                        parts.append(txt + "\n")
+                        if not sections:
+                            sections.append({"head": None, "paragraphs": []})
+                        sections[-1]["paragraphs"].append(txt)
+                _release(elem)
+            elif name == "body" and in_body and len(stack) == body_depth:
+                # Only the first body counts, like BeautifulSoup's find('body')
+                if not parts:
+                    body_fallback = _text(elem, "\n")
+                in_body = False
+                _release(elem)
+            elif name == "teiHeader":
+                _release(elem)
+    except etree.XMLSyntaxError:
+        pass
+    finally:
+        del context
+
+    if title:
+        result["title"] = title.strip()
+    result["sections"] = sections
+    result["full_text"] = "\n".join(parts).strip() if parts else body_fallback
+    return result
@@ -0,0 +1,116 @@
+"""
+Pluggable vector store.
+upsert_paper_chunks and search talk to a VectorStore; VECTOR_STORE selects the
+backend ("pinecone" by default, or "local" for the in-process NumPy index).
+"""
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class VectorStore:
+    """Interface every vector backend implements."""
+
+    name = ""
+
+    def configuration_error(self) -> Optional[str]:
+        """Why the store cannot be used (e.g. missing API key), or None."""
+        return None
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> int:
+        """Insert or overwrite {"id", "values", "metadata"} records. Returns count written."""
+        raise NotImplementedError
+
+    def query(self, vector: List[float], top_k: int = 5,
+              filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Nearest neighbours of vector. filter maps a metadata field
+        (paper_id, section) to a value or a list of accepted values.
+        Returns [{"id", "score", "metadata"}] best first.
+        """
+        raise NotImplementedError
+
+    def ping(self) -> bool:
+        """Cheap liveness check."""
+        return self.configuration_error() is None
+
+
+def _pinecone_filter(filter: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not filter:
+        return None
+    return {
+        field: {"$in": list(value)} if isinstance(value, (list, tuple, set)) else {"$eq": value}
+        for field, value in filter.items()
+    }
+
+
+class PineconeVectorStore(VectorStore):
+    """Pinecone index; the Index handle is built once and reused."""
+
+    name = "pinecone"
+
+    def __init__(self, index_name: str = None, batch_size: int = 100):
+        self.index_name = index_name or os.getenv("PINECONE_INDEX", "graphrag-papers")
+        self.batch_size = batch_size
+        self._index = None
+        self._lock = threading.Lock()
+
+    def configuration_error(self) -> Optional[str]:
+        if not os.getenv("PINECONE_API_KEY"):
+            return "PINECONE_API_KEY not set"
+        return None
+
+    @property
+    def index(self):
+        with self._lock:
+            if self._index is None:
+                # Imported here so the local backend works without Pinecone installed
+                from services.pinecone_service import _get_pinecone
+                self._index = _get_pinecone().Index(self.index_name)
+            return self._index
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> int:
+        upserted = 0
+        for i in range(0, len(vectors), self.batch_size):
+            batch = vectors[i : i + self.batch_size]
+            self.index.upsert(vectors=batch)
+            upserted += len(batch)
+        return upserted
+
+    def query(self, vector: List[float], top_k: int = 5,
+              filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        kwargs = {"vector": vector, "top_k": top_k, "include_metadata": True}
+        pinecone_filter = _pinecone_filter(filter)
+        if pinecone_filter:
+            kwargs["filter"] = pinecone_filter
+        results = self.index.query(**kwargs)
+        return [
+            {"id": m.get("id"), "score": m.get("score"), "metadata": m.get("metadata") or {}}
+            for m in results.get("matches", [])
+        ]
+
+    def ping(self) -> bool:
+        if self.configuration_error():
+            return False
+        self.index.describe_index_stats()
+        return True
+
+
+# Singleton instance
+_vector_store = None
+_vector_store_lock = threading.Lock()
+
+def get_vector_store() -> VectorStore:
+    """Get or create the vector store selected by VECTOR_STORE."""
+    global _vector_store
+    with _vector_store_lock:
+        if _vector_store is None:
+            backend = os.getenv("VECTOR_STORE", "pinecone").lower()
+            if backend == "local":
+                from services.local_vector_store import LocalVectorStore
+                _vector_store = LocalVectorStore.from_env()
+            elif backend == "pinecone":
+                _vector_store = PineconeVectorStore()
+            else:
+                raise ValueError(f"Unknown VECTOR_STORE: {backend}")
+    return _vector_store